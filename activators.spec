@@ -21,6 +21,7 @@ Source0:        %{name}-%{version}.tar.gz
 Vendor:         %{_platform_vendor}
 
 BuildArch:      noarch
+Requires:       pluginutils
 
 %define PKG_BASE_DIR /opt/cmframework/activators
 
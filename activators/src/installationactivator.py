@@ -16,12 +16,15 @@
 from cmframework.apis import cmerror
 from cmframework.apis import cmactivator
 from cmdatahandlers.api import configmanager
-from cmdatahandlers.api import configerror
+from cmpluginutils import playbookoutput
 import os
+import sys
 import subprocess
 import json
 import pwd
 import logging
+import hashlib
+import time
 
 class installationactivator(cmactivator.CMGlobalActivator):
     inventory_cli = '/opt/cmframework/scripts/inventory.sh'
@@ -33,6 +36,13 @@ class installationactivator(cmactivator.CMGlobalActivator):
     provisioning_playbook = 'provisioning-playbook.yml'
     postconfig_playbook = 'postconfig-playbook.yml'
     state_file = '/etc/installation_state'
+    log_dir = '/var/log/cmframework'
+    failure_report_lines = 50
+    progress_property = 'cloud.installation_progress'
+    # written by the installation itself, not inputs of it
+    bookkeeping_properties = ('cloud.installation_date', 'cloud.installation_phase',
+                              progress_property)
+    phases = ['setup', 'bootstrapping', 'provisioning', 'postconfig']
 
     def __init__(self):
         self.plugin_client = None
@@ -48,89 +58,38 @@ class installationactivator(cmactivator.CMGlobalActivator):
 
     def activate_full(self, target=None):
         try:
-            properties = self.get_plugin_client().get_properties('.*')
-            if not properties:
+            # most activations happen after the installation, check that
+            # before loading and parsing the whole configuration
+            if self._is_installed():
                 return
-            propsjson = {}
-            for name, value in properties.iteritems():
-                try:
-                    propsjson[name] = json.loads(value)
-                except Exception as exp:
-                    continue
-            configman = configmanager.ConfigManager(propsjson)
-
-            hostsconfig = configman.get_hosts_config_handler()
-            installation_host = hostsconfig.get_installation_host()
-
-            installed = False
-            try:
-                configman.get_cloud_installation_date()
-                installed = True
-            except configerror.ConfigError as exp:
-                pass
 
-            if installed:
+            properties = self.get_plugin_client().get_properties('.*')
+            if not properties:
                 return
+            configman = self._get_config_manager(properties)
 
-            usersconf = configman.get_users_config_handler()
-            admin = usersconf.get_admin_user()
-
-            #generate high level playbooks
-            if self._run_cmd(self.playbooks_generate_cli, '/etc', 'root', os.environ.copy()):
-                raise cmerror.CMError('Failed to run %s' % self.playbooks_generate_cli)
-
-            caas_data = configman.get_caas_config_handler()
+            progress = self._get_installation_progress()
+            inputs_hash = self._get_inputs_hash(properties)
             phase = self._get_installation_phase()
-            #first we run the setup 
-            if not phase:
-                self._set_installation_phase('setup-started')
-                phase = 'setup-started'
+            if progress.get('inputs_hash') == inputs_hash and phase:
+                logging.info('Installation inputs unchanged, skipping playbook generation')
+            else:
+                #generate high level playbooks
+                if self._run_cmd(self.playbooks_generate_cli, '/etc', 'root', os.environ.copy(),
+                                 'playbooks-generate'):
+                    raise cmerror.CMError('Failed to run %s' % self.playbooks_generate_cli)
+                # a failed installation is usually fixed by changing the
+                # configuration, it still resumes at the failed phase
+                progress['inputs_hash'] = inputs_hash
+                self._set_installation_progress(progress)
+
             env = os.environ.copy()
-            if phase == 'setup-started':
-                env['VNF_EMBEDDED_DEPLOYMENT'] = 'false'
-                env['CONFIG_PHASE'] = 'setup'
-                env['BOOTSTRAP_OPTS'] = 'installation_controller=%s' %(installation_host)
-                self._run_setup_playbook(self.presetup_playbook, env)
-                env['BOOTSTRAP_OPTS'] = ''
-                if caas_data.get_vnf_flag():
-                    env['VNF_EMBEDDED_DEPLOYMENT'] = 'true'
-                self._run_setup_playbook(self.setup_playbook, env)
-                self._set_installation_phase('setup-ended')
-                phase = 'setup-ended'
-
-            #second we run the aio
-            if phase == 'setup-ended':
-                self._set_installation_phase('bootstrapping-started')
-                phase = 'bootstrapping-started'
-            if phase == 'bootstrapping-started':
-                env['CONFIG_PHASE'] = 'bootstrapping'
-                self._run_playbook(self.bootstrapping_playbook, admin, env)
-                self._set_installation_phase('bootstrapping-ended')
-                phase = 'bootstrapping-ended'
-
-            #3rd we run the provisioning
-            if phase == 'bootstrapping-ended':
-                self._set_installation_phase('provisioning-started')
-                phase = 'provisioning-started'
-            if phase == 'provisioning-started':
-                env['CONFIG_PHASE'] = 'provisioning'
-                self._run_playbook(self.provisioning_playbook, admin, env)
-                self._set_installation_phase('provisioning-ended')
-                phase = 'provisioning-ended'
-
-            #4th we run the postconfig
-            if phase == 'provisioning-ended':
-                self._set_installation_phase('postconfig-started')
-                phase = 'postconfig-started'
-            if phase == 'postconfig-started':
-                env['CONFIG_PHASE'] = 'postconfig'
-                env['CAAS_ONLY_DEPLOYMENT'] = 'false'
-                if caas_data.get_caas_only():
-                    env['CAAS_ONLY_DEPLOYMENT'] = 'true'
-                self._run_playbook(self.postconfig_playbook, admin, env)
-                self._set_installation_phase('postconfig-ended')
-                phase = 'postconfig-ended'
-            
+            try:
+                for phase in self._get_pending_phases(phase):
+                    self._run_phase(phase, configman, env, progress)
+            finally:
+                self._log_installation_summary(progress)
+
             self._set_installation_date()
 
             self._set_state('success')
@@ -139,6 +98,122 @@ class installationactivator(cmactivator.CMGlobalActivator):
             self._set_state('failure')
             raise cmerror.CMError(str(exp))
 
+    def _is_installed(self):
+        # only a missing or empty date means not installed, errors reading it
+        # must not restart the installation
+        properties = self.get_plugin_client().get_properties(r'^cloud\.installation_date$')
+        value = properties.get('cloud.installation_date')
+        if not value:
+            return False
+        try:
+            return bool(json.loads(value))
+        except ValueError:
+            # unparsable values were skipped when loading the configuration
+            return False
+
+    @staticmethod
+    def _get_config_manager(properties):
+        propsjson = {}
+        for name, value in properties.iteritems():
+            try:
+                propsjson[name] = json.loads(value)
+            except Exception as exp:
+                continue
+        return configmanager.ConfigManager(propsjson)
+
+    def _get_pending_phases(self, phase):
+        if not phase:
+            return list(self.phases)
+        try:
+            name, state = phase.rsplit('-', 1)
+            index = self.phases.index(name)
+        except (AttributeError, ValueError):
+            logging.warning('Unknown installation phase %r, running all phases', phase)
+            return list(self.phases)
+        if state == 'ended':
+            index += 1
+        return self.phases[index:]
+
+    def _run_phase(self, phase, configman, env, progress):
+        self._set_installation_phase('%s-started' % phase)
+        timing = {'start': self._get_timestamp()}
+        progress.setdefault('phases', {})[phase] = timing
+        self._set_installation_progress(progress)
+        start = time.time()
+        try:
+            getattr(self, '_run_%s_phase' % phase)(configman, env)
+            timing['result'] = 'success'
+        except Exception:
+            timing['result'] = 'failure'
+            raise
+        finally:
+            timing['end'] = self._get_timestamp()
+            timing['duration'] = round(time.time() - start, 1)
+            self._set_installation_progress(progress)
+        self._set_installation_phase('%s-ended' % phase)
+
+    def _run_setup_phase(self, configman, env):
+        installation_host = configman.get_hosts_config_handler().get_installation_host()
+        env['VNF_EMBEDDED_DEPLOYMENT'] = 'false'
+        env['CONFIG_PHASE'] = 'setup'
+        env['BOOTSTRAP_OPTS'] = 'installation_controller=%s' %(installation_host)
+        self._run_setup_playbook(self.presetup_playbook, env)
+        env['BOOTSTRAP_OPTS'] = ''
+        if configman.get_caas_config_handler().get_vnf_flag():
+            env['VNF_EMBEDDED_DEPLOYMENT'] = 'true'
+        self._run_setup_playbook(self.setup_playbook, env)
+
+    def _run_bootstrapping_phase(self, configman, env):
+        env['CONFIG_PHASE'] = 'bootstrapping'
+        self._run_playbook(self.bootstrapping_playbook, self._get_admin_user(configman), env)
+
+    def _run_provisioning_phase(self, configman, env):
+        env['CONFIG_PHASE'] = 'provisioning'
+        self._run_playbook(self.provisioning_playbook, self._get_admin_user(configman), env)
+
+    def _run_postconfig_phase(self, configman, env):
+        env['CONFIG_PHASE'] = 'postconfig'
+        env['CAAS_ONLY_DEPLOYMENT'] = 'false'
+        if configman.get_caas_config_handler().get_caas_only():
+            env['CAAS_ONLY_DEPLOYMENT'] = 'true'
+        self._run_playbook(self.postconfig_playbook, self._get_admin_user(configman), env)
+
+    @staticmethod
+    def _get_admin_user(configman):
+        return configman.get_users_config_handler().get_admin_user()
+
+    def _get_inputs_hash(self, properties):
+        inputs = dict((name, value) for name, value in properties.iteritems()
+                      if name not in self.bookkeeping_properties)
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True)).hexdigest()
+
+    def _get_installation_progress(self):
+        progress = {}
+        try:
+            progress = json.loads(self.get_plugin_client().get_property(self.progress_property))
+        except Exception as exp:
+            pass
+        return progress if isinstance(progress, dict) else {}
+
+    def _set_installation_progress(self, progress):
+        self.get_plugin_client().set_property(self.progress_property, json.dumps(progress))
+
+    def _log_installation_summary(self, progress):
+        timings = progress.get('phases', {})
+        for phase in self.phases:
+            timing = timings.get(phase)
+            if timing:
+                logging.info('Installation phase %s: %s in %.1f s (%s - %s)', phase,
+                             timing.get('result', 'running'), timing.get('duration', 0),
+                             timing['start'], timing.get('end', ''))
+            else:
+                logging.info('Installation phase %s: not run', phase)
+
+    @staticmethod
+    def _get_timestamp():
+        # Use ISO 8601 date format
+        return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
     def _set_installation_phase(self, phase):
         self.get_plugin_client().set_property('cloud.installation_phase', json.dumps(phase))
 
@@ -152,24 +227,22 @@ class installationactivator(cmactivator.CMGlobalActivator):
         return phase
 
     def _set_installation_date(self):
-        from time import gmtime, strftime
-        # Use ISO 8601 date format
-        times = strftime('%Y-%m-%dT%H:%M:%SZ', gmtime())
-        self.get_plugin_client().set_property('cloud.installation_date', json.dumps(times))
+        self.get_plugin_client().set_property('cloud.installation_date',
+                                              json.dumps(self._get_timestamp()))
 
     def _run_playbook(self, playbook, user, env):
         cmd = '/usr/local/bin/openstack-ansible -b -u ' + user + ' ' + playbook
-        result = self._run_cmd(cmd, self.playbooks_path, user, env)
+        result = self._run_cmd(cmd, self.playbooks_path, user, env, env['CONFIG_PHASE'])
         if result != 0:
             raise cmerror.CMError('Playbook %s failed' % playbook)
         
     def _run_setup_playbook(self, playbook, env):
         cmd = '/usr/local/bin/setup-controller.sh ' + playbook
-        result = self._run_cmd(cmd, self.playbooks_path, 'root', env)
+        result = self._run_cmd(cmd, self.playbooks_path, 'root', env, env['CONFIG_PHASE'])
         if result != 0:
             raise cmerror.CMError('Playbook %s failed' % playbook)
         
-    def _run_cmd(self, cmd, cwd, user, env):
+    def _run_cmd(self, cmd, cwd, user, env, log_name):
         args = cmd.split()
         pw_record = pwd.getpwnam(user)
         user_name = pw_record.pw_name
@@ -181,8 +254,20 @@ class installationactivator(cmactivator.CMGlobalActivator):
         env['HOME'] = user_home_dir
         env['PWD'] = cwd
         env['USER'] = user_name
-        process = subprocess.Popen(args, preexec_fn=self._demote(user_uid, user_gid), cwd=cwd, env=env)
-        result = process.wait()
+        output = playbookoutput.PlaybookOutput(
+            os.path.join(self.log_dir, 'installation-%s.log' % log_name),
+            tail_lines=self.failure_report_lines, echo=sys.stdout)
+        try:
+            process = subprocess.Popen(args, preexec_fn=self._demote(user_uid, user_gid), cwd=cwd,
+                                       env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            output.capture(process.stdout)
+            result = process.wait()
+        finally:
+            output.wait()
+        for task, duration in output.get_slowest_tasks():
+            logging.info('%s: task %s took %.1f s', log_name, task, duration)
+        if result != 0:
+            logging.error('%s failed with %d, last output lines:\n%s', cmd, result, '\n'.join(output.tail))
         return result
 
 
@@ -13,25 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from cmframework.apis import cmactivator
+from cmpluginutils import playbookactivator
 
-class managepolicycreatoractivator(cmactivator.CMGlobalActivator):
-    aaa_policy_playbook = '/opt/openstack-ansible/playbooks/setup_aaa.yml --tags aaa_policy'
+class managepolicycreatoractivator(playbookactivator.PlaybookActivator):
+    playbook = '/opt/openstack-ansible/playbooks/setup_aaa.yml --tags aaa_policy'
 
     def __init__self(self):
         super(managepolicycreatoractivator, self).__init__()
 
     def get_subscription_info(self):
         return 'cloud.policy_counter'
-
-    def activate_set(self, props):
-        self._activate()
-
-    def activate_delete(self, props):
-        self._activate()
-
-    def activate_full(self, target):
-        self._activate(target=target)
-
-    def _activate(self, target=None):
-        self.run_playbook(self.aaa_policy_playbook, target)
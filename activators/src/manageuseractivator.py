@@ -13,25 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from cmframework.apis import cmactivator
+from cmpluginutils import playbookactivator
 
-class manageuseractivator(cmactivator.CMGlobalActivator):
-    manage_user_playbook = "/opt/openstack-ansible/playbooks/manage_chroot_user.yml"
+class manageuseractivator(playbookactivator.PlaybookActivator):
+    playbook = "/opt/openstack-ansible/playbooks/manage_chroot_user.yml"
 
     def __init__self(self):
         super(manageuseractivator, self).__init__()
 
     def get_subscription_info(self):
         return 'cloud.chroot'
-
-    def activate_set(self, props):
-        self._activate()
-
-    def activate_delete(self, props):
-        self._activate()
-
-    def activate_full(self, target):
-        self._activate(target=target)
-
-    def _activate(self, target=None):
-        self.run_playbook(self.manage_user_playbook, target)
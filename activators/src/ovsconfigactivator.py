@@ -13,30 +13,108 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from cmframework.apis.cmactivator import CMGlobalActivator
+import json
+import logging
 
+from cmpluginutils import playbookactivator
 
-class ovsconfigactivator(CMGlobalActivator):
+
+class ovsconfigactivator(playbookactivator.PlaybookActivator):
     """ OVS config activator plugin class. """
 
 
     CLOUD_HOSTS = 'cloud.networking'
-    PLAYBOOK = '/opt/openstack-ansible/playbooks/ovs_config.yaml'
+    HOSTS = 'cloud.hosts'
+    NETWORK_PROFILES = 'cloud.network_profiles'
+    PROVIDER_NETWORKS = 'provider_networks'
+    NETWORK_DOMAINS = 'network_domains'
+    playbook = '/opt/openstack-ansible/playbooks/ovs_config.yaml'
 
     def __init__(self):
         super(ovsconfigactivator, self).__init__()
+        self.networking = None
 
     def get_subscription_info(self):
         return self.CLOUD_HOSTS
 
-    def activate_set(self, props):
-        self._activate()
+    def get_activation_target(self, props):
+        networking = json.loads(props[self.CLOUD_HOSTS]) if props.get(self.CLOUD_HOSTS) else None
+        # the baseline moves only when a run has applied the change
+        if self.networking is None or networking is None:
+            return None
+        hosts = self.get_affected_hosts(self.networking, networking)
+        if hosts:
+            logging.info('OVS configuration changed on %s', ', '.join(sorted(hosts)))
+        return hosts
+
+    def _applied(self, props):
+        if props.get(self.CLOUD_HOSTS):
+            self.networking = json.loads(props[self.CLOUD_HOSTS])
+
+    def _failed(self, props):
+        # after a failure the next activation covers all the hosts again
+        self.networking = None
 
     def activate_delete(self, props):
-        self._activate()
+        self.networking = None
+        super(ovsconfigactivator, self).activate_delete(props)
+
+    def get_affected_hosts(self, old_networking, networking):
+        """Returns the hosts affected by the networking change, None for all hosts."""
+        changed_domains = set()
+        changed_provider_networks = set()
+        for key in set(old_networking) | set(networking):
+            old_value = old_networking.get(key)
+            value = networking.get(key)
+            if old_value == value:
+                continue
+            if key == self.PROVIDER_NETWORKS:
+                changed_provider_networks.update(self._get_changed_keys(old_value, value))
+            elif self._is_infra_network(old_value) and self._is_infra_network(value):
+                changed_domains.update(self._get_changed_domains(old_value, value))
+            else:
+                return None
+        if not (changed_domains or changed_provider_networks):
+            return set()
+
+        hosts = self._get_property_dict(self.HOSTS)
+        profiles = self._get_property_dict(self.NETWORK_PROFILES)
+        affected = set()
+        for name, host in hosts.iteritems():
+            if host.get('network_domain') in changed_domains:
+                affected.add(name)
+            elif changed_provider_networks & self._get_provider_networks(profiles, host):
+                affected.add(name)
+        return affected
+
+    def _get_changed_domains(self, old_network, network):
+        old_domains = old_network.get(self.NETWORK_DOMAINS, {})
+        domains = network.get(self.NETWORK_DOMAINS, {})
+        old_settings = dict((k, v) for k, v in old_network.iteritems() if k != self.NETWORK_DOMAINS)
+        settings = dict((k, v) for k, v in network.iteritems() if k != self.NETWORK_DOMAINS)
+        if old_settings != settings:
+            return set(old_domains) | set(domains)
+        return self._get_changed_keys(old_domains, domains)
+
+    @staticmethod
+    def _get_changed_keys(old_value, value):
+        old_value = old_value or {}
+        value = value or {}
+        return set(key for key in set(old_value) | set(value)
+                   if old_value.get(key) != value.get(key))
+
+    def _is_infra_network(self, value):
+        return isinstance(value, dict) and isinstance(value.get(self.NETWORK_DOMAINS), dict)
 
-    def activate_full(self, target):
-        self._activate(target=target)
+    def _get_provider_networks(self, profiles, host):
+        networks = set()
+        for profile_name in host.get('network_profiles', []):
+            profile = profiles.get(profile_name, {})
+            for interface in profile.get('provider_network_interfaces', {}).itervalues():
+                networks.update(interface.get(self.PROVIDER_NETWORKS, []))
+            networks.update(profile.get('sriov_provider_networks', {}))
+        return networks
 
-    def _activate(self, target=None):
-        self.run_playbook(self.PLAYBOOK, target)
+    def _get_property_dict(self, name):
+        value = self.get_plugin_client().get_property(name)
+        return json.loads(value) if value else {}
@@ -13,9 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from cmframework.apis import cmactivator
+from cmpluginutils import playbookactivator
 
-class timeactivator(cmactivator.CMGlobalActivator):
+class timeactivator(playbookactivator.PlaybookActivator):
     playbook = '/opt/openstack-ansible/playbooks/ntp-config.yml'
 
     def __init__(self):
@@ -23,15 +23,3 @@ class timeactivator(cmactivator.CMGlobalActivator):
 
     def get_subscription_info(self):
         return 'cloud.time'
-
-    def activate_set(self, props):
-        self._activate()
-
-    def activate_delete(self, props):
-        self._activate()
-
-    def activate_full(self, target):
-        self._activate(target=target)
-
-    def _activate(self, target=None):
-        self.run_playbook(self.playbook, target)
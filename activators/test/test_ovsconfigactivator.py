@@ -0,0 +1,120 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import json
+import unittest
+
+import testutils
+from ovsconfigactivator import ovsconfigactivator
+
+PLAYBOOK = ovsconfigactivator.playbook
+
+NETWORKING = {
+    'dns': ['10.0.0.1'],
+    'infra_internal': {
+        'mtu': 1500,
+        'network_domains': {'rack-1': {'cidr': '192.168.1.0/24'},
+                            'rack-2': {'cidr': '192.168.2.0/24'}}},
+    'provider_networks': {'pn-1': {'vlan_ranges': '100:200'},
+                          'pn-2': {'vlan_ranges': '300:400'},
+                          'pn-3': {'vlan_ranges': '500:600'}}}
+
+HOSTS = {
+    'host-1': {'network_domain': 'rack-1', 'network_profiles': ['ovs']},
+    'host-2': {'network_domain': 'rack-2', 'network_profiles': ['sriov']},
+    'host-3': {'network_domain': 'rack-2', 'network_profiles': ['ovs']},
+    'host-4': {'network_domain': 'rack-3', 'network_profiles': []}}
+
+NETWORK_PROFILES = {
+    'ovs': {'provider_network_interfaces': {'bond1': {'provider_networks': ['pn-1']}}},
+    'sriov': {'sriov_provider_networks': {'pn-2': {'interfaces': ['ens1']}}}}
+
+
+class FakePluginClient(object):
+    def __init__(self, props):
+        self.props = props
+
+    def get_property(self, name):
+        return self.props.get(name)
+
+
+class OvsConfigActivatorTest(unittest.TestCase):
+    def setUp(self):
+        self.activator = ovsconfigactivator()
+        self.activator.set_plugin_client(FakePluginClient(
+            {'cloud.hosts': json.dumps(HOSTS),
+             'cloud.network_profiles': json.dumps(NETWORK_PROFILES)}))
+        # the first activation has no baseline and runs on all hosts
+        self.activate(NETWORKING)
+        self.assertEqual(self.activator.playbook_runs, [(PLAYBOOK, None)])
+        self.activator.playbook_runs = []
+
+    def activate(self, networking):
+        self.activator.activate_set({'cloud.networking': json.dumps(networking)})
+
+    def change(self, *path):
+        networking = copy.deepcopy(NETWORKING)
+        value = networking
+        for key in path[:-2]:
+            value = value[key]
+        value[path[-2]] = path[-1]
+        return networking
+
+    def test_domain_change(self):
+        self.activate(self.change('infra_internal', 'network_domains', 'rack-1',
+                                  {'cidr': '192.168.10.0/24'}))
+        self.assertEqual(self.activator.playbook_runs, [(PLAYBOOK, 'host-1')])
+
+    def test_infra_network_setting_change(self):
+        self.activate(self.change('infra_internal', 'mtu', 9000))
+        self.assertEqual(self.activator.playbook_runs, [(PLAYBOOK, 'host-1,host-2,host-3')])
+
+    def test_provider_network_change(self):
+        networking = self.change('provider_networks', 'pn-1', {'vlan_ranges': '100:250'})
+        self.activate(networking)
+        networking['provider_networks']['pn-2'] = {'vlan_ranges': '300:450'}
+        self.activate(networking)
+        self.assertEqual(self.activator.playbook_runs,
+                         [(PLAYBOOK, 'host-1,host-3'), (PLAYBOOK, 'host-2')])
+
+    def test_unrelated_key_change(self):
+        self.activate(self.change('dns', ['10.0.0.2']))
+        self.assertEqual(self.activator.playbook_runs, [(PLAYBOOK, None)])
+
+    def test_no_op_change(self):
+        # the same value, and a provider network none of the hosts uses
+        self.activate(NETWORKING)
+        self.activate(self.change('provider_networks', 'pn-3', {'vlan_ranges': '500:650'}))
+        self.assertEqual(self.activator.playbook_runs, [])
+        self.assertEqual(self.activator.metrics['skipped'], 2)
+
+    def test_rerun_after_a_failed_activation(self):
+        def run_playbook(playbook, target=None):
+            raise RuntimeError('playbook failed')
+        networking = self.change('infra_internal', 'network_domains', 'rack-1',
+                                 {'cidr': '192.168.10.0/24'})
+        self.activator.run_playbook = run_playbook
+        self.assertRaises(RuntimeError, self.activate, networking)
+
+        # the failed run may have left any host half configured
+        del self.activator.run_playbook
+        self.activate(networking)
+        networking['provider_networks']['pn-2'] = {'vlan_ranges': '300:450'}
+        self.activate(networking)
+        self.assertEqual(self.activator.playbook_runs, [(PLAYBOOK, None), (PLAYBOOK, 'host-2')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+STUBS_DIR = os.path.join(BENCH_DIR, 'stubs')
+PLUGINUTILS_DIR = os.path.join(REPO_DIR, 'pluginutils', 'src')
+VALIDATORS_DIR = os.path.join(REPO_DIR, 'validators', 'src')
+ACTIVATORS_DIR = os.path.join(REPO_DIR, 'activators', 'src')
+INVENTORYHANDLERS_DIR = os.path.join(REPO_DIR, 'inventoryhandlers')
+
+
+def get_inventoryhandler_dirs():
+    return sorted(os.path.join(INVENTORYHANDLERS_DIR, name)
+                  for name in os.listdir(INVENTORYHANDLERS_DIR)
+                  if os.path.isdir(os.path.join(INVENTORYHANDLERS_DIR, name)))
+
+
+def setup_paths(*plugin_dirs):
+    for path in (STUBS_DIR, PLUGINUTILS_DIR) + plugin_dirs:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+class FakePluginClient(object):
+    """Plugin client serving properties from a dict and counting the calls."""
+
+    def __init__(self, props):
+        self.props = props
+        self.calls = {'get_property': 0, 'get_properties': 0}
+
+    def get_property(self, name):
+        self.calls['get_property'] += 1
+        return self.props.get(name)
+
+    def get_properties(self, filterstr):
+        self.calls['get_properties'] += 1
+        pattern = re.compile(filterstr)
+        return dict((name, value) for name, value in self.props.items() if pattern.match(name))
+
+
+def measure(func, repeat=5, number=1):
+    """Returns the best wall time of a single func() call over the repeats."""
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for _ in range(number):
+            func()
+        elapsed = (time.time() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def print_table(header, rows):
+    widths = [max(len(str(row[idx])) for row in [header] + rows) for idx in range(len(header))]
+    line = '  '.join('%%-%ds' % width for width in widths)
+    print(line % tuple(header))
+    for row in rows:
+        print(line % tuple(row))
+
+
+def get_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=REPO_DIR).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmark, results):
+    """Stores results with the revision they were measured at, for comparing runs."""
+    with open(path, 'w') as results_file:
+        json.dump({'benchmark': benchmark,
+                   'revision': get_revision(),
+                   'python': platform.python_version(),
+                   'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'results': results}, results_file, indent=2, sort_keys=True)
+        results_file.write('\n')
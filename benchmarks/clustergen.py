@@ -0,0 +1,269 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Synthetic cluster configuration for driving the plugins at scale.
+
+generate() returns consistent cloud.* configuration documents for a cluster
+of host_count hosts spread over domain_count network domains. Management
+hosts (one, or three from five hosts up) are placed in the first domain, the
+rest of the hosts are split between the roles of role_mix by weight and
+spread round-robin over the domains. Every generated configuration passes
+the validators of this repository.
+
+Usage: python benchmarks/clustergen.py [--domains N] host_count
+"""
+
+import argparse
+import json
+import math
+import sys
+
+from netaddr import IPNetwork
+
+ROLES = ['controller', 'compute', 'storage', 'caas']
+DEFAULT_ROLE_MIX = {'compute': 70, 'storage': 15, 'caas': 15}
+
+ROLE_SERVICE_PROFILES = {
+    'management': ['management', 'controller'],
+    'controller': ['controller'],
+    'compute': ['compute', 'base'],
+    'storage': ['storage'],
+    'caas': ['caas_worker'],
+}
+ROLE_NETWORK_PROFILES = {
+    'management': 'management_profile',
+    'controller': 'controller_profile',
+    'compute': 'compute_profile',
+    'storage': 'storage_profile',
+    'caas': 'caas_profile',
+}
+ROLE_PERFORMANCE_PROFILES = {'compute': 'compute_perf', 'caas': 'caas_perf'}
+ROLE_STORAGE_PROFILES = {'storage': 'ceph_backend'}
+
+INTERNAL_BASE = '10.0.0.0'
+STORAGE_CLUSTER_BASE = '10.128.0.0'
+EXTERNAL_BASE = '192.168.0.0'
+HWMGMT_BASE = '10.250.0.0'
+EXTERNAL_VLAN = 100
+STORAGE_CLUSTER_VLAN = 200
+SPARE_ADDRESSES = 16
+
+OVS_PROVIDER_NETWORK = 'physnet1'
+CAAS_PROVIDER_NETWORK = 'caas_tenant'
+BONDING_INTERFACES = {'bond0': ['eth0', 'eth1'],
+                      'bond1': ['eth2', 'eth3'],
+                      'bond2': ['eth4', 'eth5']}
+OVS_INTERFACES = {'bond1': {'type': 'ovs', 'provider_networks': [OVS_PROVIDER_NETWORK]}}
+CAAS_INTERFACES = {'bond2': {'type': 'caas', 'provider_networks': [CAAS_PROVIDER_NETWORK]}}
+
+
+def get_role_counts(count, role_mix):
+    total_weight = sum(role_mix.get(role, 0) for role in ROLES)
+    counts = dict((role, 0) for role in ROLES)
+    if not count or not total_weight:
+        return counts
+    remainders = []
+    for role in ROLES:
+        share = float(count) * role_mix.get(role, 0) / total_weight
+        counts[role] = int(share)
+        remainders.append((share - int(share), -ROLES.index(role), role))
+    for _, _, role in sorted(remainders, reverse=True)[:count - sum(counts.values())]:
+        counts[role] += 1
+    return counts
+
+
+def get_host_roles(host_count, role_mix):
+    management_count = 3 if host_count >= 5 else 1
+    counts = get_role_counts(host_count - management_count, role_mix)
+    if management_count == 3 and counts['storage'] < 2:
+        # three management hosts require at least two storage hosts
+        for role in sorted(ROLES, key=lambda role: -counts[role]):
+            while counts['storage'] < 2 and role != 'storage' and counts[role]:
+                counts[role] -= 1
+                counts['storage'] += 1
+    roles = [('controller-%d' % (index + 1), 'management') for index in range(management_count)]
+    for role in ROLES:
+        # extra controllers continue the numbering of the management hosts
+        offset = management_count if role == 'controller' else 0
+        roles.extend(('%s-%d' % (role, offset + index + 1), role)
+                     for index in range(counts[role]))
+    return roles
+
+
+def get_subnet(base, prefixlen, index):
+    first = IPNetwork('%s/%d' % (base, prefixlen))
+    return IPNetwork((first.first + index * first.size, prefixlen))
+
+
+def make_network_domains(names, base, prefixlen, vlan=None, gateway=False):
+    domains = {}
+    for index, name in enumerate(names):
+        subnet = get_subnet(base, prefixlen, index)
+        domain = {'cidr': str(subnet.cidr)}
+        if gateway:
+            domain['gateway'] = str(subnet[1])
+            domain['ip_range_start'] = str(subnet[10])
+            domain['ip_range_end'] = str(subnet[-2])
+        if vlan:
+            domain['vlan'] = vlan
+        domains[name] = domain
+    return domains
+
+
+def make_networking(domain_names, domain_host_count, with_storage, with_caas):
+    prefixlen = 32 - int(math.ceil(math.log(domain_host_count + SPARE_ADDRESSES + 2, 2)))
+    prefixlen = min(prefixlen, 24)
+    networking = {
+        'dns': ['10.255.255.53', '10.255.255.54'],
+        'mtu': 1500,
+        'infra_internal': {
+            'network_domains': make_network_domains(domain_names, INTERNAL_BASE, prefixlen)},
+        'infra_external': {
+            'network_domains': make_network_domains(domain_names, EXTERNAL_BASE, 24,
+                                                    vlan=EXTERNAL_VLAN, gateway=True)},
+        'provider_networks': {OVS_PROVIDER_NETWORK: {'vlan_ranges': '1000:1999'}},
+    }
+    if with_storage:
+        networking['infra_storage_cluster'] = {
+            'network_domains': make_network_domains(domain_names, STORAGE_CLUSTER_BASE,
+                                                    prefixlen, vlan=STORAGE_CLUSTER_VLAN)}
+    if with_caas:
+        networking['provider_networks'][CAAS_PROVIDER_NETWORK] = {'vlan_ranges': '2000:2099'}
+    return networking
+
+
+def make_network_profile(networks, provider_interfaces):
+    bonds = set(['bond0']) | set(provider_interfaces)
+    return {'interface_net_mapping': {'bond0': networks},
+            'bonding_interfaces': dict((bond, BONDING_INTERFACES[bond]) for bond in bonds),
+            'linux_bonding_options': 'mode=active-backup',
+            'ovs_bonding_options': 'mode=active-backup',
+            'provider_network_interfaces': provider_interfaces}
+
+
+def make_network_profiles(roles, with_caas):
+    management_interfaces = dict(OVS_INTERFACES)
+    if with_caas:
+        management_interfaces.update(CAAS_INTERFACES)
+    profiles = {
+        'management_profile': make_network_profile(['infra_internal', 'infra_external'],
+                                                   management_interfaces),
+        'controller_profile': make_network_profile(['infra_internal'], dict(OVS_INTERFACES)),
+        'compute_profile': make_network_profile(['infra_internal'], dict(OVS_INTERFACES)),
+        'storage_profile': make_network_profile(['infra_internal', 'infra_storage_cluster'],
+                                                dict(OVS_INTERFACES)),
+        'caas_profile': make_network_profile(['infra_internal'], dict(CAAS_INTERFACES)),
+    }
+    return dict((ROLE_NETWORK_PROFILES[role], profiles[ROLE_NETWORK_PROFILES[role]])
+                for role in roles)
+
+
+def make_host(index, role, domain, with_caas):
+    hwmgmt_address = IPNetwork('%s/16' % HWMGMT_BASE)[index + 1]
+    host = {'network_domain': domain,
+            'network_profiles': [ROLE_NETWORK_PROFILES[role]],
+            'service_profiles': list(ROLE_SERVICE_PROFILES[role]),
+            'hwmgmt': {'address': str(hwmgmt_address), 'user': 'admin',
+                       'password': 'hwmgmt-password', 'priv_level': 'ADMINISTRATOR'},
+            'mgmt_mac': ['52:54:00:%02x:%02x:%02x' % ((index >> 16) & 0xff,
+                                                      (index >> 8) & 0xff, index & 0xff)]}
+    if role == 'management' and with_caas:
+        host['service_profiles'].append('caas_master')
+    if role in ROLE_PERFORMANCE_PROFILES:
+        host['performance_profiles'] = [ROLE_PERFORMANCE_PROFILES[role]]
+    if role in ROLE_STORAGE_PROFILES:
+        host['storage_profiles'] = [ROLE_STORAGE_PROFILES[role]]
+    return host
+
+
+def generate(host_count, domain_count=1, role_mix=None):
+    roles = get_host_roles(host_count, DEFAULT_ROLE_MIX if role_mix is None else role_mix)
+    role_names = set(role for _, role in roles)
+    with_caas = 'caas' in role_names
+    with_storage = 'storage' in role_names
+    with_openstack = bool(role_names & set(['controller', 'compute', 'storage'])) or \
+        not with_caas
+    domain_names = ['rack-%d' % (index + 1) for index in range(domain_count)]
+
+    hosts = {}
+    domain_host_counts = dict((name, 0) for name in domain_names)
+    for index, (name, role) in enumerate(roles):
+        if role == 'management':
+            domain = domain_names[0]
+        else:
+            domain = domain_names[index % domain_count]
+        domain_host_counts[domain] += 1
+        hosts[name] = make_host(index, role, domain, with_caas)
+
+    config = {
+        'cloud.hosts': hosts,
+        'cloud.networking': make_networking(domain_names, max(domain_host_counts.values()),
+                                            with_storage, with_caas),
+        'cloud.network_profiles': make_network_profiles(role_names, with_caas),
+        'cloud.storage_profiles': {
+            'ceph_backend': {'backend': 'ceph', 'nr_of_ceph_osd_disks': 2,
+                             'openstack_pg_proportion': 0.7, 'caas_pg_proportion': 0.3}},
+        'cloud.performance_profiles': {
+            'compute_perf': {'platform_cpus': {'numa0': 2, 'numa1': 2},
+                             'default_hugepagesz': '1G', 'hugepagesz': '1G', 'hugepages': 32},
+            'caas_perf': {'platform_cpus': {'numa0': 2},
+                          'caas_cpu_pools': {'exclusive_pool_percentage': 50,
+                                             'shared_pool_percentage': 30},
+                          'tuning': 'standard'}},
+        'cloud.caas': {'docker_size_quota': '2G', 'helm_operation_timeout': 900,
+                       'docker0_cidr': '172.17.0.1/16', 'oam_cidr': '10.244.0.0/16',
+                       'instantiation_timeout': 60, 'dns_domain': 'rec.io',
+                       'encrypted_ca': ['Y2VydGlmaWNhdGU='], 'encrypted_ca_key': ['a2V5'],
+                       'tenant_networks': [CAAS_PROVIDER_NETWORK] if with_caas else [],
+                       'caas_only': with_caas and not with_openstack},
+        'cloud.storage': {'backends': {'ceph': {'enabled': with_storage,
+                                                'osd_pool_default_size': 3},
+                                       'lvm': {'enabled': False},
+                                       'external_ceph': {'enabled': False}}},
+        'cloud.openstack': {'admin_password': 'openstack-password',
+                            'storage_backend': 'ceph' if with_storage else 'lvm',
+                            'instance_default_backend': 'rbd' if with_storage else 'default'},
+        'cloud.time': {'zone': 'UTC', 'ntp_servers': ['10.255.255.123', '10.255.255.124'],
+                       'auth_type': 'none', 'serverkeys_path': ''},
+        'cloud.users': {'admin_user_name': 'cloudadmin',
+                        'admin_user_password': '$6$rounds=5000$salt$hash',
+                        'admin_user_authorized_keys': ['ssh-rsa AAAA cloudadmin'],
+                        'initial_user_name': 'cloudinit',
+                        'initial_user_password': 'initial-password'},
+        'cloud.name': 'scale-test',
+        'cloud.version': '2.0.5',
+        'cloud.host_os': {'lockout_time': 300, 'failed_login_attempts': 5},
+    }
+    if not with_caas:
+        del config['cloud.caas']['tenant_networks']
+    return config
+
+
+def to_properties(config):
+    """Returns the configuration as the JSON property strings of the plugin client."""
+    return dict((name, json.dumps(value)) for name, value in config.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic cluster configuration generator')
+    parser.add_argument('host_count', type=int)
+    parser.add_argument('--domains', type=int, default=1, help='network domain count')
+    args = parser.parse_args()
+
+    json.dump(generate(args.host_count, args.domains), sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""End-to-end inventory generation benchmark.
+
+The inventory handlers are run in the order of the plugin loader for every
+installation phase over synthetic clusters (benchmarks/clustergen.py) with
+hw_detect_lib, socket.gethostname and utils.is_virtualized faked. Each
+cluster size and phase runs in its own interpreter so that the peak RSS is
+the one of that run. Wall time and add_host_var/add_global_var calls are
+reported per handler, peak RSS and the JSON size of the inventory per phase.
+
+Usage: python benchmarks/inventory_bench.py [--domains N] [--virtualized]
+                                            [--output results.json] [host_count ...]
+"""
+
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import benchutils
+
+DEFAULT_HOST_COUNTS = [10, 100, 500]
+PHASES = ['bootstrapping', 'provisioning', 'postconfig', 'setup']
+# the plugin loader runs the inventory handlers in module name order
+HANDLERS = ['hwinventory', 'openstackinventory', 'storageinventory', 'zbaremetalnodeinventory']
+COUNTED_CALLS = ['add_host_var', 'add_global_var', 'add_host_group']
+
+
+def make_counted(method, name, counters):
+    def counted(self, *args, **kwargs):
+        counters[name] += 1
+        return method(self, *args, **kwargs)
+    return counted
+
+
+def count_calls(plugin_class, counters):
+    for name in COUNTED_CALLS:
+        setattr(plugin_class, name, make_counted(getattr(plugin_class, name), name, counters))
+
+
+def make_base_inventory(confman):
+    """Returns the inventory the config manager hands to the inventory handlers."""
+    hostsconf = confman.get_hosts_config_handler()
+    netconf = confman.get_networking_config_handler()
+    hosts = {}
+    hostvars = {}
+    for host in hostsconf.get_hosts():
+        hosts[host] = dict(confman.config['cloud.hosts'][host])
+        domain = hostsconf.get_host_network_domain(host)
+        networking = {}
+        for network in hostsconf.get_host_networks(host):
+            networking[network] = {
+                'ip': netconf.get_host_ip(host, network),
+                'mask': netconf.get_network_mask(network, domain),
+                'interface': hostsconf.get_host_network_ip_holding_interface(host, network)}
+        hostvars[host] = {'by_path_disks': {'os': '/dev/sda'}, 'networking': networking}
+    return {'all': {'vars': {'hosts': hosts,
+                             'networking': confman.config['cloud.networking'],
+                             'network_profiles': confman.config['cloud.network_profiles']}},
+            '_meta': {'hostvars': hostvars}}
+
+
+def run_phase(host_count, domain_count, phase, virtualized):
+    benchutils.setup_paths(*benchutils.get_inventoryhandler_dirs())
+    import clustergen
+    from cmdatahandlers.api import configmanager
+    from cmdatahandlers.api import utils
+    from cmframework.apis import cmansibleinventoryconfig
+    from cmpluginutils import ipplan
+
+    config = clustergen.generate(host_count, domain_count)
+    confman = configmanager.ConfigManager(config)
+    # iphandler runs before the inventory handlers
+    ipplan.allocate(confman)
+    installation_host = confman.get_hosts_config_handler().get_installation_host()
+    socket.gethostname = lambda: installation_host
+    utils.is_virtualized = lambda: virtualized
+
+    secrets = tempfile.NamedTemporaryFile(mode='w', suffix='.yml')
+    secrets.write('cinder_ceph_client_uuid: 00000000-0000-0000-0000-000000000000\n')
+    secrets.flush()
+
+    counters = dict((name, 0) for name in COUNTED_CALLS)
+    count_calls(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin, counters)
+    inventory = make_base_inventory(confman)
+    handlers = []
+    for name in HANDLERS:
+        module = __import__(name)
+        if name == 'storageinventory':
+            module.USER_SECRETS = secrets.name
+        for counter in counters:
+            counters[counter] = 0
+        start = time.time()
+        plugin = getattr(module, name)(confman, inventory, installation_host)
+        if name == 'storageinventory':
+            # instead of running ceph-authtool
+            plugin._ceph_keys_dict = dict(('client.%s' % client, 'AQAAAAAAAAAAAA==')
+                                          for client in ('shared', 'glance', 'cinder', 'caas'))
+        getattr(plugin, 'handle_%s' % phase)()
+        handler = {'handler': name, 'ms': (time.time() - start) * 1000}
+        handler.update(counters)
+        handlers.append(handler)
+    secrets.close()
+    return {'hosts': host_count, 'domains': domain_count, 'phase': phase,
+            'handlers': handlers,
+            'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'inventory_bytes': len(json.dumps(inventory))}
+
+
+def run_phase_in_subprocess(host_count, domain_count, phase, virtualized):
+    args = [sys.executable, '-W', 'ignore', os.path.abspath(__file__), '--run', phase,
+            '--domains', str(domain_count), str(host_count)]
+    if virtualized:
+        args.append('--virtualized')
+    return json.loads(subprocess.check_output(args))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inventory generation benchmark')
+    parser.add_argument('host_counts', nargs='*', type=int, default=DEFAULT_HOST_COUNTS)
+    parser.add_argument('--domains', type=int, default=1, help='network domain count')
+    parser.add_argument('--virtualized', action='store_true',
+                        help='fake a virtualized environment')
+    parser.add_argument('--output', help='store the results as JSON')
+    parser.add_argument('--run', choices=PHASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        result = run_phase(args.host_counts[0], args.domains, args.run, args.virtualized)
+        sys.stdout.write(json.dumps(result))
+        return
+
+    results = []
+    rows = []
+    for host_count in args.host_counts:
+        for phase in PHASES:
+            result = run_phase_in_subprocess(host_count, args.domains, phase, args.virtualized)
+            results.append(result)
+            for handler in result['handlers']:
+                rows.append([host_count, phase, handler['handler'], '%.1f' % handler['ms'],
+                             handler['add_host_var'], handler['add_global_var'], '', ''])
+            rows.append([host_count, phase, '(total)',
+                         '%.1f' % sum(handler['ms'] for handler in result['handlers']),
+                         sum(handler['add_host_var'] for handler in result['handlers']),
+                         sum(handler['add_global_var'] for handler in result['handlers']),
+                         result['peak_rss_kib'], result['inventory_bytes'] // 1024])
+    benchutils.print_table(['hosts', 'phase', 'handler', 'ms', 'host vars', 'global vars',
+                            'peak rss KiB', 'inventory KiB'], rows)
+    if args.output:
+        benchutils.write_results(args.output, 'inventory_bench', results)
+
+
+if __name__ == '__main__':
+    main()
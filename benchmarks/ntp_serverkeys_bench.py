@@ -0,0 +1,105 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Latency of TimeValidation with a serverkeys_path served over HTTP.
+
+A local HTTP server stands in for the serverkeys file server, answering
+after a configurable delay and honouring If-None-Match. The validation is
+measured with a cold and a warm serverkeys cache.
+
+Usage: python benchmarks/ntp_serverkeys_bench.py [server_delay_ms]
+"""
+
+import argparse
+import BaseHTTPServer
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+import benchutils
+
+benchutils.setup_paths(benchutils.VALIDATORS_DIR)
+
+from TimeValidation import TimeValidation
+
+SERVERKEYS = ('- 10.0.0.1: {type: iff, keys: [key-1]}\n'
+              '- 10.0.0.2: {type: iff, keys: [key-2]}\n')
+ETAG = '"serverkeys-1"'
+DEFAULT_SERVER_DELAY_MS = 50.0
+
+
+class ServerKeysHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    delay = 0.0
+    requests = 0
+
+    def do_GET(self):
+        ServerKeysHandler.requests += 1
+        time.sleep(self.delay)
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(SERVERKEYS)))
+        self.end_headers()
+        self.wfile.write(SERVERKEYS)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_props(url):
+    return {'cloud.time': json.dumps({'ntp_servers': ['10.0.0.1', '10.0.0.2'],
+                                      'zone': 'Europe/Helsinki',
+                                      'auth_type': 'crypto',
+                                      'serverkeys_path': url})}
+
+
+def timed_validation(validator, props):
+    start = time.time()
+    validator.validate_set(props)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TimeValidation serverkeys fetch latency')
+    parser.add_argument('server_delay_ms', nargs='?', type=float,
+                        default=DEFAULT_SERVER_DELAY_MS, help='response delay of the server')
+    args = parser.parse_args()
+
+    ServerKeysHandler.delay = args.server_delay_ms / 1000
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), ServerKeysHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    props = make_props('http://127.0.0.1:%d/serverkeys.yaml' % server.server_address[1])
+    cache_dir = tempfile.mkdtemp()
+    try:
+        rows = []
+        TimeValidation.serverkeys_cache_dir = cache_dir
+        for cache in ('cold', 'warm'):
+            ServerKeysHandler.requests = 0
+            elapsed = timed_validation(TimeValidation(), props)
+            rows.append([cache, '%.1f' % (elapsed * 1000), ServerKeysHandler.requests])
+        benchutils.print_table(['cache', 'ms', 'requests'], rows)
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
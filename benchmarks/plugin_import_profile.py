@@ -0,0 +1,143 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Plugin startup profile of the validators, activators and inventory handlers.
+
+The config manager loads every module of the plugin directories at start.
+Each plugin module is imported here in a fresh interpreter with the stubbed
+cmframework and cmdatahandlers packages, and the import time, the resident
+memory growth and the slowest imports it triggers (cumulative time, like
+python -X importtime) are shown. The best run of the repeats is kept. The
+(all) row of a directory imports all its modules in one interpreter.
+
+Usage: python benchmarks/plugin_import_profile.py [--repeat N] [--validators]
+                                                  [plugin_dir ...]
+
+Pass the plugin directories of another checkout (e.g. a git worktree of an
+older revision) to compare releases.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import benchutils
+
+DEFAULT_REPEAT = 5
+TOP_IMPORTS = 3
+
+IMPORT_SCRIPT = r'''
+import json, os, sys, time
+try:
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+sys.path[0:0] = %(paths)r
+
+def get_rss():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+original_import = builtins.__import__
+timings = {}
+nested_times = []
+
+def timed_import(name, *args, **kwargs):
+    module_count = len(sys.modules)
+    nested_times.append(0.0)
+    start = time.time()
+    try:
+        return original_import(name, *args, **kwargs)
+    finally:
+        elapsed = time.time() - start
+        nested = nested_times.pop()
+        if nested_times:
+            nested_times[-1] += elapsed
+        if len(sys.modules) > module_count:
+            timing = timings.setdefault(name, [0.0, 0.0])
+            timing[0] += elapsed - nested
+            timing[1] += elapsed
+
+rss = get_rss()
+builtins.__import__ = timed_import
+start = time.time()
+for name in %(modules)r:
+    __import__(name)
+elapsed = time.time() - start
+builtins.__import__ = original_import
+sys.stdout.write(json.dumps({'time': elapsed, 'rss': get_rss() - rss, 'imports': timings}))
+'''
+
+
+def get_plugin_dirs():
+    return [benchutils.VALIDATORS_DIR, benchutils.ACTIVATORS_DIR] + \
+        benchutils.get_inventoryhandler_dirs()
+
+
+def get_plugin_modules(plugin_dir):
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(plugin_dir)
+                  if name.endswith('.py'))
+
+
+def profile_import(plugin_dir, modules, repeat):
+    script = IMPORT_SCRIPT % {'paths': [plugin_dir, benchutils.PLUGINUTILS_DIR,
+                                        benchutils.STUBS_DIR],
+                              'modules': modules}
+    best = None
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-W', 'ignore', '-c', script],
+                                         cwd=plugin_dir)
+        result = json.loads(output)
+        if best is None or result['time'] < best['time']:
+            best = result
+    return best
+
+
+def format_top_imports(modules, imports):
+    cumulative = sorted(((timing[1], name) for name, timing in imports.items()
+                         if name not in modules), reverse=True)
+    return ', '.join('%s %.1f' % (name, elapsed * 1000)
+                     for elapsed, name in cumulative[:TOP_IMPORTS])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plugin startup profile')
+    parser.add_argument('plugin_dirs', nargs='*',
+                        help='plugin directories, by default those of this checkout')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='imports per module, the best is kept')
+    parser.add_argument('--validators', action='store_true',
+                        help='profile only the validators directory')
+    args = parser.parse_args()
+
+    plugin_dirs = [os.path.abspath(path) for path in args.plugin_dirs]
+    if not plugin_dirs:
+        plugin_dirs = [benchutils.VALIDATORS_DIR] if args.validators else get_plugin_dirs()
+    rows = []
+    for plugin_dir in plugin_dirs:
+        modules = get_plugin_modules(plugin_dir)
+        for name, names in [(module, [module]) for module in modules] + [('(all)', modules)]:
+            result = profile_import(plugin_dir, names, args.repeat)
+            rows.append([os.path.relpath(plugin_dir, benchutils.REPO_DIR), name,
+                         '%.1f' % (result['time'] * 1000), result['rss'] // 1024,
+                         format_top_imports(names, result['imports'])])
+    benchutils.print_table(['directory', 'module', 'import ms', 'rss KiB',
+                            'slowest imports (cumulative ms)'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,495 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-memory stand-in of the config manager configuration handlers.
+
+ConfigManager takes the parsed cloud.* properties, e.g. the output of
+benchmarks/clustergen.py, and serves the handler calls made by the plugins
+of this repository. Like the datahandlers, the addresses, VIPs and ports
+are kept in the configuration, and the add_* methods give a host the lowest
+address or port that no other host uses.
+"""
+
+from netaddr import IPAddress
+from netaddr import IPNetwork
+
+from cmdatahandlers.api import configerror
+from serviceprofiles import profiles
+
+INFRA_INTERNAL = 'infra_internal'
+INFRA_EXTERNAL = 'infra_external'
+INFRA_STORAGE_CLUSTER = 'infra_storage_cluster'
+CLOUD_TENANT = 'cloud_tenant'
+NON_NETWORK_KEYS = ('dns', 'mtu', 'provider_networks')
+VBMC_PORT_BASE = 61600
+IPMI_TERMINAL_PORT_BASE = 64000
+
+
+def get_path(config, path):
+    value = config
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            raise configerror.ConfigError('Missing %s configuration' % '.'.join(path))
+        value = value[key]
+    return value
+
+
+class ConfigHandler(object):
+    domain = None
+
+    def __init__(self, confman):
+        self.confman = confman
+        self.config = confman.config
+
+    def get(self, *path):
+        return get_path(self.config, (self.domain,) + path)
+
+    def get_optional(self, default, *path):
+        try:
+            return self.get(*path)
+        except configerror.ConfigError:
+            return default
+
+
+class HostsConfigHandler(ConfigHandler):
+    domain = 'cloud.hosts'
+
+    def get_hosts(self):
+        return sorted(self.get())
+
+    def get_enabled_hosts(self):
+        return [name for name in self.get_hosts() if not self.get(name).get('disabled')]
+
+    def get_installation_host(self):
+        if 'cloud.installation_host' in self.config:
+            return self.config['cloud.installation_host']
+        managements = self.get_service_profile_hosts(
+            profiles.Profiles.get_management_service_profile())
+        if not managements:
+            raise configerror.ConfigError('No installation host')
+        return managements[0]
+
+    def get_service_profile_hosts(self, profile):
+        return [name for name in self.get_hosts() if profile in self.get_service_profiles(name)]
+
+    def get_service_profiles(self, host):
+        return self.get(host, 'service_profiles')
+
+    def get_network_profiles(self, host):
+        return self.get(host, 'network_profiles')
+
+    def get_performance_profiles(self, host):
+        return self.get(host, 'performance_profiles')
+
+    def get_storage_profiles(self, host):
+        return self.get(host, 'storage_profiles')
+
+    def get_host_network_domain(self, host):
+        return self.get(host, 'network_domain')
+
+    def get_hwmgmt_ip(self, host):
+        return self.get(host, 'hwmgmt', 'address')
+
+    def get_hwmgmt_user(self, host):
+        return self.get(host, 'hwmgmt', 'user')
+
+    def get_hwmgmt_password(self, host):
+        return self.get(host, 'hwmgmt', 'password')
+
+    def get_hwmgmt_priv_level(self, host):
+        return self.get_optional('ADMINISTRATOR', host, 'hwmgmt', 'priv_level')
+
+    def get_mgmt_mac(self, host):
+        return self.get_optional([], host, 'mgmt_mac')
+
+    def get_ceph_osd_disks(self, host):
+        return self.get(host, 'ceph_osd_disks')
+
+    def get_pre_allocated_ips(self, host):
+        return self.get_optional(None, host, 'pre_allocated_ips') or {}
+
+    def _add_port(self, host, name, base):
+        confs = self.get()
+        if name not in confs[host]:
+            used = set(conf[name] for conf in confs.values() if name in conf)
+            port = base
+            while port in used:
+                port += 1
+            confs[host][name] = port
+
+    def get_vbmc_port(self, host):
+        return self.get_optional(None, host, 'vbmc_port')
+
+    def set_vbmc_port(self, host, port):
+        self.get(host)['vbmc_port'] = port
+
+    def add_vbmc_port(self, host):
+        self._add_port(host, 'vbmc_port', VBMC_PORT_BASE)
+
+    def get_ipmi_terminal_port(self, host):
+        return self.get_optional(None, host, 'ipmi_terminal_port')
+
+    def set_ipmi_terminal_port(self, host, port):
+        self.get(host)['ipmi_terminal_port'] = port
+
+    def add_ipmi_terminal_port(self, host):
+        self._add_port(host, 'ipmi_terminal_port', IPMI_TERMINAL_PORT_BASE)
+
+    def _get_interface_net_mapping(self, host):
+        # a host without a network profile has no networks
+        profiles = self.get_optional([], host, 'network_profiles')
+        if not profiles:
+            return {}
+        profile = profiles[0]
+        return get_path(self.config, ('cloud.network_profiles', profile, 'interface_net_mapping'))
+
+    def get_host_networks(self, host):
+        networks = []
+        for iface_networks in self._get_interface_net_mapping(host).values():
+            networks.extend(iface_networks)
+        return sorted(networks)
+
+    def get_host_network_interface(self, host, network):
+        for iface, networks in self._get_interface_net_mapping(host).items():
+            if network in networks:
+                return iface
+        raise configerror.ConfigError('Network %s is not mapped for %s' % (network, host))
+
+    def get_host_network_ip_holding_interface(self, host, network):
+        netconf = self.confman.get_networking_config_handler()
+        try:
+            return 'vlan%d' % netconf.get_network_vlan_id(network,
+                                                          self.get_host_network_domain(host))
+        except configerror.ConfigError:
+            return self.get_host_network_interface(host, network)
+
+
+class NetworkingConfigHandler(ConfigHandler):
+    domain = 'cloud.networking'
+
+    def get_networks(self):
+        return sorted(name for name in self.get() if name not in NON_NETWORK_KEYS)
+
+    def get_network_domains(self, network):
+        return sorted(self.get(network, 'network_domains'))
+
+    def _get_domain_conf(self, network, domain):
+        return self.get(network, 'network_domains', domain)
+
+    def get_network_cidr(self, network, domain):
+        return self.get(network, 'network_domains', domain, 'cidr')
+
+    def get_network_mask(self, network, domain):
+        return IPNetwork(self.get_network_cidr(network, domain)).prefixlen
+
+    def get_network_ip_range_start(self, network, domain):
+        domain_conf = self._get_domain_conf(network, domain)
+        return domain_conf.get('ip_range_start', str(IPNetwork(domain_conf['cidr'])[1]))
+
+    def get_network_ip_range_end(self, network, domain):
+        domain_conf = self._get_domain_conf(network, domain)
+        return domain_conf.get('ip_range_end', str(IPNetwork(domain_conf['cidr'])[-2]))
+
+    def get_network_gateway(self, network, domain):
+        return self.get(network, 'network_domains', domain, 'gateway')
+
+    def get_network_vlan_id(self, network, domain):
+        return self.get(network, 'network_domains', domain, 'vlan')
+
+    def get_infra_internal_network_name(self):
+        return INFRA_INTERNAL
+
+    def get_infra_external_network_name(self):
+        return INFRA_EXTERNAL
+
+    def get_infra_storage_cluster_network_name(self):
+        return INFRA_STORAGE_CLUSTER
+
+    def get_cloud_tenant_network_name(self):
+        return CLOUD_TENANT
+
+    def get_dns(self):
+        return self.get('dns')
+
+    def _get_used_ips(self, network):
+        used = set()
+        for host in self.config.get('cloud.hosts', {}).values():
+            for ips in (host.get('networks') or {}, host.get('pre_allocated_ips') or {}):
+                if network in ips:
+                    used.add(IPAddress(ips[network]))
+        if 'vip' in self.get(network):
+            used.add(IPAddress(self.get(network, 'vip')))
+        return used
+
+    def _get_free_ip(self, network, domain):
+        used = self._get_used_ips(network)
+        ip = IPAddress(self.get_network_ip_range_start(network, domain))
+        end = IPAddress(self.get_network_ip_range_end(network, domain))
+        while ip <= end:
+            if ip not in used:
+                return str(ip)
+            ip += 1
+        raise configerror.ConfigError('No free addresses in %s %s' % (network, domain))
+
+    def add_host_networks(self, host):
+        hostsconf = self.confman.get_hosts_config_handler()
+        preallocated = hostsconf.get_pre_allocated_ips(host)
+        for network in hostsconf.get_host_networks(host):
+            try:
+                self.get_host_ip(host, network)
+            except configerror.ConfigError:
+                ip = preallocated.get(network)
+                if ip is None:
+                    ip = self._get_free_ip(network, hostsconf.get_host_network_domain(host))
+                self.set_host_ip(host, network, ip)
+
+    def get_host_ip(self, host, network):
+        ips = self.config.get('cloud.hosts', {}).get(host, {}).get('networks') or {}
+        if network not in ips:
+            raise configerror.ConfigError('No %s address for %s' % (network, host))
+        return ips[network]
+
+    def set_host_ip(self, host, network, ip):
+        get_path(self.config, ('cloud.hosts', host)).setdefault('networks', {})[network] = ip
+
+    def _get_vip(self, network):
+        if 'vip' not in self.get(network):
+            raise configerror.ConfigError('No %s VIP' % network)
+        return self.get(network, 'vip')
+
+    def _add_vip(self, network):
+        if 'vip' not in self.get(network):
+            hostsconf = self.confman.get_hosts_config_handler()
+            domain = hostsconf.get_host_network_domain(hostsconf.get_installation_host())
+            self.get(network)['vip'] = self._get_free_ip(network, domain)
+
+    def add_external_vip(self):
+        self._add_vip(INFRA_EXTERNAL)
+
+    def add_internal_vip(self):
+        self._add_vip(INFRA_INTERNAL)
+
+    def get_external_vip(self):
+        return self._get_vip(INFRA_EXTERNAL)
+
+    def get_internal_vip(self):
+        return self._get_vip(INFRA_INTERNAL)
+
+
+class NetworkProfilesConfigHandler(ConfigHandler):
+    domain = 'cloud.network_profiles'
+
+    def get_profile_bonding_interfaces(self, profile):
+        return sorted(self.get(profile, 'bonding_interfaces'))
+
+    def get_profile_bonded_interfaces(self, profile, bond):
+        return self.get(profile, 'bonding_interfaces', bond)
+
+    def get_profile_linux_bonding_options(self, profile):
+        return self.get(profile, 'linux_bonding_options')
+
+
+class PerformanceProfilesConfigHandler(ConfigHandler):
+    domain = 'cloud.performance_profiles'
+
+    def get_platform_cpus(self, profile):
+        return self.get(profile, 'platform_cpus')
+
+
+class StorageProfilesConfigHandler(ConfigHandler):
+    domain = 'cloud.storage_profiles'
+
+    def get_profile_backend(self, profile):
+        return self.get(profile, 'backend')
+
+    def get_profile_nr_of_ceph_osd_disks(self, profile):
+        return self.get(profile, 'nr_of_ceph_osd_disks')
+
+    def get_profile_ceph_openstack_pg_proportion(self, profile):
+        return self.get(profile, 'openstack_pg_proportion')
+
+    def get_profile_ceph_caas_pg_proportion(self, profile):
+        return self.get(profile, 'caas_pg_proportion')
+
+    def get_profile_lvm_cinder_storage_partitions(self, profile):
+        return self.get(profile, 'lvm_cinder_storage_partitions')
+
+    def get_profile_lvm_instance_storage_partitions(self, profile):
+        return self.get(profile, 'lvm_instance_storage_partitions')
+
+    def get_profile_lvm_instance_cow_lv_storage_percentage(self, profile):
+        return self.get(profile, 'lvm_instance_cow_lv_storage_percentage')
+
+    def get_profile_bare_lvm_mount_options(self, profile):
+        return self.get(profile, 'mount_options')
+
+    def get_profile_bare_lvm_mount_dir(self, profile):
+        return self.get(profile, 'mount_dir')
+
+    def get_profile_bare_lvm_lv_name(self, profile):
+        return self.get(profile, 'lv_name')
+
+
+class StorageConfigHandler(ConfigHandler):
+    domain = 'cloud.storage'
+
+    def is_ceph_enabled(self):
+        return self.get_optional(False, 'backends', 'ceph', 'enabled')
+
+    def is_lvm_enabled(self):
+        return self.get_optional(False, 'backends', 'lvm', 'enabled')
+
+    def is_external_ceph_enabled(self):
+        return self.get_optional(False, 'backends', 'external_ceph', 'enabled')
+
+    def get_ceph_osd_pool_size(self):
+        return self.get('backends', 'ceph', 'osd_pool_default_size')
+
+    def _get_ext_ceph(self, attr):
+        return self.get('backends', 'external_ceph', attr)
+
+    def get_ext_ceph_ceph_user(self):
+        return self._get_ext_ceph('cephuser')
+
+    def get_ext_ceph_ceph_user_key(self):
+        return self._get_ext_ceph('key')
+
+    def get_ext_ceph_fsid(self):
+        return self._get_ext_ceph('fsid')
+
+    def get_ext_ceph_mon_hosts(self):
+        return self._get_ext_ceph('mon_hosts')
+
+    def get_ext_ceph_nova_pool(self):
+        return self._get_ext_ceph('nova_pool')
+
+    def get_ext_ceph_cinder_pool(self):
+        return self._get_ext_ceph('cinder_pool')
+
+    def get_ext_ceph_glance_pool(self):
+        return self._get_ext_ceph('glance_pool')
+
+    def get_ext_ceph_platform_pool(self):
+        return self._get_ext_ceph('platform_pool')
+
+
+class OpenstackConfigHandler(ConfigHandler):
+    domain = 'cloud.openstack'
+
+    def get_admin_password(self):
+        return self.get('admin_password')
+
+    def get_storage_backend(self):
+        return self.get('storage_backend')
+
+    def get_instance_default_backend(self):
+        return self.get('instance_default_backend')
+
+
+class CaasConfigHandler(ConfigHandler):
+    domain = 'cloud.caas'
+
+    def _has_profile(self, profile):
+        hostsconf = self.confman.get_hosts_config_handler()
+        return bool(hostsconf.get_service_profile_hosts(profile))
+
+    def get_caas_only(self):
+        return self.get_optional(False, 'caas_only')
+
+    def get_vnf_flag(self):
+        return self.get_optional(False, 'vnf_embedded')
+
+    def get_admin_password(self):
+        return self.get_optional('caas-password', 'admin_password')
+
+    def is_caas_deployment(self):
+        return (self._has_profile(profiles.Profiles.get_caasmaster_service_profile()) and
+                not self._has_profile(profiles.Profiles.get_compute_service_profile()))
+
+    def is_openstack_deployment(self):
+        return not self._has_profile(profiles.Profiles.get_caasmaster_service_profile())
+
+    def is_hybrid_deployment(self):
+        return (self._has_profile(profiles.Profiles.get_caasmaster_service_profile()) and
+                self._has_profile(profiles.Profiles.get_compute_service_profile()))
+
+    def is_vnf_embedded_deployment(self):
+        return self.get_vnf_flag()
+
+
+class TimeConfigHandler(ConfigHandler):
+    domain = 'cloud.time'
+
+    def get_ntp_servers(self):
+        return self.get('ntp_servers')
+
+    def get_zone(self):
+        return self.get('zone')
+
+
+class UsersConfigHandler(ConfigHandler):
+    domain = 'cloud.users'
+
+    def get_admin_user(self):
+        return self.get('admin_user_name')
+
+    def get_admin_user_password(self):
+        return self.get('admin_user_password')
+
+    def get_admin_user_authorized_keys(self):
+        return self.get_optional([], 'admin_user_authorized_keys')
+
+
+class ConfigManager(object):
+    def __init__(self, config):
+        self.config = config
+        self.handlers = {}
+
+    def _get_handler(self, handler_class):
+        if handler_class not in self.handlers:
+            self.handlers[handler_class] = handler_class(self)
+        return self.handlers[handler_class]
+
+    def get_cloud_installation_date(self):
+        return get_path(self.config, ('cloud.installation_date',))
+
+    def get_hosts_config_handler(self):
+        return self._get_handler(HostsConfigHandler)
+
+    def get_networking_config_handler(self):
+        return self._get_handler(NetworkingConfigHandler)
+
+    def get_network_profiles_config_handler(self):
+        return self._get_handler(NetworkProfilesConfigHandler)
+
+    def get_performance_profiles_config_handler(self):
+        return self._get_handler(PerformanceProfilesConfigHandler)
+
+    def get_storage_profiles_config_handler(self):
+        return self._get_handler(StorageProfilesConfigHandler)
+
+    def get_storage_config_handler(self):
+        return self._get_handler(StorageConfigHandler)
+
+    def get_openstack_config_handler(self):
+        return self._get_handler(OpenstackConfigHandler)
+
+    def get_caas_config_handler(self):
+        return self._get_handler(CaasConfigHandler)
+
+    def get_time_config_handler(self):
+        return self._get_handler(TimeConfigHandler)
+
+    def get_users_config_handler(self):
+        return self._get_handler(UsersConfigHandler)
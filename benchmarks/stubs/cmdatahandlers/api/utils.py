@@ -0,0 +1,27 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from netaddr import IPAddress
+from netaddr import IPNetwork
+
+from cmdatahandlers.api import validation
+
+
+def is_virtualized():
+    return False
+
+
+def validate_ip_in_network(ip, network):
+    if IPAddress(ip) not in IPNetwork(network):
+        raise validation.ValidationError('IP %s not in network %s' % (ip, network))
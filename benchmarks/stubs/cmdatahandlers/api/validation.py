@@ -0,0 +1,52 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from netaddr import IPAddress
+from netaddr import IPNetwork
+from netaddr import IPRange
+
+
+class ValidationError(Exception):
+    def __init__(self, description):
+        super(ValidationError, self).__init__(description)
+        self.description = description
+
+    def __str__(self):
+        return self.description
+
+
+class ValidationUtils(object):
+    def validate_ip_address(self, addr):
+        try:
+            IPAddress(addr)
+        except Exception:
+            raise ValidationError('Invalid IP address %s' % addr)
+
+    def validate_subnet_address(self, subnet):
+        try:
+            IPNetwork(subnet)
+        except Exception:
+            raise ValidationError('Invalid subnet address %s' % subnet)
+
+    def validate_ip_in_subnet(self, addr, subnet):
+        if IPAddress(addr) not in IPNetwork(subnet):
+            raise ValidationError('IP address %s not in subnet %s' % (addr, subnet))
+
+    def validate_ip_range(self, start, end):
+        if IPAddress(start) > IPAddress(end):
+            raise ValidationError('Invalid IP range %s - %s' % (start, end))
+
+    def validate_ip_not_in_range(self, addr, start, end):
+        if IPAddress(addr) in IPRange(start, end):
+            raise ValidationError('IP address %s in range %s - %s' % (addr, start, end))
@@ -0,0 +1,30 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class CMAnsibleInventoryConfigPlugin(object):
+    def __init__(self, confman, inventory, ownhost):
+        self.confman = confman
+        self.inventory = inventory
+        self.ownhost = ownhost
+
+    def add_global_var(self, var, value):
+        self.inventory.setdefault('all', {}).setdefault('vars', {})[var] = value
+
+    def add_host_var(self, host, var, value):
+        hostvars = self.inventory.setdefault('_meta', {}).setdefault('hostvars', {})
+        hostvars.setdefault(host, {})[var] = value
+
+    def add_host_group(self, group, hosts):
+        self.inventory[group] = hosts
@@ -0,0 +1,29 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+def get_hw_type(address, user, password, priv_level='ADMINISTRATOR'):
+    return 'generic'
+
+
+def get_hw_data(address, user, password, priv_level='ADMINISTRATOR'):
+    return {'vendor': 'Generic', 'product_family': 'Generic', 'mgmt_mac': '00:00:00:00:00:00'}
+
+
+def get_os_hd(hw_type):
+    return '/dev/sda'
+
+
+def get_hd_with_usage(hw_type, usage):
+    return ['/dev/sdb', '/dev/sdc'] if usage == 'osd' else []
@@ -0,0 +1,43 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class Profiles(object):
+    def get_service_profiles(self):
+        return ['management', 'controller', 'compute', 'storage', 'base',
+                'caas_master', 'caas_worker']
+
+    @staticmethod
+    def get_management_service_profile():
+        return 'management'
+
+    @staticmethod
+    def get_controller_service_profile():
+        return 'controller'
+
+    @staticmethod
+    def get_compute_service_profile():
+        return 'compute'
+
+    @staticmethod
+    def get_storage_service_profile():
+        return 'storage'
+
+    @staticmethod
+    def get_caasmaster_service_profile():
+        return 'caas_master'
+
+    @staticmethod
+    def get_caasworker_service_profile():
+        return 'caas_worker'
@@ -0,0 +1,116 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Validation round benchmark of the validators.
+
+Every validator gets the synthetic configuration (benchmarks/clustergen.py)
+properties matching its subscription, as in the first validation round of
+a deployment, through a fake plugin client. The latency percentiles of
+validate_set and the get_property/get_properties calls issued per round
+are reported, so that behavior growing faster than the host count shows
+up before it does in production.
+
+Usage: python benchmarks/validation_bench.py [--domains N] [--rounds N]
+                                             [--output results.json] [host_count ...]
+"""
+
+import argparse
+import logging
+import re
+import time
+
+import benchutils
+
+benchutils.setup_paths(benchutils.VALIDATORS_DIR)
+
+import clustergen
+from CaasValidation import CaasValidation
+from HostsValidation import HostsValidation
+from NetworkingValidation import NetworkingValidation
+from NetworkProfilesValidation import NetworkProfilesValidation
+from PerformanceProfilesValidation import PerformanceProfilesValidation
+from SectionValidation import SectionValidation
+from TimeValidation import TimeValidation
+from VersionValidation import VersionValidation
+
+DEFAULT_HOST_COUNTS = [10, 100, 1000]
+DEFAULT_ROUNDS = 20
+PERCENTILES = [50, 90, 99]
+VALIDATORS = [HostsValidation, NetworkingValidation, NetworkProfilesValidation, CaasValidation,
+              PerformanceProfilesValidation, SectionValidation, TimeValidation,
+              VersionValidation]
+
+
+def get_percentile(sorted_values, percentile):
+    index = int(round(percentile / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def get_subscribed_props(validator, props):
+    subscription = re.compile(validator.get_subscription_info())
+    return dict((name, value) for name, value in props.items() if subscription.match(name))
+
+
+def bench_validator(validator_class, props, rounds):
+    client = benchutils.FakePluginClient(props)
+    validator = validator_class()
+    validator.set_plugin_client(client)
+    subscribed = get_subscribed_props(validator, props)
+    latencies = []
+    for _ in range(rounds):
+        start = time.time()
+        validator.validate_set(dict(subscribed))
+        latencies.append((time.time() - start) * 1000)
+    latencies.sort()
+    result = {'validator': validator_class.__name__,
+              'domains': sorted(subscribed),
+              'max_ms': latencies[-1]}
+    for percentile in PERCENTILES:
+        result['p%d_ms' % percentile] = get_percentile(latencies, percentile)
+    for call, count in client.calls.items():
+        result[call] = count // rounds
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validation round benchmark')
+    parser.add_argument('host_counts', nargs='*', type=int, default=DEFAULT_HOST_COUNTS)
+    parser.add_argument('--domains', type=int, default=1, help='network domain count')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS,
+                        help='validation rounds per validator')
+    parser.add_argument('--output', help='store the results as JSON')
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    results = []
+    rows = []
+    for host_count in args.host_counts:
+        props = clustergen.to_properties(clustergen.generate(host_count, args.domains))
+        for validator_class in VALIDATORS:
+            result = bench_validator(validator_class, props, args.rounds)
+            result.update({'hosts': host_count, 'network_domains': args.domains})
+            results.append(result)
+            rows.append([host_count, result['validator']] +
+                        ['%.2f' % result['p%d_ms' % percentile] for percentile in PERCENTILES] +
+                        ['%.2f' % result['max_ms'], result['get_property'],
+                         result['get_properties']])
+    benchutils.print_table(['hosts', 'validator'] +
+                           ['p%d ms' % percentile for percentile in PERCENTILES] +
+                           ['max ms', 'get_property', 'get_properties'], rows)
+    if args.output:
+        benchutils.write_results(args.output, 'validation_bench', results)
+
+
+if __name__ == '__main__':
+    main()
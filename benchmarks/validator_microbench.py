@@ -0,0 +1,159 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Micro-benchmarks of the per-host validation cost of the validators.
+
+Usage: python benchmarks/validator_microbench.py [host_count ...]
+"""
+
+import argparse
+import json
+
+import benchutils
+
+benchutils.setup_paths(benchutils.VALIDATORS_DIR)
+
+from CaasValidation import CaasValidation
+from HostOSValidation import HostOSValidation
+from HostsValidation import HostsValidation
+
+DEFAULT_HOST_COUNTS = [10, 100, 1000]
+
+NETWORK_PROFILES = {
+    'controller': {'interface_net_mapping': {'eth0': ['infra_internal', 'infra_external']}},
+    'compute': {'interface_net_mapping': {'eth0': ['infra_internal']}},
+}
+
+NETWORKING = {
+    'infra_internal': {'network_domains': {'rack-1': {'cidr': '192.168.0.0/16'}}},
+    'infra_external': {'network_domains': {'rack-1': {'cidr': '10.0.0.0/24'}}},
+}
+
+HOST_OS = {'grub2_password': 'grub.pbkdf2.sha512.10000.ABCDEF.0123456789',
+           'lockout_time': 300,
+           'failed_login_attempts': 5}
+
+
+def make_host(index, controller=False):
+    service_profiles = ['management', 'controller', 'base'] if controller else \
+        ['compute', 'base', 'caas_worker']
+    return {'network_domain': 'rack-1',
+            'network_profiles': ['controller' if controller else 'compute'],
+            'service_profiles': service_profiles,
+            'hwmgmt': {'user': 'admin', 'password': 'secret',
+                       'address': '10.1.%d.%d' % (index // 250, index % 250 + 1)},
+            'mgmt_mac': ['52:54:00:%02x:%02x:01' % (index // 256, index % 256)]}
+
+
+def make_hosts(count):
+    hosts = {'controller-1': make_host(0, controller=True)}
+    for index in range(1, count):
+        hosts['compute-%d' % index] = make_host(index)
+    return hosts
+
+
+def make_props(hosts):
+    return {'cloud.hosts': json.dumps(hosts),
+            'cloud.network_profiles': json.dumps(NETWORK_PROFILES),
+            'cloud.networking': json.dumps(NETWORKING),
+            'cloud.storage_profiles': '{}',
+            'cloud.performance_profiles': '{}'}
+
+
+def make_validator(validator_class, props):
+    validator = validator_class()
+    validator.set_plugin_client(benchutils.FakePluginClient(props))
+    return validator
+
+
+def bench_hosts_full(hosts, props):
+    validator = make_validator(HostsValidation, props)
+    validator.full_validation = True
+    return lambda: validator.validate_set({'cloud.hosts': props['cloud.hosts']})
+
+
+def bench_hosts_delta(hosts, props):
+    validator = make_validator(HostsValidation, props)
+    changed = dict(hosts)
+    changed['compute-new'] = make_host(len(hosts))
+    changed_str = json.dumps(changed)
+    return lambda: validator.validate_set({'cloud.hosts': changed_str})
+
+
+def bench_hosts_per_host(hosts, props):
+    validator = make_validator(HostsValidation, props)
+
+    def run():
+        service_profile_list = validator.get_service_profiles()
+        for name, host in hosts.iteritems():
+            validator.validate_host(name, host, NETWORK_PROFILES, {}, {}, NETWORKING,
+                                    service_profile_list)
+    return run
+
+
+def bench_mac_list(hosts, props):
+    validator = make_validator(HostsValidation, props)
+
+    def run():
+        for host in hosts.itervalues():
+            validator.validate_mac_list(host['mgmt_mac'])
+    return run
+
+
+def bench_caas_mandatory(hosts, props):
+    validator = make_validator(CaasValidation, props)
+
+    def run():
+        validator.clear_caches()
+        validator.is_caas_mandatory(props)
+    return run
+
+
+def bench_host_os(hosts, props):
+    validator = make_validator(HostOSValidation, props)
+    host_os = {'cloud.host_os': json.dumps(HOST_OS)}
+
+    def run():
+        for _ in hosts:
+            validator.validate_set(host_os)
+    return run
+
+
+BENCHMARKS = [
+    ('HostsValidation.validate_set (full)', bench_hosts_full),
+    ('HostsValidation.validate_set (one host added)', bench_hosts_delta),
+    ('HostsValidation.validate_host', bench_hosts_per_host),
+    ('HostsValidation.validate_mac_list', bench_mac_list),
+    ('CaasValidation.is_caas_mandatory', bench_caas_mandatory),
+    ('HostOSValidation.validate_set', bench_host_os),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validator micro-benchmarks')
+    parser.add_argument('host_counts', nargs='*', type=int, default=DEFAULT_HOST_COUNTS)
+    args = parser.parse_args()
+
+    rows = []
+    for name, bench in BENCHMARKS:
+        for count in args.host_counts:
+            hosts = make_hosts(count)
+            elapsed = benchutils.measure(bench(hosts, make_props(hosts)))
+            rows.append([name, count, '%.3f' % (elapsed * 1000),
+                         '%.1f' % (elapsed * 1000000 / count)])
+    benchutils.print_table(['benchmark', 'hosts', 'total ms', 'us/host'], rows)
+
+
+if __name__ == '__main__':
+    main()
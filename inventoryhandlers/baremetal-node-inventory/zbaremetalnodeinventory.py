@@ -18,6 +18,7 @@ from jinja2 import Environment
 
 from cmframework.apis import cmansibleinventoryconfig
 from cmdatahandlers.api import utils
+from cmpluginutils import tracing
 
 
 nics_json_txt = """
@@ -37,6 +38,9 @@ nics_json_txt = """
 """
 
 
+TRACER = tracing.get_tracer('zbaremetalnodeinventory')
+
+
 class zbaremetalnodeinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
     def __init__(self, confman, inventory, ownhost):
         super(zbaremetalnodeinventory, self).__init__(confman, inventory, ownhost)
@@ -95,6 +99,7 @@ class zbaremetalnodeinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigP
             routes_list.append({"ip_netmask": route["to"], "next_hop": route["via"]})
         return routes_list
 
+    @TRACER.traced()
     def handle(self):
         usersconf = self.confman.get_users_config_handler()
         hostsconf = self.confman.get_hosts_config_handler()
@@ -192,8 +197,11 @@ class zbaremetalnodeinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigP
                 else:
                     properties["root_device"] = {"name": host_hdd_mapping['os']}
 
-            nics_text = Environment().from_string(nics_json_txt).render(all_vars=all_vars, host=host)
-            nics_inventory = json.loads(nics_text)
+            with TRACER.step('render'):
+                nics_text = Environment().from_string(nics_json_txt).render(all_vars=all_vars, host=host)
+            with TRACER.step('json_parse'):
+                nics_inventory = json.loads(nics_text)
+            TRACER.count('hosts')
 
             driver_info = {}
             driver_info["power"] = power
@@ -21,6 +21,9 @@ from cmframework.apis import cmansibleinventoryconfig
 from cmframework.apis import cmerror
 from cmdatahandlers.api import configerror
 import hw_detector.hw_detect_lib as hw
+from cmpluginutils import tracing
+
+TRACER = tracing.get_tracer('hwinventory')
 
 JSON_HW_HOST_VAR = """
 {
@@ -57,6 +60,7 @@ class hwinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
     def handle_postconfig(self):
 	self.handle()
 
+    @TRACER.traced()
     def handle(self):
         self._set_hw_types()
         self._add_hw_config()
@@ -64,9 +68,11 @@ class hwinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
 
     def _add_hw_config(self):
         try:
-            text = Environment().from_string(JSON_HW_HOST_VAR).render(
-                hosts=self.host_objects)
-            inventory = json.loads(text)
+            with TRACER.step('render'):
+                text = Environment().from_string(JSON_HW_HOST_VAR).render(
+                    hosts=self.host_objects)
+            with TRACER.step('json_parse'):
+                inventory = json.loads(text)
             self.add_global_var("hw_inventory_details", inventory)
 #            for host in inventory.keys():
 #                for var, value in inventory[host].iteritems():
@@ -74,6 +80,7 @@ class hwinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
         except Exception as exp:
             raise cmerror.CMError(str(exp))
 
+    @TRACER.traced('hw_probe')
     def _get_hw_type_of_host(self, name):
         hwmgmt_addr = self._hosts_config_handler.get_hwmgmt_ip(name)
         hwmgmt_user = self._hosts_config_handler.get_hwmgmt_user(name)
@@ -90,3 +97,4 @@ class hwinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
             host_object.product_family = hw_details.get("product_family", "Unknown")
             host_object.mgmt_mac = hw_details.get('info', {}).get("MAC Address", "00:00:00:00:00:00")
             self.host_objects.append(host_object)
+            TRACER.count('hosts')
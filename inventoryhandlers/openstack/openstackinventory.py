@@ -20,6 +20,7 @@ from cmframework.apis import cmerror
 from cmdatahandlers.api import utils
 from cmdatahandlers.api import configerror
 from serviceprofiles import profiles
+from cmpluginutils import tracing
 
 json_text_setup = """
 {
@@ -1165,6 +1166,8 @@ class HAS:
     def __init__(self):
         self.haproxy = HAProxy()
 
+TRACER = tracing.get_tracer('openstackinventory')
+
 class openstackinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
     def __init__(self, confman, inventory, ownhost):
         super(openstackinventory, self).__init__(confman, inventory, ownhost)
@@ -1191,6 +1194,7 @@ class openstackinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin
     def handle_postconfig(self):
         self.handle('postconfig')
 
+    @TRACER.traced()
     def handle_setup(self):
         try:
             ownhostobj = None
@@ -1200,9 +1204,11 @@ class openstackinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin
                     break
             if not ownhostobj:
                 raise cmerror.CMError('Invalid own host configuration %s' % self.ownhost)
-            text = Environment().from_string(json_text_setup).render(host=ownhostobj, installation_controller=self.ownhost, general=self.general)
+            with TRACER.step('render'):
+                text = Environment().from_string(json_text_setup).render(host=ownhostobj, installation_controller=self.ownhost, general=self.general)
 
-            inventory = json.loads(text)
+            with TRACER.step('json_parse'):
+                inventory = json.loads(text)
 
             #add some variables from the original inventory
             self.inventory.update(inventory)
@@ -1234,6 +1240,7 @@ class openstackinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin
         except Exception as exp:
             raise cmerror.CMError(str(exp))
 
+    @TRACER.traced()
     def handle(self, phase):
         try:
             networkingconf = self.confman.get_networking_config_handler()
@@ -1290,9 +1297,12 @@ class openstackinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin
 
             caas_conf = self.confman.get_caas_config_handler()
 
-            text = Environment().from_string(json_text).render(hosts=self.hosts, networks=self.networks, general=self.general, has=self.has, virtual_environment=virtual_environment, installation_controller=installation_controller, installation_controller_ip=installation_controller_ip, infra_mgmt=infra_mgmt, infra_external=infra_external, controllers=self.controllers, computes=self.computes, storages=self.storages, neutron_agent_hosts=self.neutron_agent_hosts, config_phase=phase, hostsconf=hostsconf, networkingconf=networkingconf, storagebackend=storagebackend, vnf_embedded_deployment = caas_conf.get_vnf_flag(), caas_only_deployment = caas_conf.get_caas_only(), management_nodes = self.managements)
+            with TRACER.step('render'):
+                text = Environment().from_string(json_text).render(hosts=self.hosts, networks=self.networks, general=self.general, has=self.has, virtual_environment=virtual_environment, installation_controller=installation_controller, installation_controller_ip=installation_controller_ip, infra_mgmt=infra_mgmt, infra_external=infra_external, controllers=self.controllers, computes=self.computes, storages=self.storages, neutron_agent_hosts=self.neutron_agent_hosts, config_phase=phase, hostsconf=hostsconf, networkingconf=networkingconf, storagebackend=storagebackend, vnf_embedded_deployment = caas_conf.get_vnf_flag(), caas_only_deployment = caas_conf.get_caas_only(), management_nodes = self.managements)
             #print(text)
-            inventory = json.loads(text)
+            with TRACER.step('json_parse'):
+                inventory = json.loads(text)
+            TRACER.count('rendered_bytes', len(text))
 
             #process host vars
             for host in inventory['_meta']['hostvars'].keys():
@@ -1482,6 +1492,7 @@ class openstackinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin
             self.storages.append(host)
 
 
+    @TRACER.traced()
     def _init_jinja_environment(self):
         # initialize networks and hosts
         networkingconf = self.confman.get_networking_config_handler()
@@ -1492,6 +1503,8 @@ class openstackinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin
             for host in hosts:
                 self._get_network(net, host)
                 self._get_host(host)
+        TRACER.count('hosts', len(hosts))
+        TRACER.count('networks', len(networks))
 
         # initialize HAS
         self.has.haproxy.external_vip = networkingconf.get_external_vip()
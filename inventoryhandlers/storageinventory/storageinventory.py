@@ -22,6 +22,7 @@ from cmframework.apis import cmerror
 from cmdatahandlers.api import configerror
 from serviceprofiles import profiles
 import hw_detector.hw_detect_lib as hw
+from cmpluginutils import tracing
 
 
 import math
@@ -670,6 +671,9 @@ class Host(object):
         self.bare_lvm_lv_name = None
 
 
+TRACER = tracing.get_tracer('storageinventory')
+
+
 class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
 
     def __init__(self, confman, inventory, ownhost):
@@ -790,16 +794,22 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
     def handle_setup(self):
         pass
 
+    @staticmethod
+    @TRACER.traced('render')
+    def _render(template, **variables):
+        return Environment().from_string(template).render(**variables)
+
     def _template_and_add_vars_to_hosts(self, template, **variables):
         try:
-            text = Environment().from_string(template).render(variables)
+            text = self._render(template, **variables)
             if text:
                 self._add_vars_for_hosts(text)
         except Exception as exp:
             raise cmerror.CMError(str(exp))
 
     def _add_vars_for_hosts(self, inventory_text):
-        inventory = json.loads(inventory_text)
+        with TRACER.step('json_parse'):
+            inventory = json.loads(inventory_text)
         for host in inventory.keys():
             for var, value in inventory[host].iteritems():
                 self.add_host_var(host, var, value)
@@ -861,16 +871,16 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
 
     def _add_ceph_hosts(self):
         self._add_host_group(
-            Environment().from_string(JSON_CEPH_HOSTS).render(
-                mons=self._mon_hosts,
-                osds=self._osd_hosts,
-                mgrs=self._mgr_hosts))
+            self._render(JSON_CEPH_HOSTS,
+                         mons=self._mon_hosts,
+                         osds=self._osd_hosts,
+                         mgrs=self._mgr_hosts))
 
         self._add_global_parameters(
-            Environment().from_string(JSON_CEPH_HOSTS).render(
-                mons=self._mon_hosts,
-                osds=self._osd_hosts,
-                mgrs=self._mgr_hosts))
+            self._render(JSON_CEPH_HOSTS,
+                         mons=self._mon_hosts,
+                         osds=self._osd_hosts,
+                         mgrs=self._mgr_hosts))
 
     def _add_glance(self):
         if self.is_ceph_backend:
@@ -942,7 +952,8 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
 
     def _add_global_parameters(self, text):
         try:
-            inventory = json.loads(text)
+            with TRACER.step('json_parse'):
+                inventory = json.loads(text)
             for var, value in inventory.iteritems():
                 self.add_global_var(var, value)
         except Exception as exp:
@@ -950,7 +961,8 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
 
     def _add_host_group(self, text):
         try:
-            inventory = json.loads(text)
+            with TRACER.step('json_parse'):
+                inventory = json.loads(text)
             for var, value in inventory.iteritems():
                 self.add_host_group(var, value)
         except Exception as exp:
@@ -978,9 +990,9 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
 
     def _add_networks(self):
         self._add_global_parameters(
-            Environment().from_string(JSON_NETWORK).render(
-                public_networks=self.public_network_cidrs,
-                cluster_networks=self.cluster_network_cidrs))
+            self._render(JSON_NETWORK,
+                         public_networks=self.public_network_cidrs,
+                         cluster_networks=self.cluster_network_cidrs))
 
     def _add_monitor_address(self):
         infra_storage_network = self._networking_config_handler.get_infra_internal_network_name()
@@ -994,29 +1006,29 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
 
         if self._is_collocated_3controllers_config():
             self._add_global_parameters(
-                Environment().from_string(JSON_OVERRIDE_3CONTROLLERS).render(
-                    osd_pool_default_size=ceph_osd_pool_size,
-                    osd_pool_default_min_size=str(ceph_osd_pool_size-1),
-                    osd_pool_default_pg_num=self._calculated_default_pg_num))
+                self._render(JSON_OVERRIDE_3CONTROLLERS,
+                             osd_pool_default_size=ceph_osd_pool_size,
+                             osd_pool_default_min_size=str(ceph_osd_pool_size-1),
+                             osd_pool_default_pg_num=self._calculated_default_pg_num))
 
             self._add_global_parameters(
-                Environment().from_string(JSON_OS_TUNING).render())
+                self._render(JSON_OS_TUNING))
 
         elif self._is_controller_has_compute():
             self._add_global_parameters(
-                Environment().from_string(JSON_OVERRIDE_CACHE).render(
-                    osd_pool_default_size=ceph_osd_pool_size,
-                    osd_pool_default_min_size=str(ceph_osd_pool_size-1),
-                    osd_pool_default_pg_num=self._calculated_default_pg_num))
+                self._render(JSON_OVERRIDE_CACHE,
+                             osd_pool_default_size=ceph_osd_pool_size,
+                             osd_pool_default_min_size=str(ceph_osd_pool_size-1),
+                             osd_pool_default_pg_num=self._calculated_default_pg_num))
 
             self._add_global_parameters(
-                Environment().from_string(JSON_OS_TUNING).render())
+                self._render(JSON_OS_TUNING))
         else:
             self._add_global_parameters(
-                Environment().from_string(JSON_OVERRIDE).render(
-                    osd_pool_default_size=ceph_osd_pool_size,
-                    osd_pool_default_min_size=str(ceph_osd_pool_size-1),
-                    osd_pool_default_pg_num=self._calculated_default_pg_num))
+                self._render(JSON_OVERRIDE,
+                             osd_pool_default_size=ceph_osd_pool_size,
+                             osd_pool_default_min_size=str(ceph_osd_pool_size-1),
+                             osd_pool_default_pg_num=self._calculated_default_pg_num))
 
     def _calculate_pg_num(self, pool_data_percentage):
         pgnum = PGNum(self._total_number_of_osds,
@@ -1058,7 +1070,7 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
 
     def _add_osd_pool_pg_nums(self):
         self._add_global_parameters(
-            Environment().from_string(JSON_OSD_POOL_PGNUMS).render(**self._get_ceph_vars()))
+            self._render(JSON_OSD_POOL_PGNUMS, **self._get_ceph_vars()))
 
     @property
     def _installation_host(self):
@@ -1124,6 +1136,7 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
     def _is_hybrid_deployment(self):
         return self._caas_config_handler.is_hybrid_deployment()
 
+    @TRACER.traced()
     def handle(self, phase):
         self._init_jinja_environment()
         self.add_global_var("external_ceph_configured", self.is_external_ceph_backend)
@@ -1190,6 +1203,7 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
     def _init_host_data(self):
         hosts = self._hosts_config_handler.get_enabled_hosts()
         self.single_node_config = True if len(hosts) == 1 else False
+        TRACER.count('hosts', len(hosts))
         for name in hosts:
             host = self._initialize_host_object(name)
             self.hosts.append(host)
@@ -1247,6 +1261,7 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
         num = self._storage_config_handler.get_ceph_osd_pool_size()
         return 2 if num == 0 else num
 
+    @TRACER.traced()
     def _init_jinja_environment(self):
         self._init_host_data()
 
@@ -1333,6 +1348,7 @@ class storageinventory(cmansibleinventoryconfig.CMAnsibleInventoryConfigPlugin):
     def _is_bare_lvm_configured(self, host_name):
         return self._is_backend_configured('bare_lvm', host_name)
 
+    @TRACER.traced('hw_probe')
     def _get_hw_type(self, name):
         hwmgmt_addr = self._hosts_config_handler.get_hwmgmt_ip(name)
         hwmgmt_user = self._hosts_config_handler.get_hwmgmt_user(name)
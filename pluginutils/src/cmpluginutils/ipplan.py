@@ -0,0 +1,250 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IP address and port plan of a cloud configuration.
+
+allocate() is the allocation of iphandler: the installation host first and
+the rest in the order of the host list, their network addresses and vbmc
+and IPMI terminal ports, then the VIPs. The addresses and ports in use are
+read once into an AddressPool per network domain and a PortPool per port
+kind, and all hosts are assigned from those in one pass, instead of letting
+the config handlers look up the used addresses and ports again for every
+host.
+
+get_plan() makes the same assignment through the handler getters only,
+without writing it to the configuration, and returns it:
+
+    {'hosts': {host: {'networks': {network: ip},
+                      'vbmc_port': port, 'ipmi_terminal_port': port}},
+     'vips': {network: ip}}
+
+The existing hosts keep the allocations stored in the configuration, so
+the plan of a scaled out configuration differs from the previous plan only
+by the new hosts, see diff_plans().
+
+Usage: python -m cmpluginutils.ipplan config.json [previous_plan.json]
+"""
+
+import json
+import sys
+
+from netaddr import IPAddress
+
+from cmdatahandlers.api import configerror
+from cmdatahandlers.api import configmanager
+
+HOST_PORTS = ('vbmc_port', 'ipmi_terminal_port')
+# the first ports the hosts handler hands out
+PORT_BASES = {'vbmc_port': 61600, 'ipmi_terminal_port': 64000}
+
+
+class AddressPool(object):
+    """Free addresses of a network domain range, a bitmap of the used ones.
+
+    allocate() returns the lowest free address or None when the range is
+    exhausted.
+    """
+
+    def __init__(self, first, last):
+        first = IPAddress(first)
+        self.first = int(first)
+        self.version = first.version
+        self._used = bytearray(int(IPAddress(last)) - self.first + 1)
+        self._next = 0
+
+    def reserve(self, ip):
+        offset = int(IPAddress(ip)) - self.first
+        if 0 <= offset < len(self._used):
+            self._used[offset] = 1
+
+    def allocate(self):
+        while self._next < len(self._used) and self._used[self._next]:
+            self._next += 1
+        if self._next == len(self._used):
+            return None
+        self._used[self._next] = 1
+        return str(IPAddress(self.first + self._next, self.version))
+
+
+class PortPool(object):
+    """Free ports from base upwards, allocate() returns the lowest one."""
+
+    def __init__(self, base, used):
+        self._used = set(used)
+        self._next = base
+
+    def allocate(self):
+        while self._next in self._used:
+            self._next += 1
+        self._used.add(self._next)
+        return self._next
+
+
+def _get_hosts(hostsconf):
+    hosts = hostsconf.get_hosts()
+    installation_host = hostsconf.get_installation_host()
+    # Installation host has to be the first one in the list
+    # this so that the IP address of the installation host
+    # does not change during the deployment.
+    hosts.remove(installation_host)
+    hosts.insert(0, installation_host)
+    return hosts
+
+
+def _get_optional(getter, *args):
+    try:
+        return getter(*args)
+    except configerror.ConfigError:
+        return None
+
+
+def _get_pool(pools, netconf, network, domain):
+    if (network, domain) not in pools:
+        pools[(network, domain)] = AddressPool(netconf.get_network_ip_range_start(network, domain),
+                                               netconf.get_network_ip_range_end(network, domain))
+    return pools[(network, domain)]
+
+
+def _allocate_ip(pools, netconf, network, domain):
+    ip = _get_pool(pools, netconf, network, domain).allocate()
+    if ip is None:
+        raise configerror.ConfigError('No free addresses in %s %s' % (network, domain))
+    return ip
+
+
+def _assign(hostsconf, netconf):
+    """Returns the plan of the configuration and the addresses and ports it
+    adds, as [(host, network, ip)] and [(host, port name, port)]."""
+    hosts = _get_hosts(hostsconf)
+    installation_domain = hostsconf.get_host_network_domain(hosts[0])
+    plan = {'hosts': {}, 'vips': {}}
+    pools = {}
+    preallocated = {}
+    # everything in use is reserved before the first address is allocated
+    for host in hosts:
+        networks = {}
+        preallocated[host] = hostsconf.get_pre_allocated_ips(host)
+        for network in hostsconf.get_host_networks(host):
+            networks[network] = _get_optional(netconf.get_host_ip, host, network)
+            pool = _get_pool(pools, netconf, network, hostsconf.get_host_network_domain(host))
+            for ip in (networks[network], preallocated[host].get(network)):
+                if ip:
+                    pool.reserve(ip)
+        plan['hosts'][host] = {'networks': networks,
+                               'vbmc_port': hostsconf.get_vbmc_port(host),
+                               'ipmi_terminal_port': hostsconf.get_ipmi_terminal_port(host)}
+    vips = ((netconf.get_infra_external_network_name(), netconf.get_external_vip),
+            (netconf.get_infra_internal_network_name(), netconf.get_internal_vip))
+    for network, get_vip in vips:
+        plan['vips'][network] = _get_optional(get_vip)
+        if plan['vips'][network]:
+            _get_pool(pools, netconf, network, installation_domain).reserve(plan['vips'][network])
+
+    new_ips = []
+    new_ports = []
+    port_pools = dict((port, PortPool(PORT_BASES[port],
+                                      [entry[port] for entry in plan['hosts'].values()
+                                       if entry[port] is not None]))
+                      for port in HOST_PORTS)
+    for host in hosts:
+        entry = plan['hosts'][host]
+        for network in sorted(entry['networks']):
+            if entry['networks'][network] is None:
+                ip = preallocated[host].get(network)
+                if ip is None:
+                    ip = _allocate_ip(pools, netconf, network,
+                                      hostsconf.get_host_network_domain(host))
+                entry['networks'][network] = ip
+                new_ips.append((host, network, ip))
+        for port in HOST_PORTS:
+            if entry[port] is None:
+                entry[port] = port_pools[port].allocate()
+                new_ports.append((host, port, entry[port]))
+    for network, _ in vips:
+        if plan['vips'][network] is None:
+            plan['vips'][network] = _allocate_ip(pools, netconf, network, installation_domain)
+    return plan, new_ips, new_ports
+
+
+def allocate(confman):
+    """Allocates the addresses and ports of all hosts and the VIPs."""
+    hostsconf = confman.get_hosts_config_handler()
+    netconf = confman.get_networking_config_handler()
+    _, new_ips, new_ports = _assign(hostsconf, netconf)
+    for host, network, ip in new_ips:
+        netconf.set_host_ip(host, network, ip)
+    setters = {'vbmc_port': hostsconf.set_vbmc_port,
+               'ipmi_terminal_port': hostsconf.set_ipmi_terminal_port}
+    for host, port, value in new_ports:
+        setters[port](host, value)
+    # add the vip(s)
+    netconf.add_external_vip()
+    netconf.add_internal_vip()
+
+
+def get_plan(confman):
+    """Returns the plan of the configuration of confman without changing it."""
+    plan, _, _ = _assign(confman.get_hosts_config_handler(),
+                         confman.get_networking_config_handler())
+    return plan
+
+
+def diff_plans(old, new):
+    """Returns the hosts added, removed and changed between two plans, and
+    the changed VIPs as {network: [old ip, new ip]}."""
+    old_hosts = old.get('hosts', {})
+    new_hosts = new.get('hosts', {})
+    diff = {'added': sorted(set(new_hosts) - set(old_hosts)),
+            'removed': sorted(set(old_hosts) - set(new_hosts)),
+            'changed': sorted(name for name in set(old_hosts) & set(new_hosts)
+                              if old_hosts[name] != new_hosts[name]),
+            'vips': {}}
+    for network in set(old.get('vips', {})) | set(new.get('vips', {})):
+        old_vip = old.get('vips', {}).get(network)
+        new_vip = new.get('vips', {}).get(network)
+        if old_vip != new_vip:
+            diff['vips'][network] = [old_vip, new_vip]
+    return diff
+
+
+def format_table(plan):
+    """Returns the plan as host, network, address and host, port name, port
+    lines."""
+    lines = []
+    for name in sorted(plan['hosts']):
+        entry = plan['hosts'][name]
+        for network in sorted(entry['networks']):
+            lines.append('%s %s %s' % (name, network, entry['networks'][network]))
+        for port in HOST_PORTS:
+            if entry.get(port) is not None:
+                lines.append('%s %s %s' % (name, port, entry[port]))
+    for network in sorted(plan['vips']):
+        lines.append('vip %s %s' % (network, plan['vips'][network]))
+    return '\n'.join(lines)
+
+
+def main(args):
+    with open(args[0]) as config_file:
+        config = json.load(config_file)
+    plan = get_plan(configmanager.ConfigManager(config))
+    json.dump(plan, sys.stdout, indent=1, sort_keys=True)
+    sys.stdout.write('\n')
+    if len(args) > 1:
+        with open(args[1]) as previous_file:
+            previous = json.load(previous_file)
+        sys.stderr.write(json.dumps(diff_plans(previous, plan), sort_keys=True) + '\n')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
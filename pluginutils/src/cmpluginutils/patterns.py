@@ -0,0 +1,35 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+HOSTNAME = re.compile(r'^[\da-z][\da-z-]*$')
+MAC_ADDRESS = re.compile(r'[0-9a-f]{2}([-:])[0-9a-f]{2}(\1[0-9a-f]{2}){4}$')
+DIGITS = re.compile(r'^[0-9]+$')
+GRUB2_PASSWORD = re.compile(r'^grub\.pbkdf2\.sha512\.\d+\.[0-9A-F]+\.[0-9A-F]+$')
+
+NETWORK_NAME = re.compile(r'^[a-zA-Z][\da-zA-Z-_]+[\da-zA-Z]$')
+IFACE_NAME = re.compile(r'^[a-z][\da-z]+$', re.IGNORECASE)
+BOND_NAME = re.compile(r'^bond[\d]+$')
+
+CAAS_PROFILE = re.compile(r'caas_master|caas_worker')
+DOCKER_SIZE_QUOTA = re.compile(r'^\d*[G,M,K]$')
+URL_PORT = re.compile(r'^(?:https?|udp|tcp):(?:\/\/)(?:((?:[\w\.-]+|'
+                      r'\[(([1-9a-f][0-9a-f]{0,3}|\:)\:[1-9a-f][0-9a-f]{0,3}){0,7}\])\:[0-9]+))')
+DOMAIN_NAME = re.compile(r'^[a-z0-9]([a-z0-9-\.]{0,253}[a-z0-9])?$')
+
+# this list may not be comprehensive, but it matches ironic's idea
+# of valid privileges.  In practice, we'll likely only see OPERATOR
+# and ADMINISTRATOR.  Case seems to matter here.
+IPMI_PRIVILEGES = frozenset(['USER', 'CALLBACK', 'OPERATOR', 'ADMINISTRATOR'])
@@ -0,0 +1,136 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from cmframework.apis import cmactivator
+
+
+class PlaybookActivator(cmactivator.CMGlobalActivator):
+    """Base of the activators running one playbook on every activation.
+
+    activate_set() runs the playbook on the hosts returned by
+    get_activation_target(), all hosts by default. The content hashes of the
+    properties applied by the successful runs are kept in the memory of the
+    activator, and activate_set() skips the playbook when the properties
+    have not changed since. The hashes are not stored, so after a restart or
+    a switch over to another management node every property is applied
+    again once. activate_full() clears the hashes, a failed run and
+    activate_delete() remove the hashes of their properties. Setting force,
+    or the environment variable CMFRAMEWORK_FORCE_ACTIVATION to 1, disables
+    the skipping.
+
+    The activations run one at a time, and an activation compares its
+    properties with the hashes only after the run in progress has finished,
+    so setting a property back while another value is being applied runs
+    the playbook again.
+    """
+
+    playbook = None
+
+    def __init__(self):
+        super(PlaybookActivator, self).__init__()
+        self.metrics = {'activations': 0, 'runs': 0, 'failures': 0, 'skipped': 0}
+        self.force = os.environ.get(
+            'CMFRAMEWORK_FORCE_ACTIVATION', '').lower() in ('1', 'true', 'yes')
+        self._applied_hashes = {}
+        self._lock = threading.Lock()
+
+    def activate_set(self, props):
+        hashes = dict((name, self._get_hash(value)) for name, value in props.iteritems())
+        with self._lock:
+            self.metrics['activations'] += 1
+            unchanged = all(self._applied_hashes.get(name) == value
+                            for name, value in hashes.iteritems())
+            if unchanged and not self.force:
+                self._skip('%s unchanged' % ', '.join(sorted(props)))
+                return
+            target = self.get_activation_target(props)
+            if target is not None and not target:
+                self._skip('no hosts affected by %s' % ', '.join(sorted(props)))
+                return
+            self._run(target, hashes, props)
+
+    def activate_delete(self, props):
+        with self._lock:
+            self.metrics['activations'] += 1
+            for name in props:
+                self._applied_hashes.pop(name, None)
+            self._run(None, {}, {})
+
+    def activate_full(self, target):
+        with self._lock:
+            self.metrics['activations'] += 1
+            self._applied_hashes = {}
+            self._run(target, {}, {})
+
+    def get_activation_target(self, props):
+        """Returns the hosts to apply the changed properties on.
+
+        None stands for all hosts and an empty collection for no change to
+        apply.
+        """
+        return None
+
+    def _applied(self, props):
+        """Called with the properties of a successful run."""
+        pass
+
+    def _failed(self, props):
+        """Called with the properties of a failed run."""
+        pass
+
+    def _skip(self, reason):
+        self.metrics['skipped'] += 1
+        logging.info('%s: skipped %s, %s', type(self).__name__, self.playbook, reason)
+
+    @staticmethod
+    def _get_target(target):
+        if isinstance(target, (list, tuple, set, frozenset)):
+            return ','.join(sorted(target))
+        return target
+
+    def _run(self, target, hashes, props):
+        target = self._get_target(target)
+        self.metrics['runs'] += 1
+        start = time.time()
+        try:
+            self.run_playbook(self.playbook, target)
+        except Exception:
+            self.metrics['failures'] += 1
+            for name in hashes:
+                self._applied_hashes.pop(name, None)
+            self._failed(props)
+            raise
+        else:
+            self._applied_hashes.update(hashes)
+            self._applied(props)
+        finally:
+            logging.info('%s: ran %s on %s in %.1f s, metrics %s', type(self).__name__,
+                         self.playbook, target or 'all hosts', time.time() - start, self.metrics)
+
+    @staticmethod
+    def _get_hash(value):
+        try:
+            value = json.dumps(json.loads(value), sort_keys=True)
+        except (TypeError, ValueError):
+            pass
+        if not isinstance(value, bytes):
+            value = value.encode('utf-8')
+        return hashlib.sha256(value).hexdigest()
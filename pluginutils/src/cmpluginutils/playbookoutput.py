@@ -0,0 +1,115 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import logging
+import logging.handlers
+import os
+import re
+import threading
+import time
+
+
+class PlaybookOutput(object):
+    """Line by line capture of the output of a playbook run.
+
+    The lines are written to a rotating log file and echoed to a stream, the
+    last lines are kept in memory for failure reports and the time spent in
+    each ansible task is measured from the task headers.
+    """
+
+    TASK_HEADER = re.compile(r'^(TASK|RUNNING HANDLER) \[(?P<name>.*)\]')
+    SECTION_HEADER = re.compile(r'^(PLAY|TASK|RUNNING HANDLER) ')
+
+    def __init__(self, log_path, tail_lines=50, echo=None,
+                 max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.log_path = log_path
+        self.tail = collections.deque(maxlen=tail_lines)
+        self.task_times = {}
+        self.echo = echo
+        self._task = None
+        self._task_start = None
+        self._reader = None
+        self._logger = logging.getLogger('playbookoutput.%s' % log_path)
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._handler = None
+        try:
+            log_dir = os.path.dirname(log_path)
+            if log_dir and not os.path.isdir(log_dir):
+                os.makedirs(log_dir)
+            self._handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=max_bytes, backupCount=backup_count)
+            self._handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self._logger.addHandler(self._handler)
+        except (IOError, OSError) as exc:
+            logging.warning('Cannot write playbook output to %s: %s', log_path, exc)
+
+    def capture(self, stream):
+        self._reader = threading.Thread(target=self._read, args=(stream,))
+        self._reader.daemon = True
+        self._reader.start()
+
+    def wait(self):
+        if self._reader:
+            self._reader.join()
+        self._end_task(time.time())
+        if self._handler:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+    def add_line(self, line):
+        if isinstance(line, bytes) and not isinstance(line, str):
+            line = line.decode('utf-8', 'replace')
+        line = line.rstrip('\r\n')
+        now = time.time()
+        if self.SECTION_HEADER.match(line):
+            self._end_task(now)
+            match = self.TASK_HEADER.match(line)
+            if match:
+                self._task = match.group('name')
+                self._task_start = now
+        self.tail.append(line)
+        self._logger.info(line)
+        if self.echo:
+            try:
+                self.echo.write(line + '\n')
+                self.echo.flush()
+            except (IOError, OSError, ValueError) as exc:
+                logging.warning('Stopped echoing the output of %s: %s', self.log_path, exc)
+                self.echo = None
+
+    def get_slowest_tasks(self, count=10):
+        return sorted(self.task_times.items(), key=lambda item: -item[1])[:count]
+
+    def _read(self, stream):
+        # the stream is drained until its end whatever happens to the lines,
+        # otherwise the writing process blocks on a full pipe
+        failed = False
+        try:
+            for line in iter(stream.readline, b''):
+                try:
+                    self.add_line(line)
+                except Exception as exc:
+                    if not failed:
+                        logging.warning('Cannot process the output of %s: %s', self.log_path, exc)
+                        failed = True
+        finally:
+            stream.close()
+
+    def _end_task(self, now):
+        if self._task is not None:
+            self.task_times[self._task] = self.task_times.get(self._task, 0) + now - self._task_start
+            self._task = None
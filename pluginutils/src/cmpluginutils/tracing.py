@@ -0,0 +1,168 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import json
+import logging
+import os
+import time
+
+TRACE_ENV = 'CMFRAMEWORK_TRACE'
+TRACE_FILE_ENV = 'CMFRAMEWORK_TRACE_FILE'
+
+_config = {'enabled': (os.environ.get(TRACE_ENV, '').lower() in ('1', 'true', 'yes') or
+                       bool(os.environ.get(TRACE_FILE_ENV))),
+           'trace_file': os.environ.get(TRACE_FILE_ENV)}
+_tracers = {}
+
+
+def enable(trace_file=None):
+    _config['enabled'] = True
+    _config['trace_file'] = trace_file
+
+
+def disable():
+    _config['enabled'] = False
+    _config['trace_file'] = None
+
+
+def is_enabled():
+    return _config['enabled']
+
+
+def get_tracer(component):
+    if component not in _tracers:
+        _tracers[component] = Tracer(component)
+    return _tracers[component]
+
+
+def traced_methods(prefix):
+    """Class decorator tracing the methods whose names start with prefix.
+
+    The steps are recorded with the tracer named after the class.
+    """
+    def decorator(cls):
+        tracer = get_tracer(cls.__name__)
+        for name, attr in list(vars(cls).items()):
+            if not name.startswith(prefix):
+                continue
+            if isinstance(attr, (staticmethod, classmethod)):
+                setattr(cls, name, type(attr)(tracer.traced(name)(attr.__func__)))
+            elif callable(attr):
+                setattr(cls, name, tracer.traced(name)(attr))
+        return cls
+    return decorator
+
+
+class _NullStep(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_STEP = _NullStep()
+
+
+class _Step(object):
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        self.tracer._enter(self.start)
+        return self
+
+    def __exit__(self, *args):
+        self.tracer._exit(self.name, time.time() - self.start)
+        return False
+
+
+class Tracer(object):
+    """Per-step durations and counters of one component.
+
+    Steps are recorded only when tracing is enabled, either with enable() or
+    with CMFRAMEWORK_TRACE=1 or the CMFRAMEWORK_TRACE_FILE environment variable.
+    The record is logged, and appended as a JSON line to the trace file if one
+    is given, each time the outermost step of the component finishes.
+    """
+
+    def __init__(self, component):
+        self.component = component
+        self._reset()
+
+    def _reset(self):
+        self.steps = {}
+        self.counters = {}
+        self._depth = 0
+        self._start = None
+
+    def step(self, name):
+        if not _config['enabled']:
+            return _NULL_STEP
+        return _Step(self, name)
+
+    def traced(self, name=None):
+        def decorator(func):
+            step_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not _config['enabled']:
+                    return func(*args, **kwargs)
+                with _Step(self, step_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1):
+        if not _config['enabled']:
+            return
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def _enter(self, start):
+        if self._depth == 0:
+            self._start = start
+        self._depth += 1
+
+    def _exit(self, name, duration):
+        step = self.steps.setdefault(name, {'calls': 0, 'ms': 0.0})
+        step['calls'] += 1
+        step['ms'] += duration * 1000
+        self._depth -= 1
+        if self._depth == 0:
+            self._emit()
+
+    def _emit(self):
+        record = {'component': self.component,
+                  'start': self._start,
+                  'ms': (time.time() - self._start) * 1000,
+                  'steps': self.steps,
+                  'counters': self.counters}
+        steps = sorted(self.steps.items(), key=lambda item: -item[1]['ms'])
+        logging.info('Trace %s: %.1f ms, steps: %s, counters: %s',
+                     self.component, record['ms'],
+                     ', '.join('%s %.1f ms/%d' % (name, step['ms'], step['calls'])
+                               for name, step in steps),
+                     ', '.join('%s=%s' % item for item in sorted(self.counters.items())))
+        if _config['trace_file']:
+            try:
+                with open(_config['trace_file'], 'a') as trace_file:
+                    trace_file.write(json.dumps(record, sort_keys=True) + '\n')
+            except IOError as exc:
+                logging.warning('Failed to write trace file %s: %s', _config['trace_file'], exc)
+        self._reset()
@@ -0,0 +1,163 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+
+class UrlFetchError(Exception):
+    pass
+
+
+class FetchResult(object):
+    def __init__(self, content, validated_as=None):
+        self.content = content
+        # tag given to mark_validated() if the content is the one validated before
+        self.validated_as = validated_as
+
+
+class CachedUrlFetcher(object):
+    """HTTP(S) getter with timeouts, a conditional GET cache and prefetching.
+
+    Contents marked as validated are stored base64 encoded in cache_dir
+    together with their ETag and Last-Modified headers, and revalidated with
+    a conditional GET. A fetch, including the prefetch time, fails when it
+    takes longer than total_timeout seconds. An error of a prefetch is
+    raised by the fetch of the URL.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, cache_dir, connect_timeout=3.05, read_timeout=10, total_timeout=30):
+        self.cache_dir = cache_dir
+        self.timeout = (connect_timeout, read_timeout)
+        self.total_timeout = total_timeout
+        self._responses = {}
+        self._prefetches = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, url):
+        with self._lock:
+            if url in self._prefetches and self._prefetches[url]['thread'].is_alive():
+                return
+            prefetch = self._start_fetch(url)
+            self._prefetches[url] = prefetch
+        prefetch['thread'].start()
+
+    def fetch(self, url):
+        with self._lock:
+            prefetch = self._prefetches.pop(url, None)
+        if prefetch is None:
+            prefetch = self._start_fetch(url)
+            prefetch['thread'].start()
+        prefetch['thread'].join(max(prefetch['deadline'] - time.time(), 0))
+        if prefetch['thread'].is_alive():
+            raise UrlFetchError('Fetching %s timed out' % url)
+        if 'error' in prefetch:
+            raise prefetch['error']
+        return prefetch['result']
+
+    def mark_validated(self, url, tag):
+        with self._lock:
+            response = self._responses.get(url)
+        if response is None:
+            return
+        entry = {'url': url, 'validated_as': tag,
+                 'etag': response['etag'], 'last_modified': response['last_modified'],
+                 'content_base64': base64.b64encode(response['content']).decode('ascii')}
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            with open(self._get_cache_path(url), 'w') as cache_file:
+                json.dump(entry, cache_file)
+        except (IOError, OSError) as exc:
+            logging.debug('Failed to cache %s: %s', url, exc)
+
+    def _start_fetch(self, url):
+        prefetch = {'deadline': time.time() + self.total_timeout}
+        prefetch['thread'] = threading.Thread(target=self._prefetch, args=(url, prefetch))
+        prefetch['thread'].daemon = True
+        return prefetch
+
+    def _prefetch(self, url, prefetch):
+        try:
+            prefetch['result'] = self._fetch(url, prefetch['deadline'])
+        except Exception as exc:
+            prefetch['error'] = exc
+
+    def _set_response(self, url, content, etag, last_modified):
+        with self._lock:
+            self._responses[url] = {'content': content, 'etag': etag,
+                                    'last_modified': last_modified}
+
+    def _read_content(self, url, response, deadline):
+        chunks = []
+        for chunk in response.iter_content(self.CHUNK_SIZE):
+            if time.time() > deadline:
+                response.close()
+                raise UrlFetchError('Fetching %s timed out' % url)
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def _fetch(self, url, deadline):
+        import requests
+
+        cached = self._read_cache(url)
+        headers = {}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+        try:
+            response = requests.get(url, headers=headers, timeout=self.timeout, stream=True)
+            try:
+                if response.status_code == 200:
+                    content = self._read_content(url, response, deadline)
+            finally:
+                response.close()
+        except requests.exceptions.RequestException as exc:
+            raise UrlFetchError('Fetching %s failed: %s' % (url, exc))
+
+        if response.status_code == 304 and cached:
+            self._set_response(url, cached['content'], cached.get('etag'),
+                               cached.get('last_modified'))
+            return FetchResult(cached['content'], cached.get('validated_as'))
+        if response.status_code != 200:
+            raise UrlFetchError('Fetching %s failed with status %s' % (url, response.status_code))
+
+        self._set_response(url, content, response.headers.get('ETag'),
+                           response.headers.get('Last-Modified'))
+        if cached and cached.get('content') == content:
+            return FetchResult(content, cached.get('validated_as'))
+        return FetchResult(content)
+
+    def _read_cache(self, url):
+        try:
+            with open(self._get_cache_path(url)) as cache_file:
+                cached = json.load(cache_file)
+            cached['content'] = base64.b64decode(cached['content_base64'])
+        except (IOError, OSError, ValueError, TypeError, KeyError):
+            return None
+        if cached.get('url') != url:
+            return None
+        return cached
+
+    def _get_cache_path(self, url):
+        return os.path.join(self.cache_dir,
+                            hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
@@ -0,0 +1,57 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+try:
+    STRING_TYPES = basestring
+except NameError:
+    STRING_TYPES = str
+
+# The same rules as the URLValidator of Django, restricted to ASCII host names.
+# The IPv6 pattern only finds the literal, _is_valid_ipv6() validates it.
+DEFAULT_SCHEMES = ('http', 'https', 'ftp', 'ftps')
+
+_IPV4 = r'(?:25[0-5]|2[0-4]\d|[0-1]?\d?\d)(?:\.(?:25[0-5]|2[0-4]\d|[0-1]?\d?\d)){3}'
+_IPV6 = r'\[(?P<ipv6>[0-9a-f:\.]+)\]'
+_HOSTNAME = r'[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?'
+_DOMAIN = r'(?:\.(?!-)[a-z0-9-]{1,63}(?<!-))*'
+_TLD = r'\.(?!-)(?:[a-z-]{2,63}|xn--[a-z0-9]{1,59})(?<!-)\.?'
+_HOST = r'(?:' + _HOSTNAME + _DOMAIN + _TLD + r'|localhost)'
+
+URL = re.compile(r'^(?P<scheme>[a-z0-9\.\-\+]*)://'
+                 r'(?:[^\s:@/]+(?::[^\s:@/]*)?@)?'
+                 r'(?P<host>' + _IPV4 + r'|' + _IPV6 + r'|' + _HOST + r')'
+                 r'(?::\d{2,5})?'
+                 r'(?:[/?#][^\s]*)?\Z', re.IGNORECASE)
+
+
+def is_valid_url(url, schemes=DEFAULT_SCHEMES):
+    if not isinstance(url, STRING_TYPES):
+        return False
+    match = URL.match(url)
+    if not match or match.group('scheme').lower() not in schemes:
+        return False
+    if match.group('ipv6') and not _is_valid_ipv6(match.group('ipv6')):
+        return False
+    return len(match.group('host')) <= 253
+
+
+def _is_valid_ipv6(address):
+    import ipaddr
+    try:
+        ipaddr.IPv6Address(address)
+    except ipaddr.AddressValueError:
+        return False
+    return True
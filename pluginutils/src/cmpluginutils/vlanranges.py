@@ -0,0 +1,85 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+
+
+def find_overlapping(ranges):
+    """Returns the first pair of overlapping [start, end] ranges or None.
+
+    The ranges are swept in the order of their start VLAN, so the check is
+    O(n log n) instead of comparing every range pair.
+    """
+    widest = None
+    for vlan_range in sorted(ranges, key=lambda r: (r[0], r[1])):
+        if widest is not None and vlan_range[0] <= widest[1]:
+            return widest, vlan_range
+        if widest is None or vlan_range[1] > widest[1]:
+            widest = vlan_range
+    return None
+
+
+class VlanRangeSet(object):
+    """Set of VLAN IDs kept as sorted, merged [start, end] intervals."""
+
+    def __init__(self, ranges=None):
+        self._starts = []
+        self._ends = []
+        if ranges:
+            self.update(ranges)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        for start, end in zip(self._starts, self._ends):
+            yield [start, end]
+
+    def __repr__(self):
+        return 'VlanRangeSet(%s)' % list(self)
+
+    def add(self, start, end):
+        lo = bisect.bisect_left(self._ends, start - 1)
+        hi = bisect.bisect_right(self._starts, end + 1)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def update(self, ranges):
+        for vlan_range in ranges:
+            self.add(vlan_range[0], vlan_range[1])
+
+    def contains(self, vid):
+        idx = bisect.bisect_right(self._starts, vid) - 1
+        return idx >= 0 and self._ends[idx] >= vid
+
+    def contains_any(self, vids):
+        for vid in vids:
+            if self.contains(vid):
+                return True
+        return False
+
+    def overlaps_range(self, start, end):
+        idx = bisect.bisect_right(self._starts, end) - 1
+        return idx >= 0 and self._ends[idx] >= start
+
+    def overlaps(self, ranges):
+        if isinstance(ranges, VlanRangeSet) and len(ranges) > len(self):
+            return ranges.overlaps(self)
+        for vlan_range in ranges:
+            if self.overlaps_range(vlan_range[0], vlan_range[1]):
+                return True
+        return False
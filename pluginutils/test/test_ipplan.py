@@ -0,0 +1,211 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import unittest
+
+import testutils
+from cmdatahandlers.api import configerror
+from cmdatahandlers.api import configmanager
+from cmpluginutils import ipplan
+
+
+def make_config(host_count):
+    networking = {
+        'infra_internal': {'network_domains': {
+            'rack-1': {'cidr': '192.168.10.0/24', 'ip_range_start': '192.168.10.10',
+                       'ip_range_end': '192.168.10.250'},
+            'rack-2': {'cidr': '192.168.20.0/24'}}},
+        'infra_external': {'network_domains': {
+            'rack-1': {'cidr': '10.10.0.0/24', 'gateway': '10.10.0.1',
+                       'ip_range_start': '10.10.0.10', 'ip_range_end': '10.10.0.250'}}},
+    }
+    profiles = {
+        'management_profile': {'interface_net_mapping': {'bond0': ['infra_internal',
+                                                                   'infra_external']}},
+        'compute_profile': {'interface_net_mapping': {'bond0': ['infra_internal']}},
+    }
+    hosts = {}
+    for index in range(host_count):
+        management = index < 3
+        hosts['host-%02d' % index] = {
+            'network_domain': 'rack-1' if management or index % 2 else 'rack-2',
+            'network_profiles': ['management_profile' if management else 'compute_profile'],
+            'service_profiles': ['management'] if management else ['compute']}
+    return {'cloud.hosts': hosts, 'cloud.networking': networking,
+            'cloud.network_profiles': profiles, 'cloud.installation_host': 'host-02'}
+
+
+class IpPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.config = make_config(12)
+        self.confman = configmanager.ConfigManager(self.config)
+
+    def _assert_not_allocated(self):
+        hostsconf = self.confman.get_hosts_config_handler()
+        netconf = self.confman.get_networking_config_handler()
+        for host in hostsconf.get_hosts():
+            for network in hostsconf.get_host_networks(host):
+                self.assertRaises(configerror.ConfigError, netconf.get_host_ip, host, network)
+            self.assertTrue(hostsconf.get_vbmc_port(host) is None)
+            self.assertTrue(hostsconf.get_ipmi_terminal_port(host) is None)
+        self.assertRaises(configerror.ConfigError, netconf.get_external_vip)
+        self.assertRaises(configerror.ConfigError, netconf.get_internal_vip)
+
+    def test_plan_does_not_change_the_configuration(self):
+        self.config['cloud.hosts']['host-07']['pre_allocated_ips'] = {
+            'infra_internal': '192.168.10.12'}
+        config = copy.deepcopy(self.config)
+        plan = ipplan.get_plan(self.confman)
+        self.assertEqual(self.config, config)
+        self._assert_not_allocated()
+        self.assertEqual(ipplan.get_plan(self.confman), plan)
+
+    def test_plan_of_an_allocated_configuration_does_not_change_it(self):
+        ipplan.allocate(self.confman)
+        config = copy.deepcopy(self.config)
+        ipplan.get_plan(self.confman)
+        self.assertEqual(self.config, config)
+
+    def test_plan_matches_the_allocation(self):
+        plan = ipplan.get_plan(self.confman)
+        ipplan.allocate(self.confman)
+        hostsconf = self.confman.get_hosts_config_handler()
+        netconf = self.confman.get_networking_config_handler()
+        for host, entry in plan['hosts'].items():
+            for network, ip in entry['networks'].items():
+                self.assertEqual(netconf.get_host_ip(host, network), ip)
+            self.assertEqual(entry['vbmc_port'], hostsconf.get_vbmc_port(host))
+            self.assertEqual(entry['ipmi_terminal_port'], hostsconf.get_ipmi_terminal_port(host))
+            self.assertEqual(sorted(entry['networks']), hostsconf.get_host_networks(host))
+        self.assertEqual(plan['vips'], {'infra_external': netconf.get_external_vip(),
+                                        'infra_internal': netconf.get_internal_vip()})
+
+    def _allocate_per_host(self, config):
+        # the allocation of iphandler before the address and port pools
+        confman = configmanager.ConfigManager(config)
+        hostsconf = confman.get_hosts_config_handler()
+        netconf = confman.get_networking_config_handler()
+        hosts = hostsconf.get_hosts()
+        hosts.remove('host-02')
+        for host in ['host-02'] + hosts:
+            netconf.add_host_networks(host)
+            hostsconf.add_vbmc_port(host)
+            hostsconf.add_ipmi_terminal_port(host)
+        netconf.add_external_vip()
+        netconf.add_internal_vip()
+
+    def test_allocation_matches_the_per_host_allocation(self):
+        hosts = self.config['cloud.hosts']
+        hosts['host-05']['vbmc_port'] = 61601
+        hosts['host-07']['pre_allocated_ips'] = {'infra_internal': '192.168.10.12'}
+        per_host_config = copy.deepcopy(self.config)
+        self._allocate_per_host(per_host_config)
+
+        ipplan.allocate(self.confman)
+        self.assertEqual(self.config, per_host_config)
+        self.assertEqual(hosts['host-02']['vbmc_port'], 61600)
+        self.assertEqual(hosts['host-00']['vbmc_port'], 61602)
+        self.assertEqual(self.confman.get_networking_config_handler().get_host_ip(
+            'host-07', 'infra_internal'), '192.168.10.12')
+
+    def test_scale_out_matches_the_per_host_allocation(self):
+        ipplan.allocate(self.confman)
+        hosts = self.config['cloud.hosts']
+        del hosts['host-04']
+        hosts['host-20'] = dict(hosts['host-06'])
+        del hosts['host-20']['networks']
+        del hosts['host-20']['vbmc_port']
+        hosts['host-21'] = copy.deepcopy(hosts['host-01'])
+        hosts['host-21']['networks'] = {}
+        del hosts['host-21']['ipmi_terminal_port']
+        per_host_config = copy.deepcopy(self.config)
+        self._allocate_per_host(per_host_config)
+
+        ipplan.allocate(self.confman)
+        self.assertEqual(self.config, per_host_config)
+        self.assertEqual(hosts['host-20']['vbmc_port'], 61604)
+
+    def test_address_pool(self):
+        pool = ipplan.AddressPool('10.0.0.1', '10.0.0.4')
+        pool.reserve('10.0.0.2')
+        pool.reserve('10.0.1.2')
+        self.assertEqual([pool.allocate() for _ in range(4)],
+                         ['10.0.0.1', '10.0.0.3', '10.0.0.4', None])
+        pool = ipplan.AddressPool('fd00::fffe', 'fd00::1:1')
+        pool.reserve('fd00::ffff')
+        self.assertEqual([pool.allocate() for _ in range(3)],
+                         ['fd00::fffe', 'fd00::1:0', 'fd00::1:1'])
+
+    def test_port_pool(self):
+        pool = ipplan.PortPool(100, [101, 103, 99])
+        self.assertEqual([pool.allocate() for _ in range(3)], [100, 102, 104])
+
+    def test_installation_host_is_planned_first(self):
+        plan = ipplan.get_plan(self.confman)
+        self.assertEqual(plan['hosts']['host-02']['networks'],
+                         {'infra_internal': '192.168.10.10', 'infra_external': '10.10.0.10'})
+
+    def test_ports_are_planned(self):
+        plan = ipplan.get_plan(self.confman)
+        for port in ipplan.HOST_PORTS:
+            ports = [entry[port] for entry in plan['hosts'].values()]
+            self.assertTrue(None not in ports)
+            self.assertEqual(len(ports), len(set(ports)))
+
+    def test_host_without_network_profile(self):
+        self.config['cloud.hosts']['host-11']['network_profiles'] = []
+        del self.config['cloud.hosts']['host-10']['network_profiles']
+        plan = ipplan.get_plan(self.confman)
+        for host in ('host-10', 'host-11'):
+            self.assertEqual(plan['hosts'][host]['networks'], {})
+            self.assertTrue(plan['hosts'][host]['vbmc_port'] is not None)
+
+    def test_pre_allocated_ips_are_reserved(self):
+        hosts = self.config['cloud.hosts']
+        hosts['host-11']['pre_allocated_ips'] = {'infra_internal': '192.168.10.11'}
+        hosts['host-01']['pre_allocated_ips'] = {'infra_external': '10.10.0.12'}
+        plan = ipplan.get_plan(self.confman)
+        self.assertEqual(plan['hosts']['host-11']['networks']['infra_internal'], '192.168.10.11')
+        self.assertEqual(plan['hosts']['host-01']['networks']['infra_external'], '10.10.0.12')
+        addresses = [ip for entry in plan['hosts'].values() for ip in entry['networks'].values()]
+        self.assertEqual(len(addresses), len(set(addresses)))
+
+    def test_exhausted_range(self):
+        self.config['cloud.networking']['infra_internal']['network_domains']['rack-1'][
+            'ip_range_end'] = '192.168.10.12'
+        self.assertRaises(configerror.ConfigError, ipplan.get_plan, self.confman)
+
+    def test_diff_plans(self):
+        previous = ipplan.get_plan(self.confman)
+        plan = copy.deepcopy(previous)
+        del plan['hosts']['host-03']
+        plan['hosts']['host-12'] = {'networks': {'infra_internal': '192.168.20.40'},
+                                    'vbmc_port': 61612, 'ipmi_terminal_port': 64012}
+        plan['hosts']['host-04']['vbmc_port'] = 61620
+        self.assertEqual(ipplan.diff_plans(previous, plan),
+                         {'added': ['host-12'], 'removed': ['host-03'],
+                          'changed': ['host-04'], 'vips': {}})
+
+    def test_format_table(self):
+        plan = {'hosts': {'host-1': {'networks': {'infra_internal': '192.168.10.10'},
+                                     'vbmc_port': 61600, 'ipmi_terminal_port': 64000}},
+                'vips': {'infra_internal': '192.168.10.11'}}
+        self.assertEqual(ipplan.format_table(plan).splitlines(),
+                         ['host-1 infra_internal 192.168.10.10', 'host-1 vbmc_port 61600',
+                          'host-1 ipmi_terminal_port 64000', 'vip infra_internal 192.168.10.11'])
+
+
+if __name__ == '__main__':
+    unittest.main()
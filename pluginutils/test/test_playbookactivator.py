@@ -0,0 +1,150 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest
+
+import testutils
+from cmpluginutils import playbookactivator
+
+
+class TestActivator(playbookactivator.PlaybookActivator):
+    playbook = 'test.yaml'
+
+    def __init__(self, error=None):
+        super(TestActivator, self).__init__()
+        self.target = None
+        self.error = error
+        self.runs = []
+        self.blocking = False
+        self.running = threading.Event()
+        self.release = threading.Event()
+
+    def run_playbook(self, playbook, target=None):
+        self.runs.append(target)
+        if self.blocking:
+            self.running.set()
+            self.release.wait(5)
+        if self.error:
+            raise self.error
+
+    def get_activation_target(self, props):
+        return self.target
+
+
+class PlaybookActivatorTest(unittest.TestCase):
+    def test_every_activation_runs(self):
+        activator = TestActivator()
+        activator.activate_full('host-1')
+        activator.activate_full(['host-3', 'host-2'])
+        activator.activate_delete({'cloud.time': None})
+        self.assertEqual(activator.runs, ['host-1', 'host-2,host-3', None])
+        self.assertEqual(activator.metrics['runs'], 3)
+
+    def test_failure_is_raised_by_the_activation(self):
+        activator = TestActivator(error=RuntimeError('playbook failed'))
+        self.assertRaises(RuntimeError, activator.activate_set, {'cloud.time': '{}'})
+        self.assertEqual(activator.metrics['failures'], 1)
+
+        activator.error = None
+        activator.activate_full('host-2')
+        self.assertEqual(activator.runs, [None, 'host-2'])
+
+    def test_unchanged_properties_are_skipped(self):
+        activator = TestActivator()
+        activator.activate_set({'cloud.time': '{"zone": "UTC"}'})
+        activator.activate_set({'cloud.time': '{ "zone": "UTC" }'})
+        self.assertEqual(activator.runs, [None])
+        self.assertEqual(activator.metrics['skipped'], 1)
+
+        activator.force = True
+        activator.activate_set({'cloud.time': '{"zone": "UTC"}'})
+        self.assertEqual(activator.runs, [None, None])
+
+    def test_applied_state_is_not_stored(self):
+        activator = TestActivator()
+        activator.activate_set({'cloud.time': '{"zone": "UTC"}'})
+
+        # a restarted activator, or one on another controller, runs again
+        other = TestActivator()
+        other.activate_set({'cloud.time': '{"zone": "UTC"}'})
+        self.assertEqual(other.runs, [None])
+
+    def test_activation_target(self):
+        activator = TestActivator()
+        activator.target = set(['host-1'])
+        activator.activate_set({'cloud.networking': '{"mtu": 1500}'})
+        self.assertEqual(activator.runs, ['host-1'])
+        self.assertEqual(list(activator._applied_hashes), ['cloud.networking'])
+
+        activator.target = set()
+        activator.activate_set({'cloud.networking': '{"mtu": 9000}'})
+        self.assertEqual(activator.runs, ['host-1'])
+        self.assertEqual(activator.metrics['skipped'], 1)
+
+    def test_failure_drops_the_applied_state(self):
+        activator = TestActivator()
+        activator.activate_set({'cloud.time': '{"zone": "UTC"}'})
+        activator.error = RuntimeError('playbook failed')
+        self.assertRaises(RuntimeError, activator.activate_set, {'cloud.time': '{"zone": "EET"}'})
+
+        # the hosts may have been left half way, setting the old value again runs
+        activator.error = None
+        activator.activate_set({'cloud.time': '{"zone": "UTC"}'})
+        self.assertEqual(len(activator.runs), 3)
+
+    def test_value_set_back_during_a_run_is_applied(self):
+        activator = TestActivator()
+        activator.activate_set({'cloud.time': '{"zone": "UTC"}'})
+        activator.blocking = True
+        applying = threading.Thread(target=activator.activate_set,
+                                    args=({'cloud.time': '{"zone": "EET"}'},))
+        applying.start()
+        activator.running.wait(5)
+        reverting = threading.Thread(target=activator.activate_set,
+                                     args=({'cloud.time': '{"zone": "UTC"}'},))
+        reverting.start()
+        reverting.join(0.1)
+        # the revert waits for the run in progress instead of being skipped
+        self.assertTrue(reverting.is_alive())
+        self.assertEqual(activator.metrics['skipped'], 0)
+
+        activator.release.set()
+        applying.join(5)
+        reverting.join(5)
+        self.assertEqual(len(activator.runs), 3)
+        self.assertEqual(activator.metrics['skipped'], 0)
+        self.assertEqual(activator._applied_hashes['cloud.time'],
+                         activator._get_hash('{"zone": "UTC"}'))
+
+    def test_delete_clears_the_deleted_properties(self):
+        activator = TestActivator()
+        activator.activate_set({'cloud.time': '{}'})
+        activator.activate_set({'cloud.users': '{}'})
+        activator.activate_delete({'cloud.time': None})
+        activator.activate_set({'cloud.time': '{}'})
+        activator.activate_set({'cloud.users': '{}'})
+        self.assertEqual(activator.runs, [None, None, None, None])
+        self.assertEqual(activator.metrics['skipped'], 1)
+
+    def test_full_activation_clears_the_applied_state(self):
+        activator = TestActivator()
+        activator.activate_set({'cloud.time': '{}'})
+        activator.activate_full('host-1')
+        activator.activate_set({'cloud.time': '{}'})
+        self.assertEqual(activator.runs, [None, 'host-1', None])
+
+
+if __name__ == '__main__':
+    unittest.main()
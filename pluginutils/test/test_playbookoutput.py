@@ -0,0 +1,144 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import StringIO
+import tempfile
+import unittest
+
+import testutils
+from cmpluginutils import playbookoutput
+
+# lines of a playbook run and the seconds passing before each of them
+PLAYBOOK = [
+    ('PLAY [all] *****\n', 0),
+    ('TASK [Gathering Facts] *****\n', 1),
+    ('ok: [host-1]\n', 4),
+    ('TASK [install packages] *****\n', 1),
+    ('changed: [host-1]\n', 20),
+    ('RUNNING HANDLER [restart service] *****\n', 2),
+    ('changed: [host-1]\n', 3),
+    ('TASK [Gathering Facts] *****\n', 1),
+    ('ok: [host-1]\n', 2),
+    ('PLAY RECAP *****\n', 5),
+    ('host-1 : ok=4 changed=2 failed=0\n', 0),
+]
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeStream(object):
+    """Playbook output that takes its time to arrive on a fake clock."""
+
+    def __init__(self, lines, clock):
+        self.lines = list(lines)
+        self.clock = clock
+        self.closed = False
+
+    def readline(self):
+        if not self.lines:
+            return b''
+        line, delay = self.lines.pop(0)
+        self.clock.now += delay
+        return line.encode('utf-8')
+
+    def close(self):
+        self.closed = True
+
+
+class BrokenEcho(object):
+    def __init__(self):
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        raise IOError('broken pipe')
+
+    def flush(self):
+        pass
+
+
+class PlaybookOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.log_dir, 'logs', 'installation-setup.log')
+        self.clock = FakeClock()
+        self.time = playbookoutput.time
+        playbookoutput.time = self.clock
+
+    def tearDown(self):
+        playbookoutput.time = self.time
+        shutil.rmtree(self.log_dir)
+
+    def _run(self, output, lines=PLAYBOOK):
+        stream = FakeStream(lines, self.clock)
+        output.capture(stream)
+        output.wait()
+        self.assertTrue(stream.closed)
+
+    def test_tail_and_task_times(self):
+        echo = StringIO.StringIO()
+        output = playbookoutput.PlaybookOutput(self.log_path, tail_lines=3, echo=echo)
+        self._run(output)
+        self.assertEqual(list(output.tail), ['ok: [host-1]', 'PLAY RECAP *****',
+                                             'host-1 : ok=4 changed=2 failed=0'])
+        self.assertEqual(output.task_times, {'Gathering Facts': 12, 'install packages': 22,
+                                             'restart service': 4})
+        self.assertEqual(output.get_slowest_tasks(2),
+                         [('install packages', 22), ('Gathering Facts', 12)])
+        expected = ''.join(line for line, _ in PLAYBOOK)
+        self.assertEqual(echo.getvalue(), expected)
+        with open(self.log_path) as log:
+            self.assertEqual([line.split(' ', 2)[2] for line in log],
+                             expected.splitlines(True))
+
+    def test_last_task_ends_with_the_output(self):
+        output = playbookoutput.PlaybookOutput(self.log_path)
+        self._run(output, PLAYBOOK[:5])
+        self.assertEqual(output.task_times, {'Gathering Facts': 5, 'install packages': 20})
+
+    def test_log_is_rotated(self):
+        output = playbookoutput.PlaybookOutput(self.log_path, max_bytes=200, backup_count=2)
+        self._run(output, [('line %d\n' % index, 0) for index in range(100)])
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.log_path))),
+                         ['installation-setup.log', 'installation-setup.log.1',
+                          'installation-setup.log.2'])
+        with open(self.log_path) as log:
+            self.assertTrue(log.readlines()[-1].endswith(' line 99\n'))
+        self.assertEqual(output.tail[-1], 'line 99')
+
+    def test_output_is_drained_when_echo_fails(self):
+        echo = BrokenEcho()
+        output = playbookoutput.PlaybookOutput(self.log_path, echo=echo)
+        self._run(output)
+        self.assertEqual(echo.writes, 1)
+        self.assertTrue(output.echo is None)
+        self.assertEqual(len(output.tail), len(PLAYBOOK))
+
+    def test_unwritable_log(self):
+        open(os.path.join(self.log_dir, 'logs'), 'w').close()
+        output = playbookoutput.PlaybookOutput(self.log_path)
+        self._run(output)
+        self.assertEqual(len(output.tail), len(PLAYBOOK))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import testutils
+from cmpluginutils import tracing
+
+
+class TracingTest(unittest.TestCase):
+    def setUp(self):
+        self.trace_dir = tempfile.mkdtemp()
+        self.trace_file = os.path.join(self.trace_dir, 'trace.json')
+        tracing._tracers.clear()
+        tracing.disable()
+
+    def tearDown(self):
+        tracing.disable()
+        tracing._tracers.clear()
+        shutil.rmtree(self.trace_dir)
+
+    def _read_records(self):
+        with open(self.trace_file) as trace_file:
+            return [json.loads(line) for line in trace_file]
+
+    def test_get_tracer(self):
+        tracer = tracing.get_tracer('HostsValidation')
+        self.assertTrue(tracing.get_tracer('HostsValidation') is tracer)
+        self.assertEqual(tracer.component, 'HostsValidation')
+        self.assertFalse(tracing.get_tracer('CaasValidation') is tracer)
+
+    def test_disabled(self):
+        tracer = tracing.get_tracer('disabled')
+        calls = []
+
+        @tracer.traced()
+        def validate(value):
+            calls.append(value)
+            return value * 2
+
+        with tracer.step('parse'):
+            tracer.count('hosts', 3)
+        self.assertEqual(validate(2), 4)
+        self.assertEqual(calls, [2])
+        self.assertEqual(tracer.steps, {})
+        self.assertEqual(tracer.counters, {})
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    def test_outermost_step_is_recorded(self):
+        tracing.enable(self.trace_file)
+        tracer = tracing.get_tracer('inventory')
+
+        @tracer.traced('render')
+        def render():
+            tracer.count('templates')
+            return 'text'
+
+        with tracer.step('total'):
+            self.assertEqual(render(), 'text')
+            with tracer.step('parse'):
+                tracer.count('hosts', 5)
+            self.assertEqual(render(), 'text')
+            self.assertFalse(os.path.exists(self.trace_file))
+
+        records = self._read_records()
+        self.assertEqual(len(records), 1)
+        record = records[0]
+        self.assertEqual(record['component'], 'inventory')
+        self.assertEqual(sorted(record['steps']), ['parse', 'render', 'total'])
+        self.assertEqual([record['steps'][name]['calls'] for name in ('parse', 'render', 'total')],
+                         [1, 2, 1])
+        self.assertTrue(record['ms'] >= record['steps']['total']['ms'])
+        self.assertEqual(record['counters'], {'hosts': 5, 'templates': 2})
+        self.assertEqual(tracer.steps, {})
+        self.assertEqual(tracer.counters, {})
+
+        render()
+        records = self._read_records()
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1]['steps'].keys(), ['render'])
+
+    def test_failing_step_is_recorded(self):
+        tracing.enable(self.trace_file)
+        tracer = tracing.get_tracer('failing')
+
+        @tracer.traced()
+        def validate():
+            raise ValueError('invalid')
+
+        self.assertRaises(ValueError, validate)
+        self.assertEqual(self._read_records()[0]['steps']['validate']['calls'], 1)
+
+    def test_unwritable_trace_file(self):
+        tracing.enable(os.path.join(self.trace_dir, 'missing', 'trace.json'))
+        tracer = tracing.get_tracer('unwritable')
+        with tracer.step('total'):
+            pass
+        self.assertEqual(tracer.steps, {})
+
+    def test_traced_methods(self):
+        @tracing.traced_methods('validate_')
+        class Validation(object):
+            def validate_hosts(self, hosts):
+                return len(hosts)
+
+            @staticmethod
+            def validate_name(name):
+                return name.upper()
+
+            @classmethod
+            def validate_class(cls):
+                return cls.__name__
+
+            def get_hosts(self):
+                return []
+
+        tracing.enable(self.trace_file)
+        validation = Validation()
+        self.assertEqual(validation.validate_hosts(['host-1']), 1)
+        self.assertEqual(Validation.validate_name('host'), 'HOST')
+        self.assertEqual(validation.validate_class(), 'Validation')
+        self.assertEqual(validation.get_hosts(), [])
+        self.assertEqual(Validation.validate_hosts.__name__, 'validate_hosts')
+        records = self._read_records()
+        self.assertEqual([record['component'] for record in records], ['Validation'] * 3)
+        self.assertEqual([record['steps'].keys() for record in records],
+                         [['validate_hosts'], ['validate_name'], ['validate_class']])
+
+
+class TracingEnvironmentTest(unittest.TestCase):
+    def setUp(self):
+        self.environ = dict((name, os.environ.get(name))
+                            for name in (tracing.TRACE_ENV, tracing.TRACE_FILE_ENV))
+
+    def tearDown(self):
+        for name, value in self.environ.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        reload(tracing)
+
+    def _load(self, trace=None, trace_file=None):
+        for name, value in ((tracing.TRACE_ENV, trace), (tracing.TRACE_FILE_ENV, trace_file)):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        reload(tracing)
+        return tracing.is_enabled(), tracing._config['trace_file']
+
+    def test_trace(self):
+        for value in ('1', 'true', 'True', 'YES'):
+            self.assertEqual(self._load(trace=value), (True, None))
+        for value in ('', '0', 'false', 'no', 'on'):
+            self.assertEqual(self._load(trace=value), (False, None))
+        self.assertEqual(self._load(), (False, None))
+
+    def test_trace_file(self):
+        self.assertEqual(self._load(trace_file='/tmp/trace.json'), (True, '/tmp/trace.json'))
+        self.assertEqual(self._load(trace='0', trace_file='/tmp/trace.json'),
+                         (True, '/tmp/trace.json'))
+        self.assertEqual(self._load(trace_file=''), (False, ''))
+
+
+if __name__ == '__main__':
+    unittest.main()
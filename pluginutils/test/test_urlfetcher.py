@@ -0,0 +1,113 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import BaseHTTPServer
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import testutils
+from cmpluginutils import urlfetcher
+
+CONTENT = b'keys: []\n'
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/slow':
+            # every chunk arrives within the read timeout, the whole body does not
+            self.send_response(200)
+            self.end_headers()
+            for _ in range(20):
+                self.wfile.write(b'x' * 10)
+                self.wfile.flush()
+                time.sleep(0.1)
+            return
+        if self.path == '/missing':
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(CONTENT)))
+        self.end_headers()
+        self.wfile.write(CONTENT)
+
+    def log_message(self, *args):
+        pass
+
+
+class CachedUrlFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever).start()
+        self.url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir)
+
+    def test_validated_content_is_revalidated(self):
+        fetcher = urlfetcher.CachedUrlFetcher(self.cache_dir)
+        result = fetcher.fetch(self.url + '/keys')
+        self.assertEqual(result.content, CONTENT)
+        self.assertTrue(result.validated_as is None)
+        fetcher.mark_validated(self.url + '/keys', 'crypto')
+
+        fetcher = urlfetcher.CachedUrlFetcher(self.cache_dir)
+        fetcher.prefetch(self.url + '/keys')
+        result = fetcher.fetch(self.url + '/keys')
+        self.assertEqual(result.content, CONTENT)
+        self.assertEqual(result.validated_as, 'crypto')
+
+    def test_total_timeout(self):
+        fetcher = urlfetcher.CachedUrlFetcher(self.cache_dir, read_timeout=1, total_timeout=0.5)
+        start = time.time()
+        self.assertRaises(urlfetcher.UrlFetchError, fetcher.fetch, self.url + '/slow')
+        self.assertTrue(time.time() - start < 1)
+
+    def test_total_timeout_includes_the_prefetch(self):
+        fetcher = urlfetcher.CachedUrlFetcher(self.cache_dir, read_timeout=1, total_timeout=0.5)
+        fetcher.prefetch(self.url + '/slow')
+        time.sleep(0.5)
+        start = time.time()
+        self.assertRaises(urlfetcher.UrlFetchError, fetcher.fetch, self.url + '/slow')
+        self.assertTrue(time.time() - start < 0.2)
+
+    def test_error_status(self):
+        fetcher = urlfetcher.CachedUrlFetcher(self.cache_dir)
+        self.assertRaises(urlfetcher.UrlFetchError, fetcher.fetch, self.url + '/missing')
+
+    def test_unexpected_error_is_raised_by_fetch(self):
+        class BrokenFetcher(urlfetcher.CachedUrlFetcher):
+            def _fetch(self, url, deadline):
+                raise RuntimeError('broken')
+
+        fetcher = BrokenFetcher(self.cache_dir)
+        fetcher.prefetch(self.url + '/keys')
+        self.assertRaises(RuntimeError, fetcher.fetch, self.url + '/keys')
+        self.assertRaises(RuntimeError, fetcher.fetch, self.url + '/keys')
+
+
+if __name__ == '__main__':
+    unittest.main()
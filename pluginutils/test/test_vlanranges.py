@@ -0,0 +1,100 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import testutils
+from cmpluginutils import vlanranges
+
+
+class FindOverlappingTest(unittest.TestCase):
+    def test_disjoint(self):
+        self.assertTrue(vlanranges.find_overlapping([[30, 40], [10, 20], [50, 60]]) is None)
+
+    def test_adjacent(self):
+        self.assertTrue(vlanranges.find_overlapping([[21, 30], [10, 20]]) is None)
+
+    def test_touching(self):
+        self.assertEqual(vlanranges.find_overlapping([[20, 30], [10, 20]]),
+                         ([10, 20], [20, 30]))
+
+    def test_nested(self):
+        self.assertEqual(vlanranges.find_overlapping([[12, 14], [10, 20]]),
+                         ([10, 20], [12, 14]))
+
+    def test_nested_in_an_earlier_range(self):
+        # the widest range so far is kept, [25, 26] is checked against [10, 40]
+        self.assertEqual(vlanranges.find_overlapping([[10, 40], [15, 20], [25, 26]]),
+                         ([10, 40], [15, 20]))
+        self.assertEqual(vlanranges.find_overlapping([[10, 40], [41, 50], [25, 26]]),
+                         ([10, 40], [25, 26]))
+
+    def test_duplicate(self):
+        self.assertEqual(vlanranges.find_overlapping([[10, 20], [10, 20]]),
+                         ([10, 20], [10, 20]))
+        self.assertEqual(vlanranges.find_overlapping([[5, 5], [5, 5]]), ([5, 5], [5, 5]))
+
+    def test_empty(self):
+        self.assertTrue(vlanranges.find_overlapping([]) is None)
+        self.assertTrue(vlanranges.find_overlapping([[10, 20]]) is None)
+
+
+class VlanRangeSetTest(unittest.TestCase):
+    def test_disjoint_ranges_are_kept(self):
+        ranges = vlanranges.VlanRangeSet([[30, 40], [10, 20]])
+        self.assertEqual(list(ranges), [[10, 20], [30, 40]])
+
+    def test_adjacent_ranges_are_merged(self):
+        ranges = vlanranges.VlanRangeSet([[21, 30], [10, 20], [31, 31]])
+        self.assertEqual(list(ranges), [[10, 31]])
+
+    def test_touching_and_nested_ranges_are_merged(self):
+        ranges = vlanranges.VlanRangeSet([[10, 20], [20, 30], [12, 14], [50, 60]])
+        self.assertEqual(list(ranges), [[10, 30], [50, 60]])
+        ranges.add(25, 55)
+        self.assertEqual(list(ranges), [[10, 60]])
+
+    def test_duplicate_ranges_are_merged(self):
+        ranges = vlanranges.VlanRangeSet([[10, 20], [10, 20]])
+        self.assertEqual(list(ranges), [[10, 20]])
+
+    def test_contains(self):
+        ranges = vlanranges.VlanRangeSet([[10, 20], [30, 40]])
+        for vid in (10, 15, 20, 30, 40):
+            self.assertTrue(ranges.contains(vid))
+        for vid in (1, 9, 21, 29, 41):
+            self.assertFalse(ranges.contains(vid))
+        self.assertTrue(ranges.contains_any([1, 2, 35]))
+        self.assertFalse(ranges.contains_any([1, 25]))
+        self.assertFalse(ranges.contains_any([]))
+
+    def test_overlaps(self):
+        ranges = vlanranges.VlanRangeSet([[10, 20], [30, 40]])
+        self.assertFalse(ranges.overlaps([[21, 29], [41, 50]]))
+        self.assertTrue(ranges.overlaps([[20, 25]]))
+        self.assertTrue(ranges.overlaps([[1, 100]]))
+        self.assertTrue(ranges.overlaps([[12, 14]]))
+        self.assertTrue(ranges.overlaps([[10, 20]]))
+        self.assertFalse(vlanranges.VlanRangeSet().overlaps(ranges))
+
+    def test_overlaps_a_larger_set(self):
+        ranges = vlanranges.VlanRangeSet([[15, 15]])
+        larger = vlanranges.VlanRangeSet([[1, 2], [10, 20], [30, 40]])
+        self.assertTrue(ranges.overlaps(larger))
+        self.assertTrue(larger.overlaps(ranges))
+        self.assertFalse(vlanranges.VlanRangeSet([[25, 25]]).overlaps(larger))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import netifaces as ni
+import os
 from cmframework.apis import cmuserconfig
 from cmframework.apis import cmerror
 from cmdatahandlers.api import configerror
@@ -22,6 +22,8 @@ from cmdatahandlers.api import utils
 This plugin is used to define the installation node in the system
 """
 class installhandler(cmuserconfig.CMUserConfigPlugin):
+    sys_class_net = '/sys/class/net'
+
     def __init__(self):
         super(installhandler,self).__init__()
 
@@ -37,19 +39,35 @@ class installhandler(cmuserconfig.CMUserConfigPlugin):
 
                 for host in hostsconf.get_hosts():
                     try:
-                        mgmt_addr[host] = hostsconf.get_mgmt_mac(host)[0]
+                        mgmt_addr.setdefault(hostsconf.get_mgmt_mac(host)[0].lower(), host)
                     except IndexError:
                         pass
-                for interface in ni.interfaces():
-                    a = ni.ifaddresses(interface)
-                    mac_list = []
-                    for mac in a[ni.AF_LINK]:
-                        mac_list.append(mac.get('addr', None))
-                    for host, mgmt_mac in mgmt_addr.iteritems():
-                        if mgmt_mac in mac_list:
-                            hostsconf.set_installation_host(host)
-                            return
+                for mac in self._get_local_macs():
+                    if mac in mgmt_addr:
+                        hostsconf.set_installation_host(mgmt_addr[mac])
+                        return
 
             hostsconf.set_installation_host(hostname)
         except configerror.ConfigError as exp:
             raise cmerror.CMError(str(exp))
+
+    def _get_local_macs(self):
+        """Yields the lowercase MAC addresses of the local interfaces."""
+        try:
+            interfaces = sorted(os.listdir(self.sys_class_net))
+        except OSError:
+            interfaces = None
+        if interfaces is not None:
+            for interface in interfaces:
+                try:
+                    with open(os.path.join(self.sys_class_net, interface, 'address')) as address:
+                        yield address.read().strip().lower()
+                except IOError:
+                    continue
+            return
+        # netifaces is needed only where sysfs is not available
+        import netifaces as ni
+        for interface in ni.interfaces():
+            for mac in ni.ifaddresses(interface).get(ni.AF_LINK, []):
+                if mac.get('addr'):
+                    yield mac['addr'].lower()
@@ -16,6 +16,7 @@
 from cmframework.apis import cmuserconfig
 from cmframework.apis import cmerror
 from cmdatahandlers.api import configerror
+from cmpluginutils import ipplan
 """ 
 This plugin is used to add IP addresses for all the host(s) that are defined in 
 the user configuration. The IP addresses will be allocated in the hosts 
@@ -28,21 +29,15 @@ class iphandler(cmuserconfig.CMUserConfigPlugin):
 
     def handle(self, confman):
         try:
-            hostsconf = confman.get_hosts_config_handler()
-            netconf = confman.get_networking_config_handler()
-            hosts = hostsconf.get_hosts()
-            installation_host = hostsconf.get_installation_host()
-            # Installation host has to be the first one in the list
-            # this so that the IP address of the installation host
-            # does not change during the deployment.
-            hosts.remove(installation_host)
-            hosts.insert(0, installation_host)
-            for host in hosts:
-                netconf.add_host_networks(host)
-                hostsconf.add_vbmc_port(host)
-                hostsconf.add_ipmi_terminal_port(host)
-            # add the vip(s)
-            netconf.add_external_vip()
-            netconf.add_internal_vip()
+            ipplan.allocate(confman)
+        except configerror.ConfigError as exp:
+            raise cmerror.CMError(str(exp))
+
+    @staticmethod
+    def get_ip_plan(confman):
+        """Returns the address and port plan of all hosts without changing the
+        configuration, see cmpluginutils.ipplan."""
+        try:
+            return ipplan.get_plan(confman)
         except configerror.ConfigError as exp:
             raise cmerror.CMError(str(exp))
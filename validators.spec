@@ -22,7 +22,7 @@ Vendor:         %{_platform_vendor}
 BuildArch:      noarch
 BuildRequires:  python
 
-Requires: python-django, python-ipaddr
+Requires: python-ipaddr, pluginutils
 
 %define PKG_BASE_DIR /opt/cmframework/validators
 
@@ -14,13 +14,13 @@
 # limitations under the License.
 
 import json
-import re
 import base64
 import logging
-import ipaddr
 from cmframework.apis import cmvalidator
 from cmdatahandlers.api import validation
 from cmdatahandlers.api import configerror
+from cmpluginutils import patterns
+from cmpluginutils import tracing
 
 
 class CaasValidationError(configerror.ConfigError):
@@ -39,18 +39,21 @@ class CaasValidationUtils(object):
         if key not in dictionary:
             raise CaasValidationError("{} cannot be found in {} ".format(key, dictionary))
 
-    def get_every_key_occurrence(self, var, key):
+    def get_key_occurrences(self, var, keys):
+        occurrences = dict((key, []) for key in keys)
+        self._collect_key_occurrences(var, occurrences)
+        return occurrences
+
+    def _collect_key_occurrences(self, var, occurrences):
         if hasattr(var, 'iteritems'):
             for k, v in var.iteritems():
-                if k == key:
-                    yield v
+                if k in occurrences:
+                    occurrences[k].append(v)
                 if isinstance(v, dict):
-                    for result in self.get_every_key_occurrence(v, key):
-                        yield result
+                    self._collect_key_occurrences(v, occurrences)
                 elif isinstance(v, list):
                     for d in v:
-                        for result in self.get_every_key_occurrence(d, key):
-                            yield result
+                        self._collect_key_occurrences(d, occurrences)
 
     @staticmethod
     def is_optional_param_present(key, dictionary):
@@ -66,6 +69,10 @@ class CaasValidationUtils(object):
         return True
 
 
+TRACER = tracing.get_tracer('CaasValidation')
+
+
+@tracing.traced_methods('validate')
 class CaasValidation(cmvalidator.CMValidator):
     SUBSCRIPTION = r'^cloud\.caas|cloud\.hosts|cloud\.networking|cloud\.network_profiles$'
     CAAS_DOMAIN = 'cloud.caas'
@@ -74,11 +81,11 @@ class CaasValidation(cmvalidator.CMValidator):
     NETPROF_DOMAIN = 'cloud.network_profiles'
 
     SERV_PROF = 'service_profiles'
-    CAAS_PROFILE_PATTERN = 'caas_master|caas_worker'
+    CAAS_PROFILE_PATTERN = patterns.CAAS_PROFILE
     CIDR = 'cidr'
 
     DOCKER_SIZE_QUOTA = "docker_size_quota"
-    DOCKER_SIZE_QUOTA_PATTERN = r"^\d*[G,M,K]$"
+    DOCKER_SIZE_QUOTA_PATTERN = patterns.DOCKER_SIZE_QUOTA
 
     HELM_OP_TIMEOUT = "helm_operation_timeout"
 
@@ -96,14 +103,16 @@ class CaasValidation(cmvalidator.CMValidator):
 
     BLOG_FORWARDING = "infra_log_store"
     LOG_FORWARDING = "log_forwarding"
-    URL_PORT_PATTERN = r"^(?:https?|udp|tcp):(?:\/\/)(?:((?:[\w\.-]+|" \
-                       r"\[(([1-9a-f][0-9a-f]{0,3}|\:)\:[1-9a-f][0-9a-f]{0,3}){0,7}\])\:[0-9]+))"
+    URL_PORT_PATTERN = patterns.URL_PORT
     FLUENTD_PLUGINS = ['elasticsearch', 'remote_syslog']
     INFRA_LOG_FLUENTD_PLUGINS = ['elasticsearch', 'remote_syslog']
     LOG_FW_STREAM = ['stdout', 'stderr', 'both']
 
     DOMAIN_NAME = "dns_domain"
-    DOMAIN_NAME_PATTERN = r"^[a-z0-9]([a-z0-9-\.]{0,253}[a-z0-9])?$"
+    DOMAIN_NAME_PATTERN = patterns.DOMAIN_NAME
+
+    INDEXED_KEYS = {HOSTS_DOMAIN: [SERV_PROF],
+                    NETW_DOMAIN: [CIDR]}
 
     def __init__(self):
         cmvalidator.CMValidator.__init__(self)
@@ -111,14 +120,17 @@ class CaasValidation(cmvalidator.CMValidator):
         self.conf = None
         self.caas_conf = None
         self.caas_utils = CaasValidationUtils()
+        self.domain_confs = {}
+        self.key_index = {}
 
     def get_subscription_info(self):
         return self.SUBSCRIPTION
 
     def validate_set(self, props):
+        self.clear_caches()
         if not self.is_caas_mandatory(props):
             logging.info("{} not found in {}, caas validation is not needed.".format(
-                self.CAAS_PROFILE_PATTERN, self.HOSTS_DOMAIN))
+                self.CAAS_PROFILE_PATTERN.pattern, self.HOSTS_DOMAIN))
             return
         self.props_pre_check(props)
         self.validate_docker_size_quota()
@@ -132,21 +144,32 @@ class CaasValidation(cmvalidator.CMValidator):
         self.validate_networks(props)
         self.validate_dns_domain()
 
+    def clear_caches(self):
+        self.domain_confs = {}
+        self.key_index = {}
+
     def _get_conf(self, props, domain):
-        if props.get(domain):
-            conf_str = props[domain]
-        else:
-            conf_str = self.get_plugin_client().get_property(domain)
-        return json.loads(conf_str)
+        if domain not in self.domain_confs:
+            if props.get(domain):
+                conf_str = props[domain]
+            else:
+                conf_str = self.get_plugin_client().get_property(domain)
+                TRACER.count('get_property')
+            self.domain_confs[domain] = json.loads(conf_str)
+        return self.domain_confs[domain]
+
+    def _get_key_occurrences(self, props, domain, key):
+        if domain not in self.key_index:
+            self.key_index[domain] = self.caas_utils.get_key_occurrences(
+                self._get_conf(props, domain), self.INDEXED_KEYS[domain])
+        return self.key_index[domain][key]
 
     def is_caas_mandatory(self, props):
         if not isinstance(props, dict):
             raise CaasValidationError('The given input: {} is not a dictionary!'.format(props))
-        hosts_conf = self._get_conf(props, self.HOSTS_DOMAIN)
-        service_profiles = self.caas_utils.get_every_key_occurrence(hosts_conf, self.SERV_PROF)
-        pattern = re.compile(self.CAAS_PROFILE_PATTERN)
+        service_profiles = self._get_key_occurrences(props, self.HOSTS_DOMAIN, self.SERV_PROF)
         for profile in service_profiles:
-            if filter(pattern.match, profile):
+            if filter(self.CAAS_PROFILE_PATTERN.match, profile):
                 return True
         return False
 
@@ -159,7 +182,7 @@ class CaasValidation(cmvalidator.CMValidator):
     def validate_docker_size_quota(self):
         if not self.caas_utils.is_optional_param_present(self.DOCKER_SIZE_QUOTA, self.caas_conf):
             return
-        if not re.match(self.DOCKER_SIZE_QUOTA_PATTERN, self.caas_conf[self.DOCKER_SIZE_QUOTA]):
+        if not self.DOCKER_SIZE_QUOTA_PATTERN.match(self.caas_conf[self.DOCKER_SIZE_QUOTA]):
             raise CaasValidationError(
                 '{} is not a valid {}!'.format(self.caas_conf[self.DOCKER_SIZE_QUOTA],
                                                self.DOCKER_SIZE_QUOTA))
@@ -172,24 +195,28 @@ class CaasValidation(cmvalidator.CMValidator):
                 '{}:{} is not an integer'.format(self.HELM_OP_TIMEOUT,
                                                  self.caas_conf[self.HELM_OP_TIMEOUT]))
 
+    @staticmethod
+    def _ip_network(cidr):
+        import ipaddr
+        return ipaddr.IPNetwork(cidr)
+
     def get_netw_obj(self, subnet, parameter):
         try:
-            return ipaddr.IPNetwork(subnet)
+            return self._ip_network(subnet)
         except ValueError as exc:
             raise CaasValidationError('{} is an invalid subnet address: {}'.format(
                 parameter, exc))
 
     def check_cidr_overlaps_with_netw_subnets(self, cidr_in, props, parameter):
-        netw_conf = self._get_conf(props, self.NETW_DOMAIN)
-        cidrs = self.caas_utils.get_every_key_occurrence(netw_conf, self.CIDR)
+        cidrs = self._get_key_occurrences(props, self.NETW_DOMAIN, self.CIDR)
         for cidr in cidrs:
-            if cidr_in.overlaps(ipaddr.IPNetwork(cidr)):
+            if cidr_in.overlaps(self._ip_network(cidr)):
                 raise CaasValidationError(
                     'CIDR configured for {} shall be an unused IP range, '
                     'but it overlaps with {} from {}.'.format(parameter, cidr,
                                                               self.NETW_DOMAIN))
     def check_oam_cidr_prefix(self, cidr_obj):
-        if ipaddr.IPNetwork(cidr_obj).prefixlen != 16:
+        if self._ip_network(cidr_obj).prefixlen != 16:
             raise CaasValidationError('Wrong subnet size in caas.oam_cidr parameter. '
                                       'The currently supported subnet size is 16')
 
@@ -243,8 +270,8 @@ class CaasValidation(cmvalidator.CMValidator):
                             'You can\'t set "kube-system" as namespace in "{}"!'.format(
                                 self.LOG_FORWARDING))
                     self.caas_utils.check_key_in_dict('target_url', list_item)
-                    if not list_item['target_url'] or not re.match(self.URL_PORT_PATTERN,
-                                                                   list_item['target_url']):
+                    if (not list_item['target_url'] or
+                            not self.URL_PORT_PATTERN.match(list_item['target_url'])):
                         raise CaasValidationError(
                             '"target_url" property {} not valid!'.format(list_item['target_url']))
                     if not url_d:
@@ -290,35 +317,50 @@ class CaasValidation(cmvalidator.CMValidator):
         # pylint: disable=too-many-locals,too-many-nested-blocks
         hosts_conf = self._get_conf(props, self.HOSTS_DOMAIN)
         netprof_conf = self._get_conf(props, self.NETPROF_DOMAIN)
+        caas_hosts = self._get_caas_network_profile_hosts(hosts_conf, netprof_conf)
         net_iface_map = {}
         for net in caas_nets:
             net_iface_map[net] = None
-            for host, host_conf in hosts_conf.iteritems():
-                # Validate only nodes that can host containerized workloads
-                if ('caas_worker' in host_conf[self.SERV_PROF] or
-                        ('caas_master' in host_conf[self.SERV_PROF] and
-                         'compute' not in host_conf[self.SERV_PROF])):
-                    # Validating CaaS network 'net' mapping in 'host'
-                    profiles = host_conf.get('network_profiles')
-                    if isinstance(profiles, list) and profiles:
-                        net_prof = netprof_conf.get(profiles[0])
-                    if net_prof is not None:
-                        ifaces = net_prof.get('provider_network_interfaces', {})
-                        caas_provider_interfaces = self._filter_provider_networks_by_type(
-                            self._filter_provider_networkinterfaces_by_net(ifaces, net), 'caas')
-                        sriov_networks = net_prof.get('sriov_provider_networks', {})
-                        caas_sriov_networks_present = bool(
-                            net in sriov_networks and
-                            sriov_networks[net].get('type', "") == 'caas')
-                        if not caas_provider_interfaces and not caas_sriov_networks_present:
-                            raise CaasValidationError('CaaS network {} missing from host {}'
-                                                      .format(net, host))
-                        if caas_provider_interfaces:
-                            self._validate_homogenous_provider_net_setup(
-                                net_iface_map, net, ifaces)
-                        if caas_sriov_networks_present:
-                            self._validate_homogenous_sriov_provider_net_setup(
-                                net_iface_map, net, sriov_networks)
+            # Once the network is mapped the checks no longer change the map,
+            # a host then fails exactly like the previous host with its profile
+            mapped_profiles = set()
+            for host, profile, net_prof in caas_hosts:
+                if profile in mapped_profiles:
+                    continue
+                if net_iface_map[net] is not None:
+                    mapped_profiles.add(profile)
+                # Validating CaaS network 'net' mapping in 'host'
+                ifaces = net_prof.get('provider_network_interfaces', {})
+                caas_provider_interfaces = self._filter_provider_networks_by_type(
+                    self._filter_provider_networkinterfaces_by_net(ifaces, net), 'caas')
+                sriov_networks = net_prof.get('sriov_provider_networks', {})
+                caas_sriov_networks_present = bool(
+                    net in sriov_networks and
+                    sriov_networks[net].get('type', "") == 'caas')
+                if not caas_provider_interfaces and not caas_sriov_networks_present:
+                    raise CaasValidationError('CaaS network {} missing from host {}'
+                                              .format(net, host))
+                if caas_provider_interfaces:
+                    self._validate_homogenous_provider_net_setup(
+                        net_iface_map, net, ifaces)
+                if caas_sriov_networks_present:
+                    self._validate_homogenous_sriov_provider_net_setup(
+                        net_iface_map, net, sriov_networks)
+
+    def _get_caas_network_profile_hosts(self, hosts_conf, netprof_conf):
+        """Returns the CaaS capable hosts with their network profile, as
+        (host, profile name, network profile) in the order of the hosts."""
+        caas_hosts = []
+        for host, host_conf in hosts_conf.iteritems():
+            # Validate only nodes that can host containerized workloads
+            if ('caas_worker' in host_conf[self.SERV_PROF] or
+                    ('caas_master' in host_conf[self.SERV_PROF] and
+                     'compute' not in host_conf[self.SERV_PROF])):
+                profiles = host_conf.get('network_profiles')
+                profile = profiles[0] if isinstance(profiles, list) and profiles else None
+                if profile is not None and netprof_conf.get(profile) is not None:
+                    caas_hosts.append((host, profile, netprof_conf[profile]))
+        return caas_hosts
 
     @staticmethod
     def _filter_provider_networks_by_type(profile, net_type):
@@ -372,7 +414,7 @@ class CaasValidation(cmvalidator.CMValidator):
         domain = self.caas_conf[self.DOMAIN_NAME]
         if not self.caas_utils.is_optional_param_present(self.DOMAIN_NAME, self.caas_conf):
             return
-        if not re.match(self.DOMAIN_NAME_PATTERN, domain):
+        if not self.DOMAIN_NAME_PATTERN.match(domain):
             raise CaasValidationError('{} is not a valid {} !'.format(
                 domain,
                 self.DOMAIN_NAME))
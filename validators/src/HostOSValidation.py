@@ -15,15 +15,17 @@
 
 import logging
 import json
-import re
 
 from cmframework.apis import cmvalidator
 from cmdatahandlers.api import validation
+from cmpluginutils import patterns
+from cmpluginutils import tracing
 
 
+@tracing.traced_methods('validate')
 class HostOSValidation(cmvalidator.CMValidator):
     domain = 'cloud.host_os'
-    GRUB2_PASSWORD_PATTERN = r"^grub\.pbkdf2\.sha512\.\d+\.[0-9A-F]+\.[0-9A-F]+$"
+    GRUB2_PASSWORD_PATTERN = patterns.GRUB2_PASSWORD
 
     def get_subscription_info(self):
         logging.debug('get_subscription info called')
@@ -62,13 +64,13 @@ class HostOSValidation(cmvalidator.CMValidator):
         raise validation.ValidationError('%s cannot be deleted' % self.domain)
 
     def validate_passwd_hash(self, passwd_hash):
-        if not re.match(self.GRUB2_PASSWORD_PATTERN, passwd_hash):
+        if not self.GRUB2_PASSWORD_PATTERN.match(passwd_hash):
             raise validation.ValidationError('The passwd hash: "%s" is not a valid hash!' % passwd_hash)
 
     def validate_lockout_time(self, _lockout_time):
-        if not re.match(r"^[0-9]+$", str(_lockout_time)):
+        if not patterns.DIGITS.match(str(_lockout_time)):
             raise validation.ValidationError('The lockout time: "%s" is not valid!' % _lockout_time)
 
     def validate_failed_login_attempts(self, _failed_login_attempts):
-        if not re.match(r"^[0-9]+$", str(_failed_login_attempts)):
+        if not patterns.DIGITS.match(str(_failed_login_attempts)):
             raise validation.ValidationError('The failed login attempts: "%s" is not valid!' % _failed_login_attempts)
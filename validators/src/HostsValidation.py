@@ -15,7 +15,7 @@
 
 import logging
 import json
-import re
+import os
 from netaddr import IPRange
 from netaddr import IPNetwork
 
@@ -23,12 +23,18 @@ from cmframework.apis import cmvalidator
 from cmdatahandlers.api import validation
 from cmdatahandlers.api import utils
 from serviceprofiles import profiles as service_profiles
+from cmpluginutils import patterns
+from cmpluginutils import tracing
 
 
 class ConfigurationDoesNotExist(Exception):
     pass
 
 
+TRACER = tracing.get_tracer('HostsValidation')
+
+
+@tracing.traced_methods('validate')
 class HostsValidation(cmvalidator.CMValidator):
     domain = 'cloud.hosts'
     management_profile = 'management'
@@ -45,6 +51,13 @@ class HostsValidation(cmvalidator.CMValidator):
     MIN_PASSWORD_LENGTH = 8
     caas_service_profiles = (caas_master_profile, caas_worker_profile)
 
+    def __init__(self):
+        cmvalidator.CMValidator.__init__(self)
+        # CMFRAMEWORK_FULL_VALIDATION=1 runs the per host checks for all the hosts
+        self.full_validation = os.environ.get(
+            'CMFRAMEWORK_FULL_VALIDATION', '').lower() in ('1', 'true', 'yes')
+        self.service_profiles = None
+
     def get_subscription_info(self):
         logging.debug('get_subscription info called')
         hosts = r'cloud\.hosts'
@@ -79,7 +92,8 @@ class HostsValidation(cmvalidator.CMValidator):
                                     net_profile_dict,
                                     storage_profile_dict,
                                     perf_profile_dict,
-                                    networking_dict)
+                                    networking_dict,
+                                    self.get_changed_hosts(dict_key_value, value_dict))
 
                 self.validate_scale_in(dict_key_value)
 
@@ -213,13 +227,8 @@ class HostsValidation(cmvalidator.CMValidator):
 
     def validate_hosts(self, hosts_config, nw_profile_config,
                        storage_profile_config, perf_profile_config,
-                       networking_config):
-        net_profile_list = [] if not nw_profile_config \
-                              else nw_profile_config.keys()
-        storage_profile_list = [] if not storage_profile_config else storage_profile_config.keys()
-        performance_profile_list = [] if not perf_profile_config else perf_profile_config.keys()
-
-        service_profile_list = service_profiles.Profiles().get_service_profiles()
+                       networking_config, changed_hosts=None):
+        service_profile_list = self.get_service_profiles()
 
         bases = []
         storages = []
@@ -227,100 +236,20 @@ class HostsValidation(cmvalidator.CMValidator):
         managements = []
 
         for key, value in hosts_config.iteritems():
-            # Hostname
-            if not re.match(r'^[\da-z][\da-z-]*$', key) or len(key) > 63:
-                raise validation.ValidationError('Invalid hostname %s' % key)
-
-            # Network domain
-            attr = 'network_domain'
-            network_domain = value.get(attr)
-            if not network_domain:
-                reason = 'Missing %s for %s' % (attr, key)
-                raise validation.ValidationError(reason)
-
-            # Network profiles
-            attr = 'network_profiles'
-            profiles = value.get(attr)
-            self.validate_profile_list(profiles, net_profile_list, key, attr)
-            if len(profiles) != 1:
-                reason = 'More than one %s defined for %s' % (attr, key)
-                raise validation.ValidationError(reason)
-
-            nw_profile_name = profiles[0]
-            subnet_name = 'infra_internal'
-            if not self.network_is_mapped(nw_profile_config.get(nw_profile_name), subnet_name):
-                raise validation.ValidationError('%s is not mapped for %s' % (subnet_name, key))
-
-            # Performance profiles
-            attr = 'performance_profiles'
-            perf_profile = None
-            profiles = value.get(attr)
-            if profiles:
-                self.validate_profile_list(profiles, performance_profile_list,
-                                           key, attr)
-                if len(profiles) != 1:
-                    reason = 'More than one %s defined for %s' % (attr, key)
-                    raise validation.ValidationError(reason)
-                perf_profile = profiles[0]
-                self.validate_nonempty_performance_profile(perf_profile_config, perf_profile, key)
+            if changed_hosts is None or key in changed_hosts:
+                TRACER.count('hosts')
+                self.validate_host(key, value, nw_profile_config, storage_profile_config,
+                                   perf_profile_config, networking_config, service_profile_list)
 
-            if self.is_provider_type_ovs_dpdk(nw_profile_name, nw_profile_config):
-                if not profiles:
-                    reason = 'Missing performance profiles with ovs_dpdk type provider network'
-                    raise validation.ValidationError(reason)
-                self.validate_performance_profile(perf_profile_config, perf_profile)
-
-            # Service profiles
-            attr = 'service_profiles'
-            profiles = value.get(attr)
-            self.validate_profile_list(profiles, service_profile_list, key, attr)
-            if self.is_provider_type_ovs_dpdk(nw_profile_name, nw_profile_config):
-                if self.base_profile not in profiles:
-                    reason = 'Missing base service profile with ovs_dpdk type provider network'
-                    raise validation.ValidationError(reason)
-            if self.is_provider_type_sriov(nw_profile_name, nw_profile_config):
-                if not self.is_sriov_allowed_for_host(profiles):
-                    reason = 'Missing base or caas_* service profile'
-                    reason += ' with SR-IOV type provider network'
-                    raise validation.ValidationError(reason)
-            if perf_profile:
-                if not self.is_perf_allowed_for_host(profiles):
-                    reason = 'Missing base or caas_* service profile'
-                    reason += ' with performance profile host'
-                    raise validation.ValidationError(reason)
+            profiles = value.get('service_profiles')
             if self.management_profile in profiles:
                 managements.append(key)
-                subnet_name = 'infra_external'
-                if not self.network_is_mapped(nw_profile_config.get(nw_profile_name), subnet_name):
-                    raise validation.ValidationError('%s is not mapped for %s' % (subnet_name, key))
-            else:
-                subnet_name = 'infra_external'
-                if self.network_is_mapped(nw_profile_config.get(nw_profile_name), subnet_name):
-                    raise validation.ValidationError('%s is mapped for %s' % (subnet_name, key))
-
             if self.base_profile in profiles:
                 bases.append(key)
             if self.caas_master_profile in profiles:
                 caas_masters.append(key)
-
             if self.storage_profile in profiles:
                 storages.append(key)
-                st_profiles = value.get('storage_profiles')
-                self.validate_profile_list(st_profiles, storage_profile_list,
-                                           key, 'storage_profiles')
-                subnet_name = 'infra_storage_cluster'
-                if not self.network_is_mapped(nw_profile_config.get(nw_profile_name), subnet_name) \
-                        and self.is_ceph_profile(storage_profile_config, st_profiles):
-                    raise validation.ValidationError('%s is not mapped for %s' % (subnet_name, key))
-
-            # HW management
-            self.validate_hwmgmt(value.get('hwmgmt'), key)
-
-            # MAC address
-            self.validate_mac_list(value.get('mgmt_mac'))
-
-            # Preallocated IP validation
-            self.validate_preallocated_ips(value, nw_profile_config, networking_config)
 
         # Check duplicated Preallocated IPs
         self.search_for_duplicate_ips(hosts_config)
@@ -357,6 +286,121 @@ class HostsValidation(cmvalidator.CMValidator):
 
         self.validate_network_ranges(hosts_config, nw_profile_config, networking_config)
 
+    def validate_host(self, key, value, nw_profile_config, storage_profile_config,
+                      perf_profile_config, networking_config, service_profile_list):
+        # Hostname
+        if not patterns.HOSTNAME.match(key) or len(key) > 63:
+            raise validation.ValidationError('Invalid hostname %s' % key)
+
+        # Network domain
+        attr = 'network_domain'
+        network_domain = value.get(attr)
+        if not network_domain:
+            reason = 'Missing %s for %s' % (attr, key)
+            raise validation.ValidationError(reason)
+
+        net_profile_list = [] if not nw_profile_config else nw_profile_config.keys()
+        storage_profile_list = [] if not storage_profile_config else storage_profile_config.keys()
+        performance_profile_list = [] if not perf_profile_config else perf_profile_config.keys()
+
+        # Network profiles
+        attr = 'network_profiles'
+        profiles = value.get(attr)
+        self.validate_profile_list(profiles, net_profile_list, key, attr)
+        if len(profiles) != 1:
+            reason = 'More than one %s defined for %s' % (attr, key)
+            raise validation.ValidationError(reason)
+
+        nw_profile_name = profiles[0]
+        subnet_name = 'infra_internal'
+        if not self.network_is_mapped(nw_profile_config.get(nw_profile_name), subnet_name):
+            raise validation.ValidationError('%s is not mapped for %s' % (subnet_name, key))
+
+        # Performance profiles
+        attr = 'performance_profiles'
+        perf_profile = None
+        profiles = value.get(attr)
+        if profiles:
+            self.validate_profile_list(profiles, performance_profile_list, key, attr)
+            if len(profiles) != 1:
+                reason = 'More than one %s defined for %s' % (attr, key)
+                raise validation.ValidationError(reason)
+            perf_profile = profiles[0]
+            self.validate_nonempty_performance_profile(perf_profile_config, perf_profile, key)
+
+        if self.is_provider_type_ovs_dpdk(nw_profile_name, nw_profile_config):
+            if not profiles:
+                reason = 'Missing performance profiles with ovs_dpdk type provider network'
+                raise validation.ValidationError(reason)
+            self.validate_performance_profile(perf_profile_config, perf_profile)
+
+        # Service profiles
+        attr = 'service_profiles'
+        profiles = value.get(attr)
+        self.validate_profile_list(profiles, service_profile_list, key, attr)
+        if self.is_provider_type_ovs_dpdk(nw_profile_name, nw_profile_config):
+            if self.base_profile not in profiles:
+                reason = 'Missing base service profile with ovs_dpdk type provider network'
+                raise validation.ValidationError(reason)
+        if self.is_provider_type_sriov(nw_profile_name, nw_profile_config):
+            if not self.is_sriov_allowed_for_host(profiles):
+                reason = 'Missing base or caas_* service profile'
+                reason += ' with SR-IOV type provider network'
+                raise validation.ValidationError(reason)
+        if perf_profile:
+            if not self.is_perf_allowed_for_host(profiles):
+                reason = 'Missing base or caas_* service profile'
+                reason += ' with performance profile host'
+                raise validation.ValidationError(reason)
+        if self.management_profile in profiles:
+            subnet_name = 'infra_external'
+            if not self.network_is_mapped(nw_profile_config.get(nw_profile_name), subnet_name):
+                raise validation.ValidationError('%s is not mapped for %s' % (subnet_name, key))
+        else:
+            subnet_name = 'infra_external'
+            if self.network_is_mapped(nw_profile_config.get(nw_profile_name), subnet_name):
+                raise validation.ValidationError('%s is mapped for %s' % (subnet_name, key))
+
+        if self.storage_profile in profiles:
+            st_profiles = value.get('storage_profiles')
+            self.validate_profile_list(st_profiles, storage_profile_list,
+                                       key, 'storage_profiles')
+            subnet_name = 'infra_storage_cluster'
+            if not self.network_is_mapped(nw_profile_config.get(nw_profile_name), subnet_name) \
+                    and self.is_ceph_profile(storage_profile_config, st_profiles):
+                raise validation.ValidationError('%s is not mapped for %s' % (subnet_name, key))
+
+        # HW management
+        self.validate_hwmgmt(value.get('hwmgmt'), key)
+
+        # MAC address
+        self.validate_mac_list(value.get('mgmt_mac'))
+
+        # Preallocated IP validation
+        self.validate_preallocated_ips(value, nw_profile_config, networking_config)
+
+    def get_service_profiles(self):
+        if self.service_profiles is None:
+            self.service_profiles = frozenset(service_profiles.Profiles().get_service_profiles())
+        return self.service_profiles
+
+    def get_changed_hosts(self, changes, hosts_config):
+        # Per host checks depend also on the profiles and networking, so any
+        # change in those requires validating all the hosts
+        if self.full_validation:
+            return None
+        for domain in (self.network_profile_attr, self.storage_profile_attr,
+                       self.performance_profile_attr, self.networking_attr):
+            if domain in changes:
+                return None
+        running_hosts = self._get_running_hosts_config()
+        if not running_hosts:
+            return None
+        changed_hosts = set([name for name, host in hosts_config.iteritems()
+                             if running_hosts.get(name) != host])
+        logging.debug('HostsValidation: validating changed hosts %s', sorted(changed_hosts))
+        return changed_hosts
+
     def validate_network_ranges(self, hosts_config, nw_profile_config, networking_config):
         host_counts = {}  # (infra_network, network_domain) as a key, mapped host count as a value
         for host_conf in hosts_config.itervalues():
@@ -414,11 +458,6 @@ class HostsValidation(cmvalidator.CMValidator):
                                                  (attribute, profile, host))
 
     def validate_hwmgmt(self, hwmgmt, host):
-        # this list may not be comprehensive, but it matches ironic's idea
-        # of valid privileges.  In practice, we'll likely only see OPERATOR
-        # and ADMINISTRATOR.  Case seems to matter here.
-        valid_ipmi_priv = ['USER', 'CALLBACK', 'OPERATOR', 'ADMINISTRATOR']
-
         if not hwmgmt:
             raise validation.ValidationError('Missing hwmgmt configuration for %s' % host)
         if not hwmgmt.get('user'):
@@ -426,7 +465,7 @@ class HostsValidation(cmvalidator.CMValidator):
         if not hwmgmt.get('password'):
             raise validation.ValidationError('Missing hwmgmt password for %s' % host)
         priv_level = hwmgmt.get('priv_level')
-        if priv_level and priv_level not in valid_ipmi_priv:
+        if priv_level and priv_level not in patterns.IPMI_PRIVILEGES:
             # priv_level is optional, but should be in the valid range.
             raise validation.ValidationError('Invalid IPMI privilege level %s for %s' %
                                              (priv_level, host))
@@ -458,8 +497,7 @@ class HostsValidation(cmvalidator.CMValidator):
             raise validation.ValidationError('mgmt_mac value must be a list')
 
         for mac in mac_list:
-            pattern = '[0-9a-f]{2}([-:])[0-9a-f]{2}(\\1[0-9a-f]{2}){4}$'
-            if not mac or not re.match(pattern, mac.lower()):
+            if not mac or not patterns.MAC_ADDRESS.match(mac.lower()):
                 raise validation.ValidationError('Invalid mac address syntax %s' % mac)
 
     def validate_preallocated_ips(self, host, nw_profile_config, networking_config):
@@ -532,6 +570,7 @@ class HostsValidation(cmvalidator.CMValidator):
         str_value = config.get(domain_name)
         if not str_value:
             str_value = client.get_property(domain_name)
+            TRACER.count('get_property')
         dict_value = {} if not str_value else json.loads(str_value)
         return dict_value
 
@@ -14,21 +14,28 @@
 # limitations under the License.
 
 import json
-import re
+import hashlib
 
 from cmdatahandlers.api import validation
 from cmframework.apis import cmvalidator
 from cmdatahandlers.api import utils
+from cmpluginutils import patterns
+from cmpluginutils import tracing
+from cmpluginutils import vlanranges
 
 
+TRACER = tracing.get_tracer('NetworkProfilesValidation')
+
+
+@tracing.traced_methods('validate')
 class NetworkProfilesValidation(cmvalidator.CMValidator):
     SUBSCRIPTION = r'^cloud\.network_profiles|cloud\.networking$'
     DOMAIN = 'cloud.network_profiles'
     NETWORKING = 'cloud.networking'
 
     MAX_IFACE_NAME_LEN = 15
-    IFACE_NAME_MATCH = r'^[a-z][\da-z]+$'
-    BOND_NAME_MATCH = r'^bond[\d]+$'
+    IFACE_NAME_MATCH = patterns.IFACE_NAME
+    BOND_NAME_MATCH = patterns.BOND_NAME
 
     INTERFACE_NET_MAPPING = 'interface_net_mapping'
     PROVIDER_NETWORK_INTERFACES = 'provider_network_interfaces'
@@ -138,6 +145,8 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
 
     ERR_PROVIDER_VLAN_CONFLICT = 'Provider network vlan ranges conflicting on interface {}'
 
+    ERR_IDENTICAL_PROFILES = '{0} (in all identical network profiles: {1})'
+
     @staticmethod
     def err_input_not_dict():
         err = NetworkProfilesValidation.ERR_INPUT_NOT_DICT
@@ -337,13 +346,18 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
         err = NetworkProfilesValidation.ERR_PROVIDER_VLAN_CONFLICT.format(iface)
         raise validation.ValidationError(err)
 
+    @staticmethod
+    def err_identical_profiles(err, profile_names):
+        err = NetworkProfilesValidation.ERR_IDENTICAL_PROFILES.format(err, ', '.join(profile_names))
+        raise validation.ValidationError(err)
+
     @staticmethod
     def is_dict(conf):
         return isinstance(conf, dict)
 
     @staticmethod
     def is_bond_iface(iface):
-        return re.match(NetworkProfilesValidation.BOND_NAME_MATCH, iface)
+        return NetworkProfilesValidation.BOND_NAME_MATCH.match(iface)
 
     @staticmethod
     def is_non_empty_dict(conf):
@@ -414,18 +428,13 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
             NetworkProfilesValidation.err_not_int(entry, key)
         return True
 
-    @staticmethod
-    def are_overlapping(ranges1, ranges2):
-        for range1 in ranges1:
-            for range2 in ranges2:
-                if not (range1[0] > range2[1] or range1[1] < range2[0]):
-                    return True
-        return False
-
     def __init__(self):
         cmvalidator.CMValidator.__init__(self)
         self.conf = None
         self.networking = None
+        self.vlan_ranges_cache = {}
+        self.iface_infra_info_cache = {}
+        self.default_mtu = None
 
     def get_subscription_info(self):
         return self.SUBSCRIPTION
@@ -445,6 +454,7 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
             self.conf = json.loads(props[self.DOMAIN])
         else:
             self.conf = json.loads(self.get_plugin_client().get_property(self.DOMAIN))
+            TRACER.count('get_property')
 
         if not self.is_non_empty_dict(self.conf):
             self.err_not_dict(self.INPUT_ERR_CONTEXT, self.DOMAIN)
@@ -455,6 +465,7 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
             self.networking = json.loads(props[self.NETWORKING])
         else:
             self.networking = json.loads(self.get_plugin_client().get_property(self.NETWORKING))
+            TRACER.count('get_property')
 
         if not self.is_non_empty_dict(self.networking):
             self.err_not_dict(self.INPUT_ERR_CONTEXT, self.NETWORKING)
@@ -462,10 +473,36 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
         self.validate()
 
     def validate(self):
-        for profile_name in self.conf:
+        self.clear_caches()
+        for profile_names in self.get_identical_profiles():
+            TRACER.count('profiles')
+            try:
+                self.validate_network_profile(profile_names[0])
+            except validation.ValidationError as exp:
+                if len(profile_names) > 1:
+                    self.err_identical_profiles(exp, profile_names)
+                raise
+
+    def get_identical_profiles(self):
+        identical_profiles = {}
+        digests = []
+        for profile_name in sorted(self.conf):
             if not self.val_is_non_empty_dict(self.conf, profile_name):
                 self.err_not_dict(self.DOMAIN, profile_name)
-            self.validate_network_profile(profile_name)
+            digest = self.get_profile_digest(profile_name)
+            if digest not in identical_profiles:
+                identical_profiles[digest] = []
+                digests.append(digest)
+            identical_profiles[digest].append(profile_name)
+        return [identical_profiles[digest] for digest in digests]
+
+    def get_profile_digest(self, profile_name):
+        return hashlib.sha1(json.dumps(self.conf[profile_name], sort_keys=True)).hexdigest()
+
+    def clear_caches(self):
+        self.vlan_ranges_cache = {}
+        self.iface_infra_info_cache = {}
+        self.default_mtu = None
 
     def validate_network_profile(self, profile_name):
         self.validate_interface_net_mapping(profile_name)
@@ -610,7 +647,7 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
                     self.validate_not_vlan(network, iface)
                     self.validate_not_bond(network, iface)
                     self.validate_not_part_of_lacp(self.conf[profile_name], iface)
-                    infra_info = self.get_iface_infra_info(self.conf[profile_name], iface)
+                    infra_info = self.get_iface_infra_info(profile_name, iface)
                     if infra_info is not None:
                         self.validate_shared_sriov_infra(network, iface, infra_info)
                     provider_info = self.get_iface_provider_info(self.conf[profile_name], iface)
@@ -628,11 +665,14 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
         if self.key_exists(self.conf[profile_name], self.PROVIDER_NETWORK_INTERFACES):
             for iface in self.conf[profile_name][self.PROVIDER_NETWORK_INTERFACES]:
                 iface_info = self.conf[profile_name][self.PROVIDER_NETWORK_INTERFACES][iface]
-                vlan_ranges_list = []
+                iface_vlan_ranges = vlanranges.VlanRangeSet()
+                vlan_conflict = False
                 for network in iface_info[self.PROVIDER_NETWORKS]:
                     vlan_ranges = self.get_vlan_ranges(network)
-                    vlan_ranges_list.append(vlan_ranges)
-                    infra_info = self.get_iface_infra_info(self.conf[profile_name], iface)
+                    if iface_vlan_ranges.overlaps(vlan_ranges):
+                        vlan_conflict = True
+                    iface_vlan_ranges.update(vlan_ranges)
+                    infra_info = self.get_iface_infra_info(profile_name, iface)
                     if infra_info is not None:
                         if (len(self.conf[profile_name][self.PROVIDER_NETWORK_INTERFACES]) > 1 or
                                 len(self.conf[profile_name][self.INTERFACE_NET_MAPPING]) > 1):
@@ -640,10 +680,8 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
                         if iface_info[self.TYPE] in self.SINGLE_NIC_UNSUPPORTED_TYPES:
                             self.err_single_nic_provider_type(profile_name, iface_info[self.TYPE])
                         self.validate_shared_infra_provider(network, infra_info, vlan_ranges)
-                for idx, ranges1 in enumerate(vlan_ranges_list):
-                    for ranges2 in vlan_ranges_list[(idx+1):]:
-                        if self.are_overlapping(ranges1, ranges2):
-                            self.err_provider_vlan_conflict(iface)
+                if vlan_conflict:
+                    self.err_provider_vlan_conflict(iface)
 
     def validate_not_part_of_lacp(self, profile_conf, iface):
         if self.key_exists(profile_conf, self.PROVIDER_NETWORK_INTERFACES):
@@ -668,25 +706,27 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
         sriov_info = self.get_sriov_info(sriov_net)
         if sriov_info[self.MTU] > infra_info[self.MTU]:
             self.err_sriov_mtu_size(sriov_net, sriov_info[self.MTU], iface, infra_info[self.MTU])
-        for vlan_range in sriov_info[self.VLAN_RANGES]:
-            for infra_vlan in infra_info[self.VLAN]:
-                if not (infra_vlan < vlan_range[0] or infra_vlan > vlan_range[1]):
-                    self.err_sriov_infra_vlan_conflict(sriov_net)
+        if sriov_info[self.VLAN_RANGES].contains_any(infra_info[self.VLAN]):
+            self.err_sriov_infra_vlan_conflict(sriov_net)
 
     def validate_shared_sriov_provider(self, sriov_net, ovs_vlan_ranges):
         sriov_vlan_ranges = self.get_vlan_ranges(sriov_net)
-        if self.are_overlapping(sriov_vlan_ranges, ovs_vlan_ranges):
+        if sriov_vlan_ranges.overlaps(ovs_vlan_ranges):
             self.err_sriov_provider_vlan_conflict(sriov_net)
 
     def validate_shared_infra_provider(self, provider_net, infra_info, vlan_ranges):
         if infra_info[self.UNTAGGED]:
             self.err_infra_provider_untagged_conflict(provider_net)
-        for vlan in infra_info[self.VLAN]:
-            for vlan_range in vlan_ranges:
-                if not (vlan_range[0] > vlan or vlan_range[1] < vlan):
-                    self.err_infra_provider_vlan_conflict(provider_net)
+        if vlan_ranges.contains_any(infra_info[self.VLAN]):
+            self.err_infra_provider_vlan_conflict(provider_net)
+
+    def get_iface_infra_info(self, profile_name, iface):
+        if (profile_name, iface) not in self.iface_infra_info_cache:
+            self.iface_infra_info_cache[(profile_name, iface)] = \
+                self.build_iface_infra_info(self.conf[profile_name], iface)
+        return self.iface_infra_info_cache[(profile_name, iface)]
 
-    def get_iface_infra_info(self, profile_conf, iface):
+    def build_iface_infra_info(self, profile_conf, iface):
         infra_info = {self.VLAN: [], self.MTU: 0, self.UNTAGGED: False}
         default_mtu = self.get_default_mtu()
         infra_iface = self.get_master_iface(profile_conf, iface)
@@ -711,7 +751,7 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
         return infra_info
 
     def get_iface_provider_info(self, profile_conf, iface):
-        provider_info = {self.TYPE: None, self.VLAN_RANGES: []}
+        provider_info = {self.TYPE: None, self.VLAN_RANGES: vlanranges.VlanRangeSet()}
         provider_iface = self.get_master_iface(profile_conf, iface)
 
         if self.key_exists(profile_conf, self.PROVIDER_NETWORK_INTERFACES):
@@ -719,7 +759,7 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
                 iface_info = profile_conf[self.PROVIDER_NETWORK_INTERFACES][provider_iface]
                 provider_info[self.TYPE] = iface_info[self.TYPE]
                 for network in iface_info[self.PROVIDER_NETWORKS]:
-                    provider_info[self.VLAN_RANGES].extend(self.get_vlan_ranges(network))
+                    provider_info[self.VLAN_RANGES].update(self.get_vlan_ranges(network))
 
         return provider_info
 
@@ -731,7 +771,7 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
         return slave_iface
 
     def get_sriov_info(self, network):
-        sriov_info = {self.VLAN_RANGES: []}
+        sriov_info = {}
         if self.exists_as_int(self.networking[self.PROVIDER_NETWORKS], network, self.MTU):
             sriov_info[self.MTU] = self.networking[self.PROVIDER_NETWORKS][network][self.MTU]
         else:
@@ -740,7 +780,12 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
         return sriov_info
 
     def get_vlan_ranges(self, network):
-        vlan_ranges = []
+        if network not in self.vlan_ranges_cache:
+            self.vlan_ranges_cache[network] = self.parse_vlan_ranges(network)
+        return self.vlan_ranges_cache[network]
+
+    def parse_vlan_ranges(self, network):
+        vlan_ranges = vlanranges.VlanRangeSet()
         networks = self.networking[self.PROVIDER_NETWORKS]
         self.must_be_str(networks, network, self.VLAN_RANGES)
         for vlan_range in networks[network][self.VLAN_RANGES].split(','):
@@ -753,17 +798,20 @@ class NetworkProfilesValidation(cmvalidator.CMValidator):
             except ValueError:
                 break
             if end >= start:
-                vlan_ranges.append([start, end])
+                vlan_ranges.add(start, end)
         return vlan_ranges
 
     def get_default_mtu(self):
-        if (self.key_exists(self.networking, self.MTU) and
-                self.val_is_int(self.networking, self.MTU)):
-            return self.networking[self.MTU]
-        return self.DEFAULT_MTU
+        if self.default_mtu is None:
+            if (self.key_exists(self.networking, self.MTU) and
+                    self.val_is_int(self.networking, self.MTU)):
+                self.default_mtu = self.networking[self.MTU]
+            else:
+                self.default_mtu = self.DEFAULT_MTU
+        return self.default_mtu
 
     def validate_iface_name(self, context, iface):
-        if not isinstance(iface, basestring) or not re.match(self.IFACE_NAME_MATCH, iface, re.IGNORECASE):
+        if not isinstance(iface, basestring) or not self.IFACE_NAME_MATCH.match(iface):
             self.err_invalid_iface_name(context)
         if len(iface) > self.MAX_IFACE_NAME_LEN:
             self.err_iface_name_len(context)
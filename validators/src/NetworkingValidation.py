@@ -14,13 +14,19 @@
 # limitations under the License.
 
 import json
-import re
 from netaddr import IPNetwork
 
 from cmdatahandlers.api import validation
 from cmframework.apis import cmvalidator
+from cmpluginutils import patterns
+from cmpluginutils import tracing
+from cmpluginutils import vlanranges
 
 
+TRACER = tracing.get_tracer('NetworkingValidation')
+
+
+@tracing.traced_methods('validate')
 class NetworkingValidation(cmvalidator.CMValidator):
     SUBSCRIPTION = r'^cloud\.networking$'
     DOMAIN = 'cloud.networking'
@@ -31,7 +37,7 @@ class NetworkingValidation(cmvalidator.CMValidator):
     MAX_VLAN = 4094
     MAX_PROVNET_LEN = 64
     MAX_DNS = 2
-    PROVNET_NAME_MATCH = r'^[a-zA-Z][\da-zA-Z-_]+[\da-zA-Z]$'
+    PROVNET_NAME_MATCH = patterns.NETWORK_NAME
     NET_DOMAIN_MATCH = PROVNET_NAME_MATCH
     MAX_NET_DOMAIN_LEN = MAX_PROVNET_LEN
     DEFAULT_ROUTE_DEST = '0.0.0.0/0'
@@ -456,12 +462,14 @@ class NetworkingValidation(cmvalidator.CMValidator):
 
     def validate_network_domains(self, network):
         self.must_be_dict(self.net_conf, network, self.NETWORK_DOMAINS)
+        TRACER.count('networks')
+        TRACER.count('network_domains', len(self.net_conf[network][self.NETWORK_DOMAINS]))
         for domain in self.net_conf[network][self.NETWORK_DOMAINS]:
             self.validate_net_domain_name(domain)
 
     def validate_net_domain_name(self, domain_name):
         if (not isinstance(domain_name, basestring) or
-                not re.match(self.NET_DOMAIN_MATCH, domain_name)):
+                not self.NET_DOMAIN_MATCH.match(domain_name)):
             self.err_invalid_net_domain_name()
         if len(domain_name) > self.MAX_NET_DOMAIN_LEN:
             self.err_net_domain_len()
@@ -519,7 +527,7 @@ class NetworkingValidation(cmvalidator.CMValidator):
             self.err_default_route(network, domain)
 
     def validate_providernet_name(self, netname):
-        if not isinstance(netname, basestring) or not re.match(self.PROVNET_NAME_MATCH, netname):
+        if not isinstance(netname, basestring) or not self.PROVNET_NAME_MATCH.match(netname):
             self.err_invalid_provnet_name()
         if len(netname) > self.MAX_PROVNET_LEN:
             self.err_provnet_len()
@@ -544,10 +552,9 @@ class NetworkingValidation(cmvalidator.CMValidator):
         self.validate_vlan_ranges_not_overlapping(vlan_ranges)
 
     def validate_vlan_ranges_not_overlapping(self, vlan_ranges):
-        for idx, range1 in enumerate(vlan_ranges):
-            for range2 in vlan_ranges[(idx+1):]:
-                if not (range1[0] > range2[1] or range1[1] < range2[0]):
-                    self.err_vlan_ranges_overlapping(range1, range2)
+        overlapping = vlanranges.find_overlapping(vlan_ranges)
+        if overlapping is not None:
+            self.err_vlan_ranges_overlapping(overlapping[0], overlapping[1])
 
     def validate_vlan_id(self, network, vid):
         if vid < self.MIN_VLAN or vid > self.MAX_VLAN:
@@ -21,12 +21,14 @@ import json
 
 from cmframework.apis import cmvalidator
 from cmdatahandlers.api import validation
+from cmpluginutils import tracing
 
 
 class OpenstackValidationError(validation.ValidationError):
     pass
 
 
+@tracing.traced_methods('validate')
 class OpenstackValidation(cmvalidator.CMValidator):
     domain = "cloud.openstack"
 
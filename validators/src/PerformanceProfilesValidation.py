@@ -17,8 +17,10 @@ import json
 
 from cmdatahandlers.api import validation
 from cmframework.apis import cmvalidator
+from cmpluginutils import tracing
 
 
+@tracing.traced_methods('validate')
 class PerformanceProfilesValidation(cmvalidator.CMValidator):
     DOMAIN = 'cloud.performance_profiles'
     SUBSCRIPTION = r'^cloud\.performance_profiles$'
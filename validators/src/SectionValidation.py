@@ -17,8 +17,13 @@ import logging
 
 from cmframework.apis import cmvalidator
 from cmdatahandlers.api import validation
+from cmpluginutils import tracing
 
 
+TRACER = tracing.get_tracer('SectionValidation')
+
+
+@tracing.traced_methods('validate')
 class SectionValidation(cmvalidator.CMValidator):
 
     Required = ['cloud.name', 'cloud.version', 'cloud.time', 'cloud.users', 'cloud.networking',
@@ -50,6 +55,7 @@ class SectionValidation(cmvalidator.CMValidator):
             if name not in sections:
                 names.append(name)
         properties = client.get_properties(self.filterstr)
+        TRACER.count('get_properties')
         keys = properties.keys()
         for name in names:
             if name not in keys:
@@ -17,19 +17,23 @@
 
 import logging
 import json
-import pytz
-import yaml
-import requests
-from django.core.validators import URLValidator
-from django.core.exceptions import ValidationError
 
 from cmframework.apis import cmvalidator
 from cmdatahandlers.api import validation
+from cmpluginutils import tracing
+from cmpluginutils import urlfetcher
+from cmpluginutils import urlvalidator
 
 
+@tracing.traced_methods('validate')
 class TimeValidation(cmvalidator.CMValidator):
     domain = 'cloud.time'
     supported_authentication_types = ['none', 'crypto', 'symmetric']
+    serverkeys_cache_dir = '/var/cache/cmframework/ntp_serverkeys'
+
+    def __init__(self):
+        cmvalidator.CMValidator.__init__(self)
+        self.serverkeys_fetcher = urlfetcher.CachedUrlFetcher(self.serverkeys_cache_dir)
 
     def get_subscription_info(self):
         logging.debug('get_subscription info called')
@@ -90,6 +94,8 @@ class TimeValidation(cmvalidator.CMValidator):
             utils.validate_ip_address(ntp)
 
     def validate_timezone(self, value):
+        # pytz and yaml are imported on first use, the plugin is loaded for every change
+        import pytz
         try:
             pytz.timezone(value)
         except pytz.UnknownTimeZoneError as exc:
@@ -101,13 +107,11 @@ class TimeValidation(cmvalidator.CMValidator):
                 'The provided authentication method for NTP is not supported')
 
     def validate_filepath(self, filepath):
-        try:
-            val = URLValidator()
-            val(filepath)
-        except ValidationError:
+        if not urlvalidator.is_valid_url(filepath):
             raise validation.ValidationError('The url: "%s" is not a valid url!' % filepath)
 
     def validate_yaml_format(self, url, auth_type):
+        import yaml
         if url.startswith("file://"):
             path = url.lstrip("file://")
             try:
@@ -118,12 +122,14 @@ class TimeValidation(cmvalidator.CMValidator):
                                                  % url)
         else:
             try:
-                r = requests.get(url)
-                if r['status_code'] != 200:
-                    raise requests.exceptions.ConnectionError()
-                f_content = r['content']
-            except requests.exceptions.ConnectionError:
+                result = self.serverkeys_fetcher.fetch(url)
+            except urlfetcher.UrlFetchError as exc:
+                logging.debug(str(exc))
                 raise validation.ValidationError('The url: "%s" is not reachable!' % url)
+            if result.validated_as == auth_type:
+                logging.debug('The serverkeys file %s is unchanged since last validated', url)
+                return
+            f_content = result.content
         try:
             yaml_content = yaml.load(f_content)
         except yaml.YAMLError:
@@ -141,3 +147,5 @@ class TimeValidation(cmvalidator.CMValidator):
                                                      '(The authentication method looks like it\'s crypto.)')
             else:
                 raise validation.ValidationError('The yamlfile contains invalid data!')
+        if not url.startswith("file://"):
+            self.serverkeys_fetcher.mark_validated(url, auth_type)
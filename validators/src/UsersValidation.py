@@ -18,8 +18,10 @@ import json
 
 from cmframework.apis import cmvalidator
 from cmdatahandlers.api import validation
+from cmpluginutils import tracing
 
 
+@tracing.traced_methods('validate')
 class UsersValidation(cmvalidator.CMValidator):
     domain = 'cloud.users'
 
@@ -0,0 +1,141 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import json
+import unittest
+
+import testutils
+from CaasValidation import CaasValidation
+from CaasValidation import CaasValidationError
+
+
+def make_host(profile, service_profiles=('caas_worker',)):
+    return {'network_profiles': [profile], 'service_profiles': list(service_profiles)}
+
+
+def make_props(hosts, profiles):
+    return {'cloud.hosts': json.dumps(collections.OrderedDict(hosts)),
+            'cloud.network_profiles': json.dumps(profiles)}
+
+
+def make_ordered_hosts(profiles):
+    """Returns the hosts using the profiles in the order the validator sees
+    them, which is the order of a dict loaded from json."""
+    names = list(json.loads(json.dumps(dict(('worker-%d' % index, None)
+                                            for index in range(len(profiles))))))
+    return [(name, make_host(profile)) for name, profile in zip(names, profiles)]
+
+
+def provider_profile(iface):
+    return {'provider_network_interfaces': {
+        iface: {'type': 'caas', 'provider_networks': ['caas_net']}}}
+
+
+def sriov_profile(ifaces):
+    return {'sriov_provider_networks': {'caas_net': {'type': 'caas', 'interfaces': ifaces}}}
+
+
+class HomogenousNetSetupTest(unittest.TestCase):
+    def validate(self, hosts, profiles):
+        validator = CaasValidation()
+        validator._validate_homogenous_net_setup(make_props(hosts, profiles), ['caas_net'])
+
+    def get_error(self, hosts, profiles):
+        try:
+            self.validate(hosts, profiles)
+        except CaasValidationError as exp:
+            return str(exp)
+        self.fail('CaasValidationError not raised')
+
+    def test_same_provider_interface(self):
+        self.validate([('worker-1', make_host('profile-1')),
+                       ('worker-2', make_host('profile-2')),
+                       ('worker-3', make_host('profile-1'))],
+                      {'profile-1': provider_profile('bond1'),
+                       'profile-2': provider_profile('bond1')})
+
+    def test_different_provider_interfaces(self):
+        self.assertRaises(CaasValidationError, self.validate,
+                          [('worker-1', make_host('profile-1')),
+                           ('worker-2', make_host('profile-2'))],
+                          {'profile-1': provider_profile('bond1'),
+                           'profile-2': provider_profile('bond2')})
+
+    def test_sriov_network_in_several_hosts(self):
+        # the hosts sharing a profile keep the verdict of a per-host check
+        self.validate([('worker-1', make_host('profile-1'))],
+                      {'profile-1': sriov_profile(['ens1'])})
+        self.assertRaises(CaasValidationError, self.validate,
+                          [('worker-1', make_host('profile-1')),
+                           ('worker-2', make_host('profile-1'))],
+                          {'profile-1': sriov_profile(['ens1'])})
+
+    def test_missing_network(self):
+        hosts = make_ordered_hosts(['profile-1', 'profile-2', 'profile-2'])
+        self.assertEqual(self.get_error(hosts, {'profile-1': provider_profile('bond1'),
+                                                'profile-2': {}}),
+                         'Validation error in caas_validation: '
+                         'CaaS network caas_net missing from host {}'.format(hosts[1][0]))
+
+    def test_error_of_the_first_failing_host(self):
+        profiles = {'profile-1': sriov_profile(['ens1']),
+                    'profile-2': provider_profile('bond1')}
+        # the second host fails before the second host of profile-1
+        self.assertEqual(self.get_error(make_ordered_hosts(['profile-1', 'profile-2',
+                                                            'profile-1']), profiles),
+                         'Validation error in caas_validation: '
+                         'CaaS network caas_net mapped to interface bond1 in one host '
+                         "and interface [u'ens1'] in another host")
+        self.assertEqual(self.get_error(make_ordered_hosts(['profile-1', 'profile-1',
+                                                            'profile-2']), profiles),
+                         'Validation error in caas_validation: '
+                         "CaaS network caas_net mapped to sriov interfaces [u'ens1'] in one host "
+                         "and sriov interfaces [u'ens1'] in another host")
+
+    def test_sriov_network_after_a_provider_network(self):
+        self.validate(make_ordered_hosts(['profile-1', 'profile-2', 'profile-2']),
+                      {'profile-1': provider_profile('bond1'),
+                       'profile-2': sriov_profile(['ens1'])})
+
+    def test_other_hosts_are_not_validated(self):
+        self.validate([('worker-1', make_host('profile-1')),
+                       ('compute-1', make_host('profile-2', ('compute', 'caas_master')))],
+                      {'profile-1': provider_profile('bond1'), 'profile-2': {}})
+
+    def test_host_without_profile_does_not_inherit_one(self):
+        self.validate([('worker-1', make_host('profile-1')),
+                       ('worker-2', {'service_profiles': ['caas_worker']})],
+                      {'profile-1': sriov_profile(['ens1'])})
+
+    def test_profiles_are_checked_once_mapped(self):
+        hosts = [('worker-%d' % index, make_host('profile-%d' % (index % 2)))
+                 for index in range(100)]
+        checked = []
+        validator = CaasValidation()
+        filter_by_net = validator._filter_provider_networkinterfaces_by_net
+
+        def counted(ifaces, net):
+            checked.append(net)
+            return filter_by_net(ifaces, net)
+        validator._filter_provider_networkinterfaces_by_net = counted
+        validator._validate_homogenous_net_setup(
+            make_props(hosts, {'profile-0': provider_profile('bond1'),
+                               'profile-1': provider_profile('bond1')}), ['caas_net'])
+        # worker-0 maps the network, worker-1 and worker-2 check both profiles
+        self.assertEqual(len(checked), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
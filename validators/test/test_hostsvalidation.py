@@ -0,0 +1,108 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import sys
+import unittest
+
+import testutils
+from cmdatahandlers.api import validation
+from HostsValidation import HostsValidation
+
+sys.path.insert(0, os.path.join(testutils.REPO_DIR, 'benchmarks'))
+import benchutils
+import clustergen
+
+FULL_VALIDATION_ENV = 'CMFRAMEWORK_FULL_VALIDATION'
+
+
+class HostsValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.environ = os.environ.pop(FULL_VALIDATION_ENV, None)
+        self.props = clustergen.to_properties(clustergen.generate(6))
+        self.hosts = json.loads(self.props['cloud.hosts'])
+
+    def tearDown(self):
+        if self.environ is None:
+            os.environ.pop(FULL_VALIDATION_ENV, None)
+        else:
+            os.environ[FULL_VALIDATION_ENV] = self.environ
+
+    def validate(self, changes):
+        """Validates the changes against the running configuration and
+        returns the hosts validated one by one."""
+        validator = HostsValidation()
+        validator.set_plugin_client(benchutils.FakePluginClient(self.props))
+        validated = []
+        validate_host = validator.validate_host
+
+        def recorded(key, *args):
+            validated.append(key)
+            return validate_host(key, *args)
+        validator.validate_host = recorded
+        validator.validate_set(changes)
+        return sorted(validated)
+
+    def validate_hosts(self, hosts):
+        return self.validate({'cloud.hosts': json.dumps(hosts)})
+
+    def get_errors(self, hosts):
+        errors = []
+        for full_validation in ('0', '1'):
+            os.environ[FULL_VALIDATION_ENV] = full_validation
+            try:
+                self.validate_hosts(hosts)
+            except validation.ValidationError as exp:
+                errors.append(str(exp))
+        return errors
+
+    def test_only_changed_hosts_are_validated(self):
+        self.assertEqual(self.validate_hosts(self.hosts), [])
+        self.hosts['compute-1']['mgmt_mac'] = ['52:54:00:00:01:00']
+        self.assertEqual(self.validate_hosts(self.hosts), ['compute-1'])
+
+    def test_removed_and_renamed_hosts(self):
+        self.hosts['compute-2'] = self.hosts.pop('compute-1')
+        self.assertEqual(self.validate_hosts(self.hosts), ['compute-2'])
+        del self.hosts['compute-2']
+        self.assertEqual(self.validate_hosts(self.hosts), [])
+
+    def test_profile_changes_validate_all_hosts(self):
+        changes = {'cloud.hosts': json.dumps(self.hosts),
+                   'cloud.network_profiles': self.props['cloud.network_profiles']}
+        self.assertEqual(self.validate(changes), sorted(self.hosts))
+
+    def test_full_validation(self):
+        os.environ[FULL_VALIDATION_ENV] = '1'
+        self.assertEqual(self.validate_hosts(self.hosts), sorted(self.hosts))
+
+    def test_same_errors_as_full_validation(self):
+        self.hosts['compute-1']['hwmgmt']['priv_level'] = 'ROOT'
+        self.assertEqual(self.get_errors(self.hosts),
+                         ['Invalid IPMI privilege level ROOT for compute-1'] * 2)
+        del self.hosts['compute-1']['hwmgmt']['priv_level']
+        self.hosts['Compute-2'] = self.hosts.pop('compute-1')
+        self.assertEqual(self.get_errors(self.hosts), ['Invalid hostname Compute-2'] * 2)
+
+    def test_missing_storage_profiles(self):
+        validator = HostsValidation()
+        config = dict((name, json.loads(value)) for name, value in self.props.iteritems())
+        self.assertRaises(validation.ValidationError, validator.validate_hosts, self.hosts,
+                          config['cloud.network_profiles'], None,
+                          config['cloud.performance_profiles'], config['cloud.networking'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+# Copyright 2019 Nokia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Import paths of the validator unit tests.
+
+The tests run against the sources and the framework stand-ins of the
+benchmarks, for example with:
+
+    python -m unittest discover -s validators/test
+"""
+
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for path in (os.path.join(REPO_DIR, 'benchmarks', 'stubs'),
+             os.path.join(REPO_DIR, 'pluginutils', 'src'),
+             os.path.join(REPO_DIR, 'validators', 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)